@@ -5,156 +5,9 @@ Compare #4829 vs #6096 (the other 51 acceleration Blackhole)
 and analyze exactly where ultra-high acceleration matters most
 """
 
-import json
-import os
-from typing import List, Tuple
-from dataclasses import dataclass
 from collections import defaultdict
 
-
-@dataclass
-class RacingStats:
-    speed: int
-    powerCore: int
-    acceleration: int
-    stability: int
-
-
-@dataclass
-class Bot:
-    id: str
-    token_id: int
-    stats: RacingStats
-    faction: str = ""
-
-    @property
-    def total_stats(self) -> int:
-        return (
-            self.stats.speed
-            + self.stats.powerCore
-            + self.stats.acceleration
-            + self.stats.stability
-        )
-
-
-@dataclass
-class RaceConfig:
-    race_id: int
-    distance: int
-    terrain: str
-    start_time: int = 0
-
-
-def load_real_bots() -> List[Bot]:
-    """Load real PokedBot stats from precomputed-stats.json"""
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    data_path = os.path.join(script_dir, "..", "data", "precomputed-stats.json")
-
-    with open(data_path, "r") as f:
-        data = json.load(f)
-
-    bots = []
-    for bot_data in data["stats"]:
-        bot = Bot(
-            id=f"#{bot_data['tokenId']}",
-            token_id=bot_data["tokenId"],
-            stats=RacingStats(
-                speed=bot_data["speed"],
-                powerCore=bot_data["powerCore"],
-                acceleration=bot_data["acceleration"],
-                stability=bot_data["stability"],
-            ),
-            faction=bot_data["faction"],
-        )
-        bots.append(bot)
-
-    return bots
-
-
-def calculate_race_time(race: RaceConfig, bot: Bot, participant_index: int) -> float:
-    """Exact port of fixed Motoko calculateRaceTime function"""
-    distance = float(race.distance)
-    stats = bot.stats
-
-    speed = float(stats.speed)
-    power_core = float(stats.powerCore)
-    stability = float(stats.stability)
-    acceleration = float(stats.acceleration)
-
-    base_time = distance * (100.0 / speed) * 30.0
-
-    if race.terrain == "ScrapHeaps":
-        terrain_mod = 1.0 + ((100.0 - stability) / 150.0)
-    elif race.terrain == "WastelandSand":
-        terrain_mod = 1.0 + ((100.0 - power_core) / 200.0)
-    elif race.terrain == "MetalRoads":
-        terrain_mod = 1.0 + ((100.0 - acceleration) / 250.0)
-    else:
-        terrain_mod = 1.0
-
-    if race.distance < 10:
-        distance_mod = 1.0 - ((acceleration + speed - 60.0) / 350.0)
-    elif race.distance > 20:
-        distance_mod = 1.0 - ((power_core + stability - 60.0) / 350.0)
-    else:
-        distance_mod = 1.0 - (
-            (speed + power_core + acceleration + stability - 160.0) / 700.0
-        )
-
-    race_time_seed = abs(race.start_time // 1_000_000_000)
-    combined_seed = race.race_id + race_time_seed
-    seed = combined_seed * 1000 + participant_index
-
-    race_seed = (race.race_id * 31337 + 12345) % 100000
-    stat_mix = (
-        stats.speed * 7
-        + stats.powerCore * 11
-        + stats.acceleration * 13
-        + stats.stability * 17
-    ) % 10000
-    mixed_seed = (seed * 2654435761 + race_seed + stat_mix) % 1000000
-
-    race_chaos_value = (mixed_seed // 7) % 1000
-    race_chaos = 0.85 + (float(race_chaos_value) / 3333.0)
-
-    bot_random_value = (mixed_seed // 11) % 1000
-    bot_random = 0.80 + (float(bot_random_value) / 2500.0)
-
-    position_value = (mixed_seed // 13) % 1000
-    position_bonus = 0.90 + (float(position_value) / 5000.0)
-
-    stat_synergy = 1.0
-    if (
-        (speed > 80 and acceleration > 80)
-        or (power_core > 80 and stability > 80)
-        or (speed > 75 and power_core > 75 and acceleration > 75 and stability > 75)
-    ):
-        stat_synergy = 0.95
-    elif (speed < 40 and power_core < 40) or (acceleration < 40 and stability < 40):
-        stat_synergy = 1.08
-
-    final_time = (
-        base_time
-        * terrain_mod
-        * distance_mod
-        * race_chaos
-        * bot_random
-        * position_bonus
-        * stat_synergy
-    )
-
-    return max(1.0, final_time)
-
-
-def simulate_race(race: RaceConfig, bots: List[Bot]) -> List[Tuple[Bot, float]]:
-    """Simulate a race and return sorted results"""
-    results = []
-    for i, bot in enumerate(bots):
-        time = calculate_race_time(race, bot, i)
-        results.append((bot, time))
-
-    results.sort(key=lambda x: x[1])
-    return results
+from pokedbots_sim import Bot, RaceConfig, load_roster, race_winner
 
 
 def analyze_acceleration_impact(bot: Bot):
@@ -252,10 +105,10 @@ def detailed_rivalry_analysis(bot1: Bot, bot2: Bot):
             race_id=race_id, distance=distance, terrain=terrain, start_time=start_time
         )
 
-        results = simulate_race(race, [bot1, bot2])
+        winner = race_winner(race, [bot1, bot2])
 
         scenario = f"{terrain}_{distance}km"
-        if results[0][0].token_id == bot1.token_id:
+        if winner.token_id == bot1.token_id:
             bot1_wins[terrain] += 1
             bot1_wins[f"{distance}km"] += 1
             wins_by_scenario[scenario]["bot1"] += 1
@@ -337,11 +190,11 @@ def main():
     print("⚡ BLACKHOLE #4829 - ACCELERATION DEEP DIVE")
     print("=" * 80)
 
-    all_bots = load_real_bots()
+    roster = load_roster(id_prefix="#")
 
     # Get both 51 acceleration Blackholes
-    bot_4829 = next(b for b in all_bots if b.token_id == 4829)
-    bot_6096 = next(b for b in all_bots if b.token_id == 6096)
+    bot_4829 = roster.bot(4829)
+    bot_6096 = roster.bot(6096)
 
     print(f"\nFound the TWO bots in entire collection with 51 acceleration:")
     print(
@@ -362,14 +215,15 @@ def main():
     print("=" * 80)
 
     # Group bots by acceleration ranges within similar total stats (170-190)
-    tier_bots = [b for b in all_bots if 170 <= b.total_stats <= 190]
+    tier = roster.take((roster.total_stats >= 170) & (roster.total_stats <= 190))
+    accel = tier.acceleration
 
     accel_groups = {
-        "Ultra (50-51)": [b for b in tier_bots if b.stats.acceleration >= 50],
-        "Elite (45-49)": [b for b in tier_bots if 45 <= b.stats.acceleration < 50],
-        "High (40-44)": [b for b in tier_bots if 40 <= b.stats.acceleration < 45],
-        "Mid (35-39)": [b for b in tier_bots if 35 <= b.stats.acceleration < 40],
-        "Low (30-34)": [b for b in tier_bots if 30 <= b.stats.acceleration < 35],
+        "Ultra (50-51)": tier.views(accel >= 50),
+        "Elite (45-49)": tier.views((accel >= 45) & (accel < 50)),
+        "High (40-44)": tier.views((accel >= 40) & (accel < 45)),
+        "Mid (35-39)": tier.views((accel >= 35) & (accel < 40)),
+        "Low (30-34)": tier.views((accel >= 30) & (accel < 35)),
     }
 
     for group_name, bots in accel_groups.items():
@@ -408,9 +262,9 @@ def main():
             )
 
             racers = [bot_4829] + sample
-            results = simulate_race(race, racers)
+            winner = race_winner(race, racers)
 
-            if results[0][0].token_id == bot_4829.token_id:
+            if winner.token_id == bot_4829.token_id:
                 wins_4829 += 1
                 wins_by_terrain[terrain] += 1
                 wins_by_distance[distance] += 1
@@ -431,8 +285,7 @@ def main():
     print("✅ CONCLUSIONS")
     print("=" * 80)
 
-    print(
-        f"""
+    print(f"""
 {bot_4829.id} is one of only TWO bots in the entire 10,000 collection with 51 acceleration.
 
 KEY FINDINGS:
@@ -468,8 +321,7 @@ ESTIMATED VALUE:
    • Acceleration rarity: Elite (51 is top 0.02% - only 2 bots!)
    • Collector value: HIGH due to acceleration rarity
    • Racing value: SOLID in tier, DOMINANT in specific scenarios
-"""
-    )
+""")
 
 
 if __name__ == "__main__":
@@ -4,157 +4,17 @@ Fair tier analysis for Blackhole bot #4829
 Compare against bots in similar stat range (170-190 total)
 """
 
-import json
-import os
 import statistics
-from typing import List, Dict, Tuple
-from dataclasses import dataclass
+from typing import List
 from collections import defaultdict
 
-
-@dataclass
-class RacingStats:
-    speed: int
-    powerCore: int
-    acceleration: int
-    stability: int
-
-
-@dataclass
-class Bot:
-    id: str
-    token_id: int
-    stats: RacingStats
-    faction: str = ""
-
-    @property
-    def total_stats(self) -> int:
-        return (
-            self.stats.speed
-            + self.stats.powerCore
-            + self.stats.acceleration
-            + self.stats.stability
-        )
-
-
-@dataclass
-class RaceConfig:
-    race_id: int
-    distance: int
-    terrain: str
-    start_time: int = 0
-
-
-def load_real_bots() -> List[Bot]:
-    """Load real PokedBot stats from precomputed-stats.json"""
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    data_path = os.path.join(script_dir, "..", "data", "precomputed-stats.json")
-
-    with open(data_path, "r") as f:
-        data = json.load(f)
-
-    bots = []
-    for bot_data in data["stats"]:
-        bot = Bot(
-            id=f"#{bot_data['tokenId']}",
-            token_id=bot_data["tokenId"],
-            stats=RacingStats(
-                speed=bot_data["speed"],
-                powerCore=bot_data["powerCore"],
-                acceleration=bot_data["acceleration"],
-                stability=bot_data["stability"],
-            ),
-            faction=bot_data["faction"],
-        )
-        bots.append(bot)
-
-    return bots
-
-
-def calculate_race_time(race: RaceConfig, bot: Bot, participant_index: int) -> float:
-    """Exact port of fixed Motoko calculateRaceTime function"""
-    distance = float(race.distance)
-    stats = bot.stats
-
-    speed = float(stats.speed)
-    power_core = float(stats.powerCore)
-    stability = float(stats.stability)
-    acceleration = float(stats.acceleration)
-
-    base_time = distance * (100.0 / speed) * 30.0
-
-    if race.terrain == "ScrapHeaps":
-        terrain_mod = 1.0 + ((100.0 - stability) / 150.0)
-    elif race.terrain == "WastelandSand":
-        terrain_mod = 1.0 + ((100.0 - power_core) / 200.0)
-    elif race.terrain == "MetalRoads":
-        terrain_mod = 1.0 + ((100.0 - acceleration) / 250.0)
-    else:
-        terrain_mod = 1.0
-
-    if race.distance < 10:
-        distance_mod = 1.0 - ((acceleration + speed - 60.0) / 350.0)
-    elif race.distance > 20:
-        distance_mod = 1.0 - ((power_core + stability - 60.0) / 350.0)
-    else:
-        distance_mod = 1.0 - (
-            (speed + power_core + acceleration + stability - 160.0) / 700.0
-        )
-
-    race_time_seed = abs(race.start_time // 1_000_000_000)
-    combined_seed = race.race_id + race_time_seed
-    seed = combined_seed * 1000 + participant_index
-
-    race_seed = (race.race_id * 31337 + 12345) % 100000
-    stat_mix = (
-        stats.speed * 7
-        + stats.powerCore * 11
-        + stats.acceleration * 13
-        + stats.stability * 17
-    ) % 10000
-    mixed_seed = (seed * 2654435761 + race_seed + stat_mix) % 1000000
-
-    race_chaos_value = (mixed_seed // 7) % 1000
-    race_chaos = 0.85 + (float(race_chaos_value) / 3333.0)
-
-    bot_random_value = (mixed_seed // 11) % 1000
-    bot_random = 0.80 + (float(bot_random_value) / 2500.0)
-
-    position_value = (mixed_seed // 13) % 1000
-    position_bonus = 0.90 + (float(position_value) / 5000.0)
-
-    stat_synergy = 1.0
-    if (
-        (speed > 80 and acceleration > 80)
-        or (power_core > 80 and stability > 80)
-        or (speed > 75 and power_core > 75 and acceleration > 75 and stability > 75)
-    ):
-        stat_synergy = 0.95
-    elif (speed < 40 and power_core < 40) or (acceleration < 40 and stability < 40):
-        stat_synergy = 1.08
-
-    final_time = (
-        base_time
-        * terrain_mod
-        * distance_mod
-        * race_chaos
-        * bot_random
-        * position_bonus
-        * stat_synergy
-    )
-
-    return max(1.0, final_time)
-
-
-def simulate_race(race: RaceConfig, bots: List[Bot]) -> List[Tuple[Bot, float]]:
-    """Simulate a race and return sorted results"""
-    results = []
-    for i, bot in enumerate(bots):
-        time = calculate_race_time(race, bot, i)
-        results.append((bot, time))
-
-    results.sort(key=lambda x: x[1])
-    return results
+from pokedbots_sim import (
+    Bot,
+    RaceConfig,
+    load_roster,
+    race_winner,
+    run_monte_carlo,
+)
 
 
 def main():
@@ -162,8 +22,8 @@ def main():
     print("=" * 90)
 
     # Load all bots
-    all_bots = load_real_bots()
-    target_bot = next(b for b in all_bots if b.token_id == 4829)
+    roster = load_roster(id_prefix="#")
+    target_bot = roster.bot(4829)
 
     print(f"Target Bot: {target_bot.id}")
     print(f"Total Stats: {target_bot.total_stats}")
@@ -175,11 +35,11 @@ def main():
 
     # Find bots in similar tier (170-190 total stats)
     tier_min, tier_max = 170, 190
-    tier_bots = [
-        b
-        for b in all_bots
-        if tier_min <= b.total_stats <= tier_max and b.token_id != target_bot.token_id
-    ]
+    tier_bots = roster.views(
+        (roster.total_stats >= tier_min)
+        & (roster.total_stats <= tier_max)
+        & (roster.token_ids != target_bot.token_id)
+    )
 
     print(f"Found {len(tier_bots)} bots in tier {tier_min}-{tier_max} total stats\n")
 
@@ -303,12 +163,9 @@ def main():
             race_id=race_id, distance=distance, terrain=terrain, start_time=start_time
         )
 
-        results = simulate_race(race, racers)
-
-        for position, (bot, time) in enumerate(results, 1):
+        for bot in racers:
             overall_races[bot.token_id] += 1
-            if position == 1:
-                overall_wins[bot.token_id] += 1
+        overall_wins[race_winner(race, racers).token_id] += 1
 
     # Calculate rankings
     rankings = []
@@ -367,8 +224,8 @@ def main():
                 start_time=start_time,
             )
 
-            results = simulate_race(race, [target_bot, opponent])
-            if results[0][0].token_id == target_bot.token_id:
+            winner = race_winner(race, [target_bot, opponent])
+            if winner.token_id == target_bot.token_id:
                 wins_bot += 1
 
         win_rate = wins_bot / total * 100
@@ -401,39 +258,21 @@ def run_simulation(target_bot: Bot, opponents: List[Bot], num_races: int = 500):
     terrains = ["ScrapHeaps", "WastelandSand", "MetalRoads"]
     distances = [5, 10, 15, 20, 25, 30]
 
-    overall_wins = defaultdict(int)
-    wins_by_terrain = defaultdict(lambda: defaultdict(int))
-    wins_by_distance = defaultdict(lambda: defaultdict(int))
-    position_counts = defaultdict(lambda: defaultdict(int))
-
-    for race_id in range(num_races):
-        terrain = terrains[race_id % len(terrains)]
-        distance = distances[race_id % len(distances)]
-        start_time = race_id * 3_600_000_000_000
-
-        race = RaceConfig(
-            race_id=race_id, distance=distance, terrain=terrain, start_time=start_time
-        )
-
-        all_racers = [target_bot] + opponents
-        results = simulate_race(race, all_racers)
-
-        winner = results[0][0]
-        overall_wins[winner.token_id] += 1
-        wins_by_terrain[winner.token_id][terrain] += 1
-        wins_by_distance[winner.token_id][distance] += 1
-
-        for position, (bot, time) in enumerate(results, 1):
-            position_counts[bot.token_id][position] += 1
+    all_racers = [target_bot] + opponents
+    racers_by_id = {b.token_id: b for b in all_racers}
+    tally = run_monte_carlo(all_racers, num_races, terrains, distances)
+    counters = tally.counters()
+    overall_wins = counters["overall_wins"]
+    wins_by_terrain = counters["wins_by_terrain"]
+    wins_by_distance = counters["wins_by_distance"]
+    position_counts = counters["position_counts"]
 
     # Results
     bot_wins = overall_wins[target_bot.token_id]
     win_rate = (bot_wins / num_races) * 100
 
     positions = position_counts[target_bot.token_id]
-    avg_position = sum(pos * count for pos, count in positions.items()) / sum(
-        positions.values()
-    )
+    avg_position = tally.mean_position(0)
 
     print(f"\n📊 RESULTS for {target_bot.id}:")
     print(f"  Win Rate: {bot_wins}/{num_races} ({win_rate:.1f}%)")
@@ -461,9 +300,7 @@ def run_simulation(target_bot: Bot, opponents: List[Bot], num_races: int = 500):
     print(f"\n  Top 5 competitors in this field:")
     top_competitors = sorted(overall_wins.items(), key=lambda x: x[1], reverse=True)[:5]
     for rank, (token_id, wins) in enumerate(top_competitors, 1):
-        bot = next(
-            (b for b in [target_bot] + opponents if b.token_id == token_id), None
-        )
+        bot = racers_by_id.get(token_id)
         if bot:
             rate = (wins / num_races) * 100
             marker = " ⭐" if token_id == target_bot.token_id else ""
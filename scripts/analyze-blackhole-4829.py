@@ -4,161 +4,21 @@ Analyze ultra-fast Blackhole bot #4829 (46 total, 51 acceleration)
 Compare against other elite bots and simulate matchups
 """
 
-import json
-import os
 import statistics
-from typing import List, Dict, Tuple
-from dataclasses import dataclass
+from typing import List, Dict
 from collections import defaultdict
 
+import numpy as np
 
-@dataclass
-class RacingStats:
-    speed: int
-    powerCore: int
-    acceleration: int
-    stability: int
-
-
-@dataclass
-class Bot:
-    id: str
-    token_id: int
-    stats: RacingStats
-    faction: str = ""
-
-    @property
-    def total_stats(self) -> int:
-        return (
-            self.stats.speed
-            + self.stats.powerCore
-            + self.stats.acceleration
-            + self.stats.stability
-        )
-
-
-@dataclass
-class RaceConfig:
-    race_id: int
-    distance: int
-    terrain: str
-    start_time: int = 0
-
-
-def load_real_bots() -> List[Bot]:
-    """Load real PokedBot stats from precomputed-stats.json"""
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    data_path = os.path.join(script_dir, "..", "data", "precomputed-stats.json")
-
-    with open(data_path, "r") as f:
-        data = json.load(f)
-
-    bots = []
-    for bot_data in data["stats"]:
-        bot = Bot(
-            id=f"PokedBot #{bot_data['tokenId']}",
-            token_id=bot_data["tokenId"],
-            stats=RacingStats(
-                speed=bot_data["speed"],
-                powerCore=bot_data["powerCore"],
-                acceleration=bot_data["acceleration"],
-                stability=bot_data["stability"],
-            ),
-            faction=bot_data["faction"],
-        )
-        bots.append(bot)
-
-    return bots
-
-
-def calculate_race_time(race: RaceConfig, bot: Bot, participant_index: int) -> float:
-    """Exact port of fixed Motoko calculateRaceTime function"""
-    distance = float(race.distance)
-    stats = bot.stats
-
-    speed = float(stats.speed)
-    power_core = float(stats.powerCore)
-    stability = float(stats.stability)
-    acceleration = float(stats.acceleration)
-
-    base_time = distance * (100.0 / speed) * 30.0
-
-    if race.terrain == "ScrapHeaps":
-        terrain_mod = 1.0 + ((100.0 - stability) / 150.0)
-    elif race.terrain == "WastelandSand":
-        terrain_mod = 1.0 + ((100.0 - power_core) / 200.0)
-    elif race.terrain == "MetalRoads":
-        terrain_mod = 1.0 + ((100.0 - acceleration) / 250.0)
-    else:
-        terrain_mod = 1.0
-
-    if race.distance < 10:
-        distance_mod = 1.0 - ((acceleration + speed - 60.0) / 350.0)
-    elif race.distance > 20:
-        distance_mod = 1.0 - ((power_core + stability - 60.0) / 350.0)
-    else:
-        distance_mod = 1.0 - (
-            (speed + power_core + acceleration + stability - 160.0) / 700.0
-        )
-
-    race_time_seed = abs(race.start_time // 1_000_000_000)
-    combined_seed = race.race_id + race_time_seed
-    seed = combined_seed * 1000 + participant_index
-
-    # Better pseudo-random using multiple hash-like operations
-    race_seed = (race.race_id * 31337 + 12345) % 100000
-    stat_mix = (
-        stats.speed * 7
-        + stats.powerCore * 11
-        + stats.acceleration * 13
-        + stats.stability * 17
-    ) % 10000
-    mixed_seed = (seed * 2654435761 + race_seed + stat_mix) % 1000000
-
-    # Race-specific chaos factor (±15%)
-    race_chaos_value = (mixed_seed // 7) % 1000
-    race_chaos = 0.85 + (float(race_chaos_value) / 3333.0)
-
-    # Per-bot randomness (±20%)
-    bot_random_value = (mixed_seed // 11) % 1000
-    bot_random = 0.80 + (float(bot_random_value) / 2500.0)
-
-    # Position-based variance (±10%)
-    position_value = (mixed_seed // 13) % 1000
-    position_bonus = 0.90 + (float(position_value) / 5000.0)
-
-    stat_synergy = 1.0
-    if (
-        (speed > 80 and acceleration > 80)
-        or (power_core > 80 and stability > 80)
-        or (speed > 75 and power_core > 75 and acceleration > 75 and stability > 75)
-    ):
-        stat_synergy = 0.95
-    elif (speed < 40 and power_core < 40) or (acceleration < 40 and stability < 40):
-        stat_synergy = 1.08
-
-    final_time = (
-        base_time
-        * terrain_mod
-        * distance_mod
-        * race_chaos
-        * bot_random
-        * position_bonus
-        * stat_synergy
-    )
-
-    return max(1.0, final_time)
-
-
-def simulate_race(race: RaceConfig, bots: List[Bot]) -> List[Tuple[Bot, float]]:
-    """Simulate a race and return sorted results"""
-    results = []
-    for i, bot in enumerate(bots):
-        time = calculate_race_time(race, bot, i)
-        results.append((bot, time))
-
-    results.sort(key=lambda x: x[1])
-    return results
+from pokedbots_sim import (
+    Bot,
+    BotRoster,
+    BotView,
+    RaceConfig,
+    load_roster,
+    race_winner,
+    run_monte_carlo,
+)
 
 
 def analyze_bot_strengths(bot: Bot):
@@ -205,43 +65,37 @@ def analyze_bot_strengths(bot: Bot):
         )
 
 
-def find_comparable_bots(all_bots: List[Bot], target_bot: Bot) -> Dict[str, List[Bot]]:
+def find_comparable_bots(
+    roster: BotRoster, target_bot: BotView
+) -> Dict[str, List[BotView]]:
     """Find interesting bots to compare against"""
+    total = roster.total_stats.astype(np.int64)
+    others = roster.token_ids != target_bot.token_id
+
+    def highest(key: np.ndarray, count: int, mask=None) -> List[BotView]:
+        rows = np.argsort(-key.astype(np.int64), kind="stable")
+        if mask is not None:
+            rows = rows[mask[rows]]
+        return roster.views(rows[:count])
 
     # Top 20 bots by total stats
-    top_bots = sorted(all_bots, key=lambda b: b.total_stats, reverse=True)[:20]
+    top_bots = highest(total, 20)
 
     # Other Blackhole bots in top 100
-    blackhole_bots = [
-        b
-        for b in all_bots
-        if b.faction == "Blackhole" and b.token_id != target_bot.token_id
-    ]
-    top_blackhole = sorted(blackhole_bots, key=lambda b: b.total_stats, reverse=True)[
-        :10
-    ]
+    top_blackhole = highest(total, 10, roster.faction_mask("Blackhole") & others)
 
     # Bots with similar total stats (±5)
-    similar_total = [
-        b
-        for b in all_bots
-        if abs(b.total_stats - target_bot.total_stats) <= 5
-        and b.token_id != target_bot.token_id
-    ][:10]
+    similar_total = roster.views(
+        np.flatnonzero((np.abs(total - target_bot.total_stats) <= 5) & others)[:10]
+    )
 
     # High acceleration bots
-    high_accel = sorted(all_bots, key=lambda b: b.stats.acceleration, reverse=True)[:10]
+    high_accel = highest(roster.acceleration, 10)
 
     # Balanced elite bots (all stats > 40)
-    balanced_elite = [
-        b
-        for b in all_bots
-        if b.stats.speed >= 40
-        and b.stats.powerCore >= 40
-        and b.stats.acceleration >= 40
-        and b.stats.stability >= 40
-        and b.token_id != target_bot.token_id
-    ][:15]
+    balanced_elite = roster.views(
+        np.flatnonzero((roster.stats_matrix() >= 40).all(axis=1) & others)[:15]
+    )
 
     return {
         "top_overall": top_bots,
@@ -263,34 +117,15 @@ def run_matchup_analysis(
     terrains = ["ScrapHeaps", "WastelandSand", "MetalRoads"]
     distances = [5, 10, 15, 20, 25, 30]
 
-    # Stats tracking
-    overall_wins = defaultdict(int)
-    wins_by_terrain = defaultdict(lambda: defaultdict(int))
-    wins_by_distance = defaultdict(lambda: defaultdict(int))
-    head_to_head_wins = defaultdict(int)
-
-    race_count = 0
-    for race_id in range(num_races):
-        terrain = terrains[race_id % len(terrains)]
-        distance = distances[race_id % len(distances)]
-        start_time = race_id * 3_600_000_000_000
-
-        race = RaceConfig(
-            race_id=race_id, distance=distance, terrain=terrain, start_time=start_time
-        )
-
-        # Race against all opponents
-        all_racers = [bot] + opponents
-        results = simulate_race(race, all_racers)
-
-        winner = results[0][0]
-        overall_wins[winner.token_id] += 1
-        wins_by_terrain[winner.token_id][terrain] += 1
-        wins_by_distance[winner.token_id][distance] += 1
-
-        # Track head-to-head vs target bot
-        if results[0][0].token_id == bot.token_id:
-            race_count += 1
+    # Stats tracking (all races, sharded across cores)
+    all_racers = [bot] + opponents
+    racers_by_id = {b.token_id: b for b in all_racers}
+    counters = run_monte_carlo(
+        all_racers, num_races, terrains, distances, places=1, positions=False
+    ).counters()
+    overall_wins = counters["overall_wins"]
+    wins_by_terrain = counters["wins_by_terrain"]
+    wins_by_distance = counters["wins_by_distance"]
 
     # Calculate results
     total_races = num_races
@@ -309,7 +144,7 @@ def run_matchup_analysis(
     )[:5]
 
     for rank, (token_id, wins) in enumerate(top_performers, 1):
-        racer = next(b for b in ([bot] + opponents) if b.token_id == token_id)
+        racer = racers_by_id[token_id]
         rate = (wins / total_races) * 100
         marker = " ⭐" if token_id == bot.token_id else ""
         print(
@@ -407,10 +242,10 @@ def detailed_1v1_analysis(bot: Bot, opponent: Bot, num_races: int = 200):
             race_id=race_id, distance=distance, terrain=terrain, start_time=start_time
         )
 
-        results = simulate_race(race, [bot, opponent])
+        winner = race_winner(race, [bot, opponent])
 
         scenario = f"{terrain}_{distance}km"
-        if results[0][0].token_id == bot.token_id:
+        if winner.token_id == bot.token_id:
             wins_bot += 1
             wins_by_scenario[scenario]["bot"] += 1
         else:
@@ -456,11 +291,11 @@ def main():
     print()
 
     # Load all bots
-    all_bots = load_real_bots()
-    print(f"Loaded {len(all_bots)} bots from collection\n")
+    roster = load_roster()
+    print(f"Loaded {len(roster)} bots from collection\n")
 
     # Get the target bot
-    target_bot = next(b for b in all_bots if b.token_id == 4829)
+    target_bot = roster.bot(4829)
 
     # Analyze bot strengths
     analyze_bot_strengths(target_bot)
@@ -468,7 +303,7 @@ def main():
     # Find comparable bots
     print("\n\n🔍 FINDING COMPARABLE OPPONENTS...")
     print("-" * 80)
-    comparable = find_comparable_bots(all_bots, target_bot)
+    comparable = find_comparable_bots(roster, target_bot)
 
     for category, bots in comparable.items():
         print(f"\n{category.replace('_', ' ').title()}: {len(bots)} bots")
@@ -7,157 +7,17 @@ Uses real PokedBot stats from precomputed-stats.json
 
 import random
 import statistics
-from typing import List, Dict, Tuple
-from dataclasses import dataclass
+from typing import List, Dict
 from collections import defaultdict
-import json
-import os
-
-
-@dataclass
-class RacingStats:
-    speed: int
-    powerCore: int
-    acceleration: int
-    stability: int
-
-
-@dataclass
-class Bot:
-    id: str
-    stats: RacingStats
-    faction: str = ""
-
-
-def load_real_bots(limit: int = None) -> List[Bot]:
-    """Load real PokedBot stats from precomputed-stats.json"""
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    data_path = os.path.join(script_dir, "..", "data", "precomputed-stats.json")
-
-    with open(data_path, "r") as f:
-        data = json.load(f)
-
-    bots = []
-    for bot_data in data["stats"]:
-        if limit and len(bots) >= limit:
-            break
-
-        bot = Bot(
-            id=f"PokedBot #{bot_data['tokenId']}",
-            stats=RacingStats(
-                speed=bot_data["speed"],
-                powerCore=bot_data["powerCore"],
-                acceleration=bot_data["acceleration"],
-                stability=bot_data["stability"],
-            ),
-            faction=bot_data["faction"],
-        )
-        bots.append(bot)
-
-    return bots
-
-
-@dataclass
-class RaceConfig:
-    race_id: int
-    distance: int  # km
-    terrain: str  # ScrapHeaps, WastelandSand, MetalRoads
-    start_time: int = 0  # Unix timestamp in nanoseconds
-
-
-def calculate_race_time(race: RaceConfig, bot: Bot, participant_index: int) -> float:
-    """
-    Exact port of Motoko calculateRaceTime function
-    """
-    distance = float(race.distance)
-    stats = bot.stats
-
-    # Convert stats to floats
-    speed = float(stats.speed)
-    power_core = float(stats.powerCore)
-    stability = float(stats.stability)
-    acceleration = float(stats.acceleration)
-
-    # Base time calculation (inverse of speed)
-    base_time = distance * (100.0 / speed) * 30.0
-
-    # Terrain modifier - MORE IMPACTFUL (20-50% variation)
-    if race.terrain == "ScrapHeaps":
-        terrain_mod = 1.0 + ((100.0 - stability) / 150.0)  # Up to +67%
-    elif race.terrain == "WastelandSand":
-        terrain_mod = 1.0 + ((100.0 - power_core) / 200.0)  # Up to +50%
-    elif race.terrain == "MetalRoads":
-        terrain_mod = 1.0 + ((100.0 - acceleration) / 250.0)  # Up to +40%
-    else:
-        terrain_mod = 1.0
-
-    # Distance modifier - MORE PRONOUNCED STAT INTERACTIONS
-    if race.distance < 10:
-        # Short sprint: acceleration + speed dominate
-        distance_mod = 1.0 - ((acceleration + speed - 60.0) / 350.0)
-    elif race.distance > 20:
-        # Long trek: powerCore + stability critical
-        distance_mod = 1.0 - ((power_core + stability - 60.0) / 350.0)
-    else:
-        # Medium: all stats matter
-        distance_mod = 1.0 - (
-            (speed + power_core + acceleration + stability - 160.0) / 700.0
-        )
-
-    # Seed calculation (matching Motoko with start time)
-    race_time_seed = abs(race.start_time // 1_000_000_000)  # Convert to seconds
-    combined_seed = race.race_id + race_time_seed
-    seed = combined_seed * 1000 + participant_index
-
-    # Race-specific chaos factor
-    race_chaos_seed = (race.race_id * 7919) % 1000
-    race_chaos = 0.90 + (float(race_chaos_seed) / 5000.0)  # ±10%
-
-    # Per-bot randomness - MUCH HIGHER (±15%)
-    bot_random_seed = (seed * 2971) % 1000
-    bot_random = 0.85 + (float(bot_random_seed) / 3333.0)  # ±15%
-
-    # Position-based variance
-    position_seed = (seed * 4993) % 100
-    position_bonus = 0.97 + (float(position_seed) / 3333.0)  # ±3%
-
-    # Stat interaction bonus (synergy between complementary stats)
-    stat_synergy = 1.0
-    if (
-        (speed > 80 and acceleration > 80)  # Speed demons
-        or (power_core > 80 and stability > 80)  # Endurance tanks
-        or (speed > 75 and power_core > 75 and acceleration > 75 and stability > 75)
-    ):  # Well-rounded
-        stat_synergy = 0.95  # 5% bonus
-    elif (speed < 40 and power_core < 40) or (  # Double weakness
-        acceleration < 40 and stability < 40
-    ):
-        stat_synergy = 1.08  # 8% penalty
-
-    # Final time with all modifiers
-    final_time = (
-        base_time
-        * terrain_mod
-        * distance_mod
-        * race_chaos
-        * bot_random
-        * position_bonus
-        * stat_synergy
-    )
 
-    return max(1.0, final_time)
+import numpy as np
 
+from pokedbots_sim import Bot, RaceConfig, get_engine, load_roster, simulate_race
 
-def simulate_race(race: RaceConfig, bots: List[Bot]) -> List[Tuple[Bot, float]]:
-    """Simulate a race and return sorted results"""
-    results = []
-    for i, bot in enumerate(bots):
-        time = calculate_race_time(race, bot, i)
-        results.append((bot, time))
-
-    # Sort by time
-    results.sort(key=lambda x: x[1])
-    return results
+# Variance numbers in this report were produced with the original seeding,
+# so keep using it rather than the engine the canister runs today.
+ENGINE = "legacy-v1"
+calculate_race_time = get_engine(ENGINE)
 
 
 def analyze_bot_consistency(bot: Bot, num_races: int = 100) -> Dict:
@@ -202,7 +62,7 @@ def analyze_head_to_head(bot1: Bot, bot2: Bot, num_races: int = 100) -> Dict:
         race = RaceConfig(
             race_id=race_id, distance=distance, terrain=terrain, start_time=start_time
         )
-        results = simulate_race(race, [bot1, bot2])
+        results = simulate_race(race, [bot1, bot2], engine=ENGINE)
 
         if results[0][0].id == bot1.id:
             bot1_wins += 1
@@ -237,7 +97,7 @@ def analyze_race_variance(
             terrain=race_config.terrain,
             start_time=sim * 3_600_000_000_000,  # Each hour apart
         )
-        results = simulate_race(race, bots)
+        results = simulate_race(race, bots, engine=ENGINE)
 
         for position, (bot, time) in enumerate(results, 1):
             position_counts[bot.id][position] += 1
@@ -255,31 +115,23 @@ def main():
     print("Loading real PokedBot data...")
 
     # Load real bots
-    all_bots = load_real_bots()
-    print(f"✅ Loaded {len(all_bots)} real PokedBots")
+    roster = load_roster()
+    print(f"✅ Loaded {len(roster)} real PokedBots")
 
     # Select interesting bots for analysis
     # Find high-stat, low-stat, and balanced bots
-    bots_by_overall = sorted(
-        all_bots,
-        key=lambda b: sum(
-            [b.stats.speed, b.stats.powerCore, b.stats.acceleration, b.stats.stability]
-        ),
-        reverse=True,
-    )
+    by_overall = np.argsort(-roster.total_stats.astype(np.int64), kind="stable")
+    n = len(by_overall)
 
     # Get top performers, mid-tier, and low-tier
-    test_bots = [
-        bots_by_overall[0],  # Best overall
-        bots_by_overall[len(bots_by_overall) // 4],  # Upper mid
-        bots_by_overall[len(bots_by_overall) // 2],  # Middle
-        bots_by_overall[3 * len(bots_by_overall) // 4],  # Lower mid
-        bots_by_overall[-1],  # Worst overall
-    ]
+    # Best overall, upper mid, middle, lower mid, worst overall
+    test_bots = roster.views(by_overall[[0, n // 4, n // 2, 3 * n // 4, -1]])
 
     # Also find specialists
-    speed_demon = max(all_bots, key=lambda b: b.stats.speed)
-    tank = max(all_bots, key=lambda b: b.stats.powerCore + b.stats.stability)
+    speed_demon = roster.view(int(np.argmax(roster.speed)))
+    tank = roster.view(
+        int(np.argmax(roster.power_core.astype(np.int64) + roster.stability))
+    )
 
     print(f"\n🤖 TEST BOTS SELECTED:")
     for bot in test_bots:
@@ -9,100 +9,7 @@ This script calculates how much impact each stat has on race times by:
 4. Analyzing stat importance across different track types
 """
 
-import math
-
-# ===== SIMULATOR LOGIC (Python port of RacingSimulator.mo) =====
-
-
-def calculate_segment_time(segment, stats, seed, previous_difficulty):
-    """Calculate time for a single segment."""
-    speed = stats["speed"]
-    power_core = stats["powerCore"]
-    stability = stats["stability"]
-    acceleration = stats["acceleration"]
-
-    # Base time for segment
-    segment_length = segment["length"]
-    base_speed = math.sqrt(speed) * 7.5
-
-    # Terrain modifier based on segment terrain
-    terrain = segment["terrain"]
-    if terrain == "ScrapHeaps":
-        terrain_mod = 1.0 + ((100.0 - stability) / 150.0)  # Up to 67% penalty
-    elif terrain == "WastelandSand":
-        terrain_mod = 1.0 + ((100.0 - power_core) / 200.0)  # Up to 50% penalty
-    elif terrain == "MetalRoads":
-        terrain_mod = 1.0 + ((100.0 - acceleration) / 160.0)  # Up to 62% penalty
-    else:
-        terrain_mod = 1.0
-
-    # Angle modifier (uphill slows)
-    angle = segment["angle"]
-    if angle > 0:
-        angle_mod = 1.0 + (angle * (100.0 - power_core) / 3000.0)
-    else:
-        angle_mod = 1.0
-
-    # Momentum system: acceleration affects recovery after difficult sections
-    if previous_difficulty > 1.0:
-        momentum_loss = (previous_difficulty - 1.0) * 0.15
-    else:
-        momentum_loss = 0.0
-
-    acceleration_recovery = acceleration / 140.0
-    momentum_mod = 1.0 + (momentum_loss * (1.0 - acceleration_recovery))
-
-    # Segment difficulty - scales with stability
-    difficulty = segment["difficulty"]
-    if difficulty > 1.0:
-        stability_factor = 1.0 + ((100.0 - stability) / 300.0)
-        difficulty_mod = difficulty * stability_factor
-    else:
-        difficulty_mod = difficulty
-
-    # Randomness for this segment (±10%)
-    segment_seed = seed % 1000
-    random_mod = 0.90 + (segment_seed / 5000.0)
-
-    # Calculate segment time
-    effective_speed = base_speed / (
-        terrain_mod * angle_mod * difficulty_mod * momentum_mod
-    )
-    segment_time = (segment_length / effective_speed) * random_mod
-
-    # 10x speed multiplier
-    return max(0.1, segment_time / 10.0)
-
-
-def simulate_race(track_segments, stats, track_seed, participant_index):
-    """Simulate a full race and return total time."""
-    total_time = 0.0
-    previous_difficulty = 1.0
-
-    for segment_idx, segment in enumerate(track_segments):
-        # Use trackSeed + participant index + segment index for deterministic randomness
-        segment_seed = track_seed + (participant_index * 1000) + segment_idx
-
-        # Calculate base segment time
-        base_segment_time = calculate_segment_time(
-            segment, stats, segment_seed, previous_difficulty
-        )
-
-        # Per-segment performance variation (±6%)
-        lap = segment_idx // len(track_segments)
-        segment_condition_seed = (
-            segment_seed * 31337 + participant_index * 7919 + lap * 12345
-        ) % 1000
-        segment_performance = 0.94 + (segment_condition_seed / 1666.67)
-
-        segment_time = base_segment_time * segment_performance
-        total_time += segment_time
-
-        # Update previous difficulty
-        previous_difficulty = segment["difficulty"]
-
-    return total_time
-
+from pokedbots_sim import compile_track, marginal_value_sweep, race_time_tensor
 
 # ===== TRACK TEMPLATES =====
 
@@ -150,17 +57,10 @@ TRACKS = {
 # ===== ANALYSIS FUNCTIONS =====
 
 
-def calculate_stat_marginal_value(
-    track_name, track_segments, base_stats, stat_to_test, track_seed=12345
-):
-    """Calculate the time improvement per stat point."""
-    # Baseline race time
-    base_time = simulate_race(track_segments, base_stats, track_seed, 0)
-
-    # Test increasing the stat by 10 points
-    test_stats = base_stats.copy()
-    test_stats[stat_to_test] = min(100, base_stats[stat_to_test] + 10)
-    improved_time = simulate_race(track_segments, test_stats, track_seed, 0)
+def calculate_stat_marginal_value(base_time, improved_time):
+    """Calculate the time improvement per stat point (from a +10 sweep)."""
+    base_time = float(base_time)
+    improved_time = float(improved_time)
 
     # Calculate improvement
     time_saved = base_time - improved_time
@@ -202,21 +102,27 @@ def analyze_all_stats():
 
     stats_to_test = ["speed", "powerCore", "acceleration", "stability"]
 
-    for stat_level_name, base_stats in stat_levels:
+    # Every level x track x (+10 stat) race in one batched sweep per track
+    sweep = marginal_value_sweep(
+        TRACKS, [base_stats for _, base_stats in stat_levels], stats_to_test
+    )
+
+    for level, (stat_level_name, base_stats) in enumerate(stat_levels):
         print(f"\n{'=' * 80}")
         print(f"{stat_level_name}")
         print(f"{'=' * 80}\n")
 
-        for track_name, track_segments in TRACKS.items():
+        for track_name in TRACKS:
             print(f"\n{track_name}:")
             print("-" * 60)
 
+            track_sweep = sweep[track_name]
             results = {}
-            for stat in stats_to_test:
-                result = calculate_stat_marginal_value(
-                    track_name, track_segments, base_stats, stat
+            for i, stat in enumerate(stats_to_test):
+                results[stat] = calculate_stat_marginal_value(
+                    track_sweep["base_time"][level],
+                    track_sweep["improved_time"][level, i],
                 )
-                results[stat] = result
 
             # Sort by value (time saved per point)
             sorted_stats = sorted(
@@ -250,7 +156,7 @@ def analyze_stat_scaling():
     print("=" * 80)
     print()
 
-    track_segments = TRACKS["Mixed_Balanced"]
+    track = compile_track(TRACKS["Mixed_Balanced"])
 
     stat_ranges = [10, 20, 30, 40, 50, 60, 70, 80, 90]
 
@@ -262,12 +168,15 @@ def analyze_stat_scaling():
         )
         print("-" * 60)
 
-        previous_time = None
+        level_stats = []
         for level in stat_ranges:
             stats = {"speed": 50, "powerCore": 50, "acceleration": 50, "stability": 50}
             stats[stat_name] = level
+            level_stats.append(stats)
+        race_times = race_time_tensor(track, level_stats, [12345], 0)[0]
 
-            race_time = simulate_race(track_segments, stats, 12345, 0)
+        previous_time = None
+        for level, race_time in zip(stat_ranges, race_times.tolist()):
 
             if previous_time is not None:
                 time_saved = previous_time - race_time
@@ -3,42 +3,21 @@
 Analyze racing stats distribution from NFT metadata to verify rarity rewards.
 """
 
-import json
 import statistics
 from collections import Counter, defaultdict
 
-# Load the stats.json file
-with open("data/stats.json", "r") as f:
-    data = json.load(f)
+from pokedbots_sim import load_stats_json
 
-# First element is the schema (nested list structure)
-schema_raw = data[0]
-bots = data[1]  # Second element is the array of all 10,000 bots
-
-# Parse schema: each trait is [id, name, [[value_id, value_name], ...]]
-traits = {}
-trait_names = []
-for trait_data in schema_raw:
-    trait_id = trait_data[0]
-    trait_name = trait_data[1]
-    trait_values = {v[0]: v[1] for v in trait_data[2]}
-    traits[trait_name] = trait_values
-    trait_names.append(trait_name)
+# Load the stats.json file (schema + all 10,000 bots, decoded via the column cache)
+table = load_stats_json("data/stats.json")
+trait_names = table.names
+bots = table.ids
 
 print(f"Total bots: {len(bots)}")
 print(f"Traits: {', '.join(trait_names)}\n")
 
 # Decode bots
-decoded_bots = []
-for bot_entry in bots:
-    bot_id = bot_entry[0]
-    bot_traits = bot_entry[1]
-
-    bot = {"id": bot_id}
-    for trait_id, value_id in bot_traits:
-        trait_name = trait_names[trait_id]
-        bot[trait_name.lower()] = traits[trait_name][value_id]
-    decoded_bots.append(bot)
+decoded_bots = table.records(key=str.lower)
 
 # Analyze trait frequencies
 print("=" * 80)
@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+"""
+Rebuild the binary column caches under data/.cache/.
+
+Loaders rebuild stale caches on their own; run this after pulling new data
+to pay the JSON parsing cost up front.
+"""
+
+import os
+
+from pokedbots_sim import build_caches
+
+
+def main():
+    for path in build_caches():
+        size_kb = os.path.getsize(path) / 1024
+        print(f"✅ {os.path.relpath(path)} ({size_kb:.1f} KB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Build the collection-wide head-to-head matrix and print a scouting report
+"""
+
+import os
+import time
+
+from pokedbots_sim import (
+    build_head_to_head,
+    head_to_head_schedule,
+    load_roster,
+)
+from pokedbots_sim.data import CACHE_DIR
+
+MATRIX_DIR = os.path.join(CACHE_DIR, "head-to-head")
+SCOUTED_TOKEN = 4829
+
+
+def main():
+    print("⚔️  HEAD-TO-HEAD MATRIX")
+    print("=" * 80)
+
+    roster = load_roster()
+    races = head_to_head_schedule(100)
+    print(f"{len(roster)} bots x {len(races)} races per matchup")
+
+    start = time.perf_counter()
+    h2h = build_head_to_head(MATRIX_DIR, roster, races)
+    elapsed = time.perf_counter() - start
+    print(f"Matrix ready in {elapsed:.1f}s ({os.path.relpath(MATRIX_DIR)})")
+
+    scouted = roster.bot(SCOUTED_TOKEN)
+    print(f"\n\n🎯 TOP 50 NEMESES OF {scouted.id}")
+    print("-" * 80)
+    for place, (token_id, p) in enumerate(h2h.nemeses(SCOUTED_TOKEN, 50), 1):
+        bot = roster.bot(token_id)
+        print(
+            f"  {place:2}. {bot.id:20} beats it {p * 100:5.1f}% | "
+            f"S:{bot.stats.speed:2} P:{bot.stats.powerCore:2} "
+            f"A:{bot.stats.acceleration:2} St:{bot.stats.stability:2}"
+        )
+
+    print(f"\n\n✅ EASIEST OPPONENTS FOR {scouted.id}")
+    print("-" * 80)
+    for place, (token_id, p) in enumerate(h2h.easiest_opponents(SCOUTED_TOKEN, 10), 1):
+        bot = roster.bot(token_id)
+        print(f"  {place:2}. {bot.id:20} wins {p * 100:5.1f}%")
+
+    print("\n" + "=" * 80)
+
+
+if __name__ == "__main__":
+    main()
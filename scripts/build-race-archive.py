@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Import recorded completed races (data/races/*.jsonl, *.candid) into the
+columnar race archive under data/races/store/.
+
+Races already in the store are skipped, so this can be re-run after every
+new recording.
+"""
+
+import os
+import time
+from collections import Counter
+
+from pokedbots_sim.archive import RaceArchive
+from pokedbots_sim.canister import ARCHIVE_DIR, archive_files, load_races
+
+
+def main():
+    print("🗄️  RACE ARCHIVE IMPORT")
+    print("=" * 80)
+
+    paths = archive_files()
+    if not paths:
+        print(f"No recorded races under {os.path.relpath(ARCHIVE_DIR)}")
+        return
+
+    start = time.perf_counter()
+    races = load_races(paths)
+    archive = RaceArchive()
+    added = archive.append(races)
+    elapsed = time.perf_counter() - start
+    print(f"{len(races)} recorded races from {len(paths)} files, {added} new")
+    print(f"Imported in {elapsed:.2f}s")
+
+    print("\n\n📅 PARTITIONS")
+    print("-" * 80)
+    per_month = Counter()
+    chunks = Counter()
+    for meta in archive.zone_maps():
+        per_month[meta["month"]] += meta["races"]
+        chunks[meta["month"]] += 1
+    for month in sorted(per_month):
+        print(f"  {month}  {per_month[month]:8,} races in {chunks[month]} chunks")
+    print(f"  total   {sum(per_month.values()):8,} races")
+
+    print("\n" + "=" * 80)
+
+
+if __name__ == "__main__":
+    main()
@@ -12,7 +12,9 @@ System mechanics:
 - Cost formula: 0.5 + (currentStat/40)² × premiumMultiplier
 """
 
-import math
+import time
+
+from pokedbots_sim.upgrades import upgrade_distribution
 
 
 # Success rate calculation
@@ -53,89 +55,53 @@ def calculate_upgrade_cost(current_stat, rating=40):
     return base_icp * premium_multiplier
 
 
+def upgrade_run_distribution(target_successes=9, starting_stat=40):
+    """
+    Exact distribution of attempts, cost and hours for the run, from the
+    pity and cost rules above (pokedbots_sim.upgrades).
+    """
+    return upgrade_distribution(
+        calculate_success_rate,
+        calculate_upgrade_cost,
+        target_successes=target_successes,
+        starting_stat=starting_stat,
+        refund=0.5,
+        hours_per_attempt=12,
+    )
+
+
 def simulate_upgrades_to_target(target_successes=9, starting_stat=40):
     """
-    Calculate EXPECTED attempts using proper probability math.
-    For each success needed, calculate expected attempts based on success rate.
+    Calculate EXPECTED attempts, cost and time, success by success, from
+    the exact run distribution (pity included).
     Returns dict with statistics.
     """
-    total_expected_attempts = 0.0
-    total_cost_icp = 0.0
-    current_stat = starting_stat
+    dist = upgrade_run_distribution(target_successes, starting_stat)
 
     attempt_log = []
-
     for success_num in range(target_successes):
-        # For this success, we need to model expected attempts accounting for failures
-        # Expected attempts to get one success = 1 / success_rate
-        # But we need to account for pity building up
-
-        # Start with no pity
-        consecutive_fails = 0
-        success_rate = calculate_success_rate(success_num, consecutive_fails)
-        cost = calculate_upgrade_cost(current_stat)
-
-        # Calculate expected attempts for this success
-        # This is a geometric distribution problem
-        expected_attempts_for_this_success = 0.0
-        expected_cost_for_this_success = 0.0
-        cumulative_prob = 0.0
-
-        for attempt in range(
-            1, 100
-        ):  # Cap at 100 attempts (should be way more than enough)
-            # Probability of succeeding on exactly this attempt
-            # = (fail ^ (attempt-1)) * success
-            fail_rate = 1.0 - (success_rate / 100.0)
-
-            # Recalculate pity for each potential attempt
-            pity_for_attempt = min((attempt - 1), 5)  # Fails so far, capped at 5
-            actual_success_rate = calculate_success_rate(success_num, pity_for_attempt)
-            actual_success_prob = actual_success_rate / 100.0
-
-            # Probability of failing (attempt-1) times, then succeeding
-            prob_this_attempt = (fail_rate ** (attempt - 1)) * actual_success_prob
-
-            cumulative_prob += prob_this_attempt
-            expected_attempts_for_this_success += attempt * prob_this_attempt
-
-            # Cost accounting for 50% refund on failures
-            cost_this_scenario = cost * (
-                (attempt - 1) * 0.5 + 1.0
-            )  # Failures get 50% back, success pays full
-            expected_cost_for_this_success += cost_this_scenario * prob_this_attempt
-
-            # Early exit if we've covered 99.9% of probability space
-            if cumulative_prob > 0.999:
-                break
-
-        total_expected_attempts += expected_attempts_for_this_success
-        total_cost_icp += expected_cost_for_this_success
-
         attempt_log.append(
             {
                 "success_number": success_num + 1,
-                "current_stat": current_stat,
-                "base_success_rate": success_rate,
-                "expected_attempts": expected_attempts_for_this_success,
-                "expected_cost": expected_cost_for_this_success,
+                "current_stat": starting_stat + success_num,
+                "base_success_rate": calculate_success_rate(success_num, 0),
+                "expected_attempts": float(dist.stage_attempts[success_num]),
+                "expected_cost": float(dist.stage_cost[success_num]),
             }
         )
 
-        current_stat += 1
-
-    # Calculate time (12 hours per attempt)
-    total_hours = total_expected_attempts * 12
+    total_expected_attempts = dist.mean_attempts
+    total_hours = dist.mean_hours
     total_days = total_hours / 24
 
     return {
         "target_successes": target_successes,
         "starting_stat": starting_stat,
-        "final_stat": current_stat,
+        "final_stat": dist.final_stat,
         "total_attempts": round(total_expected_attempts),
         "total_hours": total_hours,
         "total_days": total_days,
-        "total_cost_icp": total_cost_icp,
+        "total_cost_icp": dist.mean_cost,
         "attempt_log": attempt_log,
     }
 
@@ -257,66 +223,63 @@ def print_results():
 
     print()
 
-    # Monte Carlo simulation
+    # Exact distribution
     print("=" * 80)
-    print("MONTE CARLO SIMULATION (10,000 runs)")
+    print("EXACT DISTRIBUTION (dynamic programming over successes x pity)")
     print("=" * 80)
     print()
-    print("Running simulation...")
-
-    mc_results = monte_carlo_simulation(9, 40, 10000)
-
-    attempts = [r["attempts"] for r in mc_results]
-    costs = [r["cost"] for r in mc_results]
-    hours = [r["hours"] for r in mc_results]
-
-    # Calculate statistics
-    avg_attempts = sum(attempts) / len(attempts)
-    median_attempts = sorted(attempts)[len(attempts) // 2]
-    min_attempts = min(attempts)
-    max_attempts = max(attempts)
-
-    avg_cost = sum(costs) / len(costs)
-    median_cost = sorted(costs)[len(costs) // 2]
-    min_cost = min(costs)
-    max_cost = max(costs)
 
-    avg_hours = sum(hours) / len(hours)
+    dist = upgrade_run_distribution(9, 40)
+
+    def attempts_at(q):
+        return int(dist.attempts_quantile(q))
+
+    avg_attempts = dist.mean_attempts
+    median_attempts = attempts_at(0.5)
+    min_attempts = int(dist.attempts_pmf.nonzero()[0][0])
+    p25_attempts = attempts_at(0.25)
+    p75_attempts = attempts_at(0.75)
+    p90_attempts = attempts_at(0.90)
+    p99_attempts = attempts_at(0.99)
+    p999_attempts = attempts_at(0.999)
+
+    avg_cost = dist.mean_cost
+    median_cost = dist.cost_quantile(0.5)
+    min_cost = dist.base_cost
+    p25_cost = dist.cost_quantile(0.25)
+    p75_cost = dist.cost_quantile(0.75)
+    p90_cost = dist.cost_quantile(0.90)
+    p99_cost = dist.cost_quantile(0.99)
+
+    avg_hours = dist.mean_hours
     avg_days = avg_hours / 24
 
-    # Percentiles
-    sorted_attempts = sorted(attempts)
-    p25_attempts = sorted_attempts[int(len(attempts) * 0.25)]
-    p75_attempts = sorted_attempts[int(len(attempts) * 0.75)]
-    p90_attempts = sorted_attempts[int(len(attempts) * 0.90)]
-
-    sorted_costs = sorted(costs)
-    p25_cost = sorted_costs[int(len(costs) * 0.25)]
-    p75_cost = sorted_costs[int(len(costs) * 0.75)]
-    p90_cost = sorted_costs[int(len(costs) * 0.90)]
-
     print(f"ATTEMPTS:")
     print(f"  Average:       {avg_attempts:.1f}")
     print(f"  Median:        {median_attempts}")
     print(f"  Min:           {min_attempts}")
-    print(f"  Max:           {max_attempts}")
     print(f"  25th %ile:     {p25_attempts}")
     print(f"  75th %ile:     {p75_attempts}")
     print(f"  90th %ile:     {p90_attempts}")
+    print(f"  99th %ile:     {p99_attempts}")
+    print(f"  99.9th %ile:   {p999_attempts}")
     print()
 
     print(f"COST (ICP):")
     print(f"  Average:       {avg_cost:.2f}")
     print(f"  Median:        {median_cost:.2f}")
     print(f"  Min:           {min_cost:.2f}")
-    print(f"  Max:           {max_cost:.2f}")
     print(f"  25th %ile:     {p25_cost:.2f}")
     print(f"  75th %ile:     {p75_cost:.2f}")
     print(f"  90th %ile:     {p90_cost:.2f}")
+    print(f"  99th %ile:     {p99_cost:.2f}")
     print()
 
     print(f"TIME:")
     print(f"  Average:       {avg_hours:.0f} hours ({avg_days:.1f} days)")
+    print(f"  Median:        {dist.hours_quantile(0.5):.0f} hours")
+    print(f"  90th %ile:     {dist.hours_quantile(0.90):.0f} hours")
+    print(f"  99th %ile:     {dist.hours_quantile(0.99):.0f} hours")
     print(f"  With back-to-back upgrades (no delays)")
     print()
 
@@ -324,21 +287,26 @@ def print_results():
     print("ATTEMPTS DISTRIBUTION:")
     print("-" * 80)
 
-    from collections import Counter
-
-    attempt_counts = Counter(attempts)
-    max_count = max(attempt_counts.values())
+    max_share = dist.attempts_pmf.max()
 
-    for attempt in range(min_attempts, min(max_attempts + 1, 30)):
-        count = attempt_counts.get(attempt, 0)
-        bar_length = int((count / max_count) * 50)
-        percentage = (count / len(attempts)) * 100
+    for attempt in range(min_attempts, min(p999_attempts + 1, 30)):
+        share = dist.attempts_pmf[attempt]
+        bar_length = int((share / max_share) * 50)
         bar = "█" * bar_length
-        print(f"{attempt:3d} attempts | {bar:<50} {percentage:5.1f}%")
+        print(f"{attempt:3d} attempts | {bar:<50} {share * 100:5.1f}%")
 
-    if max_attempts > 30:
-        print(f"... (some runs took up to {max_attempts} attempts)")
+    if p999_attempts >= 30:
+        print(f"... (1 run in 1000 takes {p999_attempts}+ attempts)")
+
+    print()
 
+    # Query speed: percentiles come from the precomputed CDFs
+    queries = 10_000
+    start = time.perf_counter()
+    for _ in range(queries):
+        dist.percentiles((0.5, 0.9, 0.99))
+    per_query = (time.perf_counter() - start) / queries * 1e6
+    print(f"p50/p90/p99 of attempts, cost and hours: {per_query:.1f} µs per query")
     print()
 
     # Key findings
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Capture parity fixtures from the racing canister's debug_simulate_race
+(RacingSimulator.simulateRaceSegmented) into data/parity/.
+
+Needs dfx and network access. The Python reference corpus
+(python-reference.jsonl) is written once if it does not exist yet; it is
+never regenerated, so later engine changes show up as parity drift.
+"""
+
+import os
+import shutil
+import subprocess
+import time
+
+from pokedbots_sim import TRACKS
+from pokedbots_sim.canister import STAT_KEYS, DfxCanister
+from pokedbots_sim.parity import (
+    PARITY_DIR,
+    REFERENCE_CORPUS,
+    ParityCase,
+    finishing_order,
+    reference_corpus,
+    write_corpus,
+)
+
+# Bots raced in every captured track (must be initialized on the canister)
+TOKEN_INDICES = [737, 4079, 4343, 8631, 4829, 1, 2, 3]
+SEEDS = [12345, 424242, 999983, 31337]
+
+
+def capture_track(canister, track_id, seed):
+    reply = canister.debug_simulate_race(track_id, TOKEN_INDICES, seed)
+    if reply is None:
+        return None
+
+    participants = reply["participants"]
+    token_ids = [p["tokenIndex"] for p in participants]
+    stats = [[p["stats"][name] for name in STAT_KEYS] for p in participants]
+    finals = {r["tokenIndex"]: r["finalTime"] for r in reply["results"]}
+    times = [finals[t] for t in token_ids]
+    return ParityCase(
+        id=f"motoko-track{track_id}-s{seed}",
+        kind="track",
+        engine="segmented",
+        token_ids=token_ids,
+        stats=stats,
+        times=times,
+        order=finishing_order(times),
+        source="motoko:debug_simulate_race",
+        track_id=track_id,
+        seed=seed,
+    )
+
+
+def main():
+    print("📼 PARITY CORPUS CAPTURE")
+    print("=" * 80)
+
+    if not os.path.exists(REFERENCE_CORPUS):
+        cases = reference_corpus()
+        write_corpus(REFERENCE_CORPUS, cases)
+        print(f"Wrote {len(cases)} Python reference fixtures")
+
+    if shutil.which("dfx") is None:
+        print("dfx not found; skipping canister capture")
+        print("\n" + "=" * 80)
+        return
+
+    canister = DfxCanister()
+    cases = []
+    for track_id in sorted(TRACKS):
+        for seed in SEEDS:
+            try:
+                case = capture_track(canister, track_id, seed)
+            except (OSError, subprocess.CalledProcessError) as e:
+                print(f"  Track {track_id} seed {seed}: capture failed ({e})")
+                continue
+            if case is None:
+                print(f"  Track {track_id} seed {seed}: no result")
+                continue
+            cases.append(case)
+            print(f"  Track {track_id} seed {seed}: {len(case.times)} times")
+
+    if cases:
+        stamp = time.strftime("%Y%m%d", time.gmtime())
+        path = os.path.join(PARITY_DIR, f"motoko-{stamp}.jsonl")
+        write_corpus(path, cases)
+        print(f"\nWrote {len(cases)} canister fixtures to {os.path.relpath(path)}")
+
+    print("\n" + "=" * 80)
+
+
+if __name__ == "__main__":
+    main()
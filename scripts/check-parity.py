@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Check every Python engine variant against the stored parity corpus
+(data/parity/*.jsonl); runs offline.
+
+Fixtures with a python:* source only show the Python variants agree with
+the Python scalar engines, whose legacy-v1 / hashed-v2 times include a
+stat-synergy term Motoko calculateRaceTime does not have; only
+motoko:* fixtures compare against the canister.
+"""
+
+import os
+import sys
+import time
+
+from pokedbots_sim.parity import (
+    PARITY_DIR,
+    check_corpus,
+    corpus_files,
+    load_corpus,
+)
+
+
+def main():
+    print("🔬 ENGINE PARITY CHECK")
+    print("=" * 80)
+
+    paths = corpus_files()
+    if not paths:
+        print(f"No corpus files in {os.path.relpath(PARITY_DIR)}")
+        return 1
+
+    failed = False
+    for path in paths:
+        cases = load_corpus(path)
+        sources = sorted({case.source for case in cases})
+        print(f"\n📁 {os.path.basename(path)}: {len(cases)} fixtures")
+        print(f"   Sources: {', '.join(sources)}")
+        if not any(source.startswith("motoko:") for source in sources):
+            print(
+                "   ⚠️  Python-reference fixtures only: this checks the variants "
+                "against each other,\n"
+                "      not against Motoko (legacy-v1 / hashed-v2 add a "
+                "Python-only stat synergy)"
+            )
+        print("-" * 80)
+
+        start = time.perf_counter()
+        reports = check_corpus(cases)
+        elapsed = time.perf_counter() - start
+
+        for report in reports.values():
+            if report.variant == "parallel":
+                detail = f"order only, {report.skipped} skipped"
+            else:
+                detail = (
+                    f"max ULP {report.max_ulp:>6} | "
+                    f"max rel error {report.max_rel_error:.3e}"
+                )
+            status = "✅" if report.exact else "❌"
+            print(
+                f"  {status} {report.variant:10} {report.cases:5} races "
+                f"{report.cells:6} times | {detail} | "
+                f"{len(report.order_mismatches)} order mismatches"
+            )
+            if report.worst_case:
+                print(f"     worst fixture: {report.worst_case}")
+            for case_id in report.order_mismatches[:5]:
+                print(f"     order differs: {case_id}")
+            failed = failed or not report.exact
+        print(f"  Checked in {elapsed:.2f}s")
+
+    print("\n" + "=" * 80)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
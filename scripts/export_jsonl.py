@@ -6,22 +6,11 @@ Export PokedBots stats as JSONL (one bot per line).
 import json
 from pathlib import Path
 
-# Load the raw stats.json file
-input_file = Path(__file__).parent.parent / "data" / "stats.json"
-with open(input_file, "r") as f:
-    data = json.load(f)
-
-# Parse schema and bots
-schema_raw = data[0]
-bots_raw = data[1]
+from pokedbots_sim import load_stats_json
 
-# Build trait schema
-traits_schema = {}
-for trait_data in schema_raw:
-    trait_id = trait_data[0]
-    trait_name = trait_data[1]
-    trait_values = {v[0]: v[1] for v in trait_data[2]}
-    traits_schema[trait_id] = {"name": trait_name, "values": trait_values}
+# Load the raw stats.json file (schema + encoded bots, via the column cache)
+input_file = Path(__file__).parent.parent / "data" / "stats.json"
+table = load_stats_json(str(input_file))
 
 
 # Convert trait names to snake_case
@@ -33,23 +22,11 @@ def to_snake_case(name):
 # Write JSONL file
 output_file = Path(__file__).parent.parent / "pokedbots_stats.jsonl"
 with open(output_file, "w") as f:
-    for bot_entry in bots_raw:
-        bot_id = bot_entry[0]
-        bot_traits_raw = bot_entry[1]
-
-        # Build bot object with snake_case keys
-        bot = {"id": bot_id}
-
-        for trait_id, value_id in bot_traits_raw:
-            trait_info = traits_schema[trait_id]
-            trait_name_snake = to_snake_case(trait_info["name"])
-            trait_value = trait_info["values"][value_id]
-            bot[trait_name_snake] = trait_value
-
+    for bot in table.records(key=to_snake_case):
         # Write as single line JSON
         f.write(json.dumps(bot) + "\n")
 
-print(f"✅ Successfully exported {len(bots_raw)} bots to: {output_file}")
+print(f"✅ Successfully exported {len(table)} bots to: {output_file}")
 print(f"📊 File size: {output_file.stat().st_size / 1024 / 1024:.2f} MB")
 print(f"\n📝 Sample bot (first line):")
 
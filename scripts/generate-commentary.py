@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Bulk-generate race commentary timelines offline (simulateRaceSegmented
+events) for Jesse's bots against a mixed field
+"""
+
+import json
+import os
+import time
+from collections import Counter
+
+from pokedbots_sim import iter_segmented_races, load_roster, standard_schedule
+from pokedbots_sim.data import CACHE_DIR
+
+NUM_RACES = 5000
+FIELD_TOKENS = [737, 4079, 4343, 8631, 4829, 1, 2, 3]
+TIMELINES_PATH = os.path.join(CACHE_DIR, "commentary", "timelines.jsonl")
+
+
+def main():
+    print("🎙️  RACE COMMENTARY TIMELINES")
+    print("=" * 80)
+
+    roster = load_roster()
+    field = roster.take(roster.rows_of(FIELD_TOKENS))
+    races = standard_schedule(NUM_RACES)
+
+    counts = Counter()
+    wins = Counter()
+    os.makedirs(os.path.dirname(TIMELINES_PATH), exist_ok=True)
+    start = time.perf_counter()
+    with open(TIMELINES_PATH, "w") as f:
+        for i, race in enumerate(iter_segmented_races(races, field)):
+            wins[race.winner] += 1
+            counts.update(e.event_type for e in race.events)
+            row = {
+                "raceId": int(races.race_id[i]),
+                "trackId": race.track_id,
+                "trackSeed": race.track_seed,
+                "results": [
+                    {"nftId": race.nft_ids[j], "finalTime": float(race.times[j])}
+                    for j in race.order.tolist()
+                ],
+                "events": [
+                    {
+                        "type": e.event_type,
+                        "timestamp": e.timestamp,
+                        "segmentIndex": e.segment_index,
+                        "description": e.description,
+                    }
+                    for e in race.events
+                ],
+            }
+            f.write(json.dumps(row) + "\n")
+            if i == 0:
+                sample = race
+    elapsed = time.perf_counter() - start
+
+    print(f"{NUM_RACES} races in {elapsed:.2f}s ({NUM_RACES / elapsed:,.0f} races/s)")
+    print(f"Timelines written to {os.path.relpath(TIMELINES_PATH)}")
+
+    print(f"\n\n📻 SAMPLE TIMELINE (track {sample.track_id})")
+    print("-" * 80)
+    for event in sample.events:
+        print(f"  {event.timestamp:7.2f}s  {event.description}")
+
+    print("\n\n📊 EVENTS PER RACE")
+    print("-" * 80)
+    for event_type, count in counts.most_common():
+        print(f"  {event_type:24} {count / NUM_RACES:6.2f}")
+
+    print("\n\n🏆 WINS")
+    print("-" * 80)
+    for nft_id, count in wins.most_common():
+        print(f"  Bot {nft_id:6} {count:5} ({count / NUM_RACES * 100:5.1f}%)")
+
+    print("\n" + "=" * 80)
+
+
+if __name__ == "__main__":
+    main()
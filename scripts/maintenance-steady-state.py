@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Exact long-run maintenance costs per bot (pokedbots_sim.maintenance).
+
+Solves the battery/condition Markov chain of each analyze-economics.py
+Scenario 1 bot under a grid of recharge / repair thresholds and prints
+recharges and repairs per race, maintenance ICP per race and per day, and
+net ICP per day, all without sampling. Each bot is solved in the class its
+wins carry it to in the long run.
+"""
+
+import time
+
+from pokedbots_sim.economy import MIXED_FLEET
+from pokedbots_sim.maintenance import steady_state
+
+RACES_PER_DAY = 4
+THRESHOLDS = [(30, 30), (40, 40), (50, 50), (60, 60), (70, 70), (50, 30), (70, 40)]
+
+
+def main():
+    print("🔋 STEADY-STATE MAINTENANCE COSTS")
+    print("=" * 80)
+
+    start = time.perf_counter()
+    solved = 0
+    for i, (stats, wins) in enumerate(MIXED_FLEET, 1):
+        print(f"\n\n🤖 BOT {i}: stats {stats}, {wins} wins, {RACES_PER_DAY} races/day")
+        print("-" * 80)
+        print(
+            f"  {'Recharge<':>9} {'Repair<':>7} | {'Recharges/race':>14} "
+            f"{'Repairs/race':>12} {'ICP/race':>8} | {'Maint/day':>9} "
+            f"{'Net/day':>8} {'Class':>10}"
+        )
+        for recharge_below, repair_below in THRESHOLDS:
+            ss = steady_state(stats, wins, RACES_PER_DAY, recharge_below, repair_below)
+            solved += 1
+            print(
+                f"  {recharge_below:9} {repair_below:7} | "
+                f"{ss.recharges_per_race:14.4f} {ss.repairs_per_race:12.4f} "
+                f"{ss.maintenance_per_race:8.4f} | "
+                f"{ss.maintenance_per_day:9.4f} {ss.net_per_day:8.4f} "
+                f"{ss.race_class:>10}"
+            )
+    elapsed = time.perf_counter() - start
+    print(f"\n{solved} policies solved exactly in {elapsed:.2f}s")
+
+    print("\n" + "=" * 80)
+
+
+if __name__ == "__main__":
+    main()
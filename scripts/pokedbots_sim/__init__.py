@@ -0,0 +1,185 @@
+"""
+pokedbots_sim - Python race simulation engines for the analysis scripts.
+
+Engines are selected by name (see ENGINES): "legacy-v1", "hashed-v2" and
+"segmented". Requires numpy for the array-based engines.
+"""
+
+from .data import (
+    build_caches,
+    load_real_bots,
+    load_roster,
+    load_stats_json,
+    load_trait_rows,
+)
+from .economy import (
+    LIVE_ECONOMY,
+    EconomyConstants,
+    FleetResults,
+    Fleets,
+    fleet_grid,
+    simulate_fleets,
+)
+from .engine import (
+    DEFAULT_ENGINE,
+    ENGINES,
+    calculate_race_time,
+    calculate_race_time_legacy,
+    get_engine,
+    race_times,
+    race_winner,
+    rank_race,
+    rank_times,
+    simulate_race,
+)
+from .events import (
+    RaceEvent,
+    SegmentedRace,
+    filter_events,
+    iter_segmented_races,
+    simulate_race_segmented,
+    simulate_track_race,
+)
+from .headtohead import (
+    HeadToHead,
+    build_head_to_head,
+    head_to_head_schedule,
+    open_head_to_head,
+)
+from .incremental import FieldCache, WhatIf, field_cache
+from .maintenance import MaintenancePolicy, SteadyState, solve_policy, steady_state
+from .montecarlo import RaceTally, run_monte_carlo, tally_races
+from .models import (
+    DISTANCES,
+    RACE_CLASSES,
+    STAT_NAMES,
+    TERRAINS,
+    Bot,
+    RaceConfig,
+    RacingStats,
+)
+from .response import TrackResponse, score_tracks, track_response
+from .roster import BotRoster, BotView, StatsView
+from .segmented import (
+    calculate_race_time_segmented,
+    calculate_segment_time,
+    simulate_segments,
+    simulate_track,
+)
+from .stream import FieldAggregator, RunningStats, iter_race_blocks, iter_schedule
+from .traits import TraitTable
+from .segmented_vectorized import (
+    LIVE_CONSTANTS,
+    CompiledTrack,
+    SegmentConstants,
+    compile_track,
+    marginal_value_sweep,
+    momentum_terms,
+    paired_race_times,
+    race_time_tensor,
+    segment_time_tensor,
+    segmented_race_time_matrix,
+)
+from .tracks import TRACKS, TrackTemplate, get_track, select_track_for_race
+from .upgrades import UpgradeDistribution, upgrade_distribution
+from .vectorized import (
+    FieldTables,
+    RaceBatch,
+    finish_order,
+    race_time_matrix,
+    standard_schedule,
+    stats_matrix,
+)
+from .winprob import WinEstimate, estimate_cell, monte_carlo_check, rank_collection
+
+__all__ = [
+    "Bot",
+    "BotRoster",
+    "BotView",
+    "CompiledTrack",
+    "DEFAULT_ENGINE",
+    "DISTANCES",
+    "ENGINES",
+    "EconomyConstants",
+    "FieldAggregator",
+    "FieldCache",
+    "FieldTables",
+    "FleetResults",
+    "Fleets",
+    "HeadToHead",
+    "LIVE_CONSTANTS",
+    "LIVE_ECONOMY",
+    "MaintenancePolicy",
+    "RACE_CLASSES",
+    "RaceBatch",
+    "RaceConfig",
+    "RaceEvent",
+    "RaceTally",
+    "RacingStats",
+    "RunningStats",
+    "STAT_NAMES",
+    "SegmentConstants",
+    "SegmentedRace",
+    "StatsView",
+    "SteadyState",
+    "TERRAINS",
+    "TRACKS",
+    "TraitTable",
+    "TrackResponse",
+    "TrackTemplate",
+    "UpgradeDistribution",
+    "WhatIf",
+    "WinEstimate",
+    "build_caches",
+    "build_head_to_head",
+    "calculate_race_time",
+    "calculate_race_time_legacy",
+    "calculate_race_time_segmented",
+    "calculate_segment_time",
+    "compile_track",
+    "estimate_cell",
+    "field_cache",
+    "filter_events",
+    "finish_order",
+    "fleet_grid",
+    "get_engine",
+    "get_track",
+    "head_to_head_schedule",
+    "iter_race_blocks",
+    "iter_schedule",
+    "iter_segmented_races",
+    "load_real_bots",
+    "load_roster",
+    "load_stats_json",
+    "load_trait_rows",
+    "marginal_value_sweep",
+    "momentum_terms",
+    "monte_carlo_check",
+    "open_head_to_head",
+    "paired_race_times",
+    "race_time_matrix",
+    "race_time_tensor",
+    "race_times",
+    "race_winner",
+    "rank_collection",
+    "rank_race",
+    "rank_times",
+    "run_monte_carlo",
+    "score_tracks",
+    "segment_time_tensor",
+    "segmented_race_time_matrix",
+    "select_track_for_race",
+    "simulate_fleets",
+    "simulate_race",
+    "simulate_race_segmented",
+    "simulate_segments",
+    "simulate_track",
+    "simulate_track_race",
+    "solve_policy",
+    "standard_schedule",
+    "stats_matrix",
+    "steady_state",
+    "tally_races",
+    "track_response",
+    "upgrade_distribution",
+]
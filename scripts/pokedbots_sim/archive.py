@@ -0,0 +1,472 @@
+"""
+Columnar store for completed races (data/races/store/).
+
+Races are appended in immutable chunks, partitioned by month (YYYYMM of
+the race's startTime, or of the day it was archived when the record has
+none):
+
+    store/202610/chunk-00000.bin
+    store/202610/chunk-00001.bin
+    store/202611/chunk-00000.bin
+
+Each chunk is a column cache file (cache.py: JSON header + aligned raw
+arrays, memory-mapped on read) with rows at three levels:
+
+    race    month, race_id, track_id, track_seed, terrain, race_class,
+            distance, start_time, name
+    entry   token_id, position, final_time (one row per result, in
+            finishing order)
+    event   event_type, timestamp, segment_index, description
+
+entry_start / event_start give each race's first row at the entry / event
+level (with a closing row). Terrain, class and event type are stored as
+int8 codes into TERRAINS / RACE_CLASSES / EVENT_TYPES (-1 unknown); text
+is UTF-8 bytes plus offsets, decoded only when asked for.
+
+The chunk header carries zone maps (month, raceId range, trackIds,
+terrains, classes, token range) next to a sorted `tokens` column, so
+scan() drops partitions and chunks on month / trackId / terrain / class /
+tokenId from the headers alone, and only slices the columns requested
+from the chunks that remain.
+"""
+
+import os
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+
+from .cache import read_columns, read_header, write_columns
+from .canister import ARCHIVE_DIR, race_record
+from .events import (
+    CLOSE_RACING,
+    EXCEPTIONAL_PERFORMANCE,
+    LARGE_GAP,
+    LEAD_CHANGE,
+    OVERTAKE,
+    POOR_PERFORMANCE,
+    SEGMENT_COMPLETE,
+)
+from .models import RACE_CLASSES, TERRAINS
+from .tracks import TRACKS
+
+STORE_DIR = os.path.join(ARCHIVE_DIR, "store")
+CHUNK_RACES = 50_000
+
+EVENT_TYPES = [
+    OVERTAKE,
+    LEAD_CHANGE,
+    LARGE_GAP,
+    CLOSE_RACING,
+    EXCEPTIONAL_PERFORMANCE,
+    POOR_PERFORMANCE,
+    SEGMENT_COMPLETE,
+]
+
+RACE_COLUMNS = (
+    "month",
+    "race_id",
+    "track_id",
+    "track_seed",
+    "terrain",
+    "race_class",
+    "distance",
+    "start_time",
+    "name",
+)
+ENTRY_COLUMNS = ("token_id", "position", "final_time")
+EVENT_COLUMNS = ("event_type", "timestamp", "segment_index", "description")
+ALL_COLUMNS = RACE_COLUMNS + ENTRY_COLUMNS + EVENT_COLUMNS
+
+# dtype of every readable column (text decodes to object arrays)
+COLUMN_DTYPES = {
+    "month": np.int32,
+    "race_id": np.int64,
+    "track_id": np.int16,
+    "track_seed": np.uint64,
+    "terrain": np.int8,
+    "race_class": np.int8,
+    "distance": np.int16,
+    "start_time": np.int64,
+    "name": object,
+    "token_id": np.int32,
+    "position": np.int16,
+    "final_time": np.float64,
+    "event_type": np.int8,
+    "timestamp": np.float64,
+    "segment_index": np.int32,
+    "description": object,
+}
+
+Filter = Union[None, int, str, Iterable]
+
+
+# ===== ENCODING =====
+
+
+def _encode_text(values: Sequence[str], name: str) -> Dict[str, np.ndarray]:
+    blobs = [v.encode("utf-8") for v in values]
+    offsets = np.zeros(len(blobs) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in blobs], out=offsets[1:])
+    return {
+        f"{name}_bytes": np.frombuffer(b"".join(blobs), dtype=np.uint8),
+        f"{name}_offsets": offsets,
+    }
+
+
+def _decode_text(columns: Dict[str, np.ndarray], name: str, rows) -> np.ndarray:
+    data = columns[f"{name}_bytes"]
+    offsets = columns[f"{name}_offsets"]
+    out = np.empty(len(rows), dtype=object)
+    for i, row in enumerate(rows.tolist()):
+        out[i] = bytes(data[offsets[row] : offsets[row + 1]]).decode("utf-8")
+    return out
+
+
+def _code(names: List[str], value: Optional[str]) -> int:
+    return names.index(value) if value in names else -1
+
+
+def month_of(start_time_ns: int) -> int:
+    """YYYYMM (UTC) of a nanosecond timestamp, like Leaderboard.getMonthIdFromTime"""
+    t = time.gmtime(start_time_ns // 1_000_000_000)
+    return t.tm_year * 100 + t.tm_mon
+
+
+def _chunk_columns(races: List[dict]) -> Dict[str, np.ndarray]:
+    """Column arrays for normalized race records (race_record())"""
+    terrains, classes = [], []
+    for race in races:
+        terrain = race.get("terrain")
+        if terrain is None and race["trackId"] in TRACKS:
+            terrain = TRACKS[race["trackId"]].primary_terrain
+        terrains.append(_code(TERRAINS, terrain))
+        classes.append(_code(RACE_CLASSES, race.get("raceClass")))
+
+    results = [r for race in races for r in race["results"]]
+    events = [e for race in races for e in race.get("events", ())]
+    columns = {
+        "race_id": np.array([r["raceId"] for r in races], dtype=np.int64),
+        "track_id": np.array([r["trackId"] for r in races], dtype=np.int16),
+        "track_seed": np.array([r["trackSeed"] for r in races], dtype=np.uint64),
+        "terrain": np.array(terrains, dtype=np.int8),
+        "race_class": np.array(classes, dtype=np.int8),
+        "distance": np.array([r.get("distance", 0) for r in races], dtype=np.int16),
+        "start_time": np.array([r.get("startTime", 0) for r in races], dtype=np.int64),
+        "entry_start": np.zeros(len(races) + 1, dtype=np.int64),
+        "event_start": np.zeros(len(races) + 1, dtype=np.int64),
+        "token_id": np.array([int(r["nftId"]) for r in results], dtype=np.int32),
+        "position": np.array([r["position"] for r in results], dtype=np.int16),
+        "final_time": np.array([r["finalTime"] for r in results], dtype=np.float64),
+        "event_type": np.array(
+            [_code(EVENT_TYPES, e["type"]) for e in events], dtype=np.int8
+        ),
+        "timestamp": np.array([e["timestamp"] for e in events], dtype=np.float64),
+        "segment_index": np.array([e["segmentIndex"] for e in events], dtype=np.int32),
+    }
+    np.cumsum([len(r["results"]) for r in races], out=columns["entry_start"][1:])
+    np.cumsum([len(r.get("events", ())) for r in races], out=columns["event_start"][1:])
+    columns.update(_encode_text([r["name"] for r in races], "name"))
+    columns.update(_encode_text([e["description"] for e in events], "description"))
+    columns["tokens"] = np.unique(columns["token_id"])
+    return columns
+
+
+def _zone_map(month: int, columns: Dict[str, np.ndarray]) -> dict:
+    tokens = columns["tokens"]
+    return {
+        "month": month,
+        "races": len(columns["race_id"]),
+        "entries": len(columns["token_id"]),
+        "events": len(columns["event_type"]),
+        "race_id": [int(columns["race_id"].min()), int(columns["race_id"].max())],
+        "track_ids": np.unique(columns["track_id"]).tolist(),
+        "terrains": np.unique(columns["terrain"]).tolist(),
+        "race_classes": np.unique(columns["race_class"]).tolist(),
+        "token_range": [int(tokens[0]), int(tokens[-1])] if len(tokens) else None,
+    }
+
+
+# ===== QUERIES =====
+
+
+def _values(value: Filter, names: Optional[List[str]] = None) -> Optional[np.ndarray]:
+    """A scalar or collection filter as an array of codes (None: no filter)"""
+    if value is None:
+        return None
+    if isinstance(value, (str, int, np.integer)):
+        value = [value]
+    values = list(value)
+    if names is not None:
+        unknown = [v for v in values if v not in names]
+        if unknown:
+            raise ValueError(
+                f"Unknown values {unknown} (expected one of: {', '.join(names)})"
+            )
+        values = [names.index(v) for v in values]
+    return np.array(values, dtype=np.int64)
+
+
+def _ranges(starts: np.ndarray, rows: np.ndarray) -> np.ndarray:
+    """Row ranges starts[r]:starts[r + 1] of the given rows, concatenated"""
+    begin = starts[rows]
+    lengths = starts[rows + 1] - begin
+    run = np.repeat(np.arange(len(rows)), lengths)
+    run_offset = np.cumsum(lengths) - lengths
+    return begin[run] + np.arange(int(lengths.sum())) - run_offset[run]
+
+
+def _rebase(starts: np.ndarray, rows: np.ndarray) -> np.ndarray:
+    out = np.zeros(len(rows) + 1, dtype=np.int64)
+    np.cumsum(starts[rows + 1] - starts[rows], out=out[1:])
+    return out
+
+
+@dataclass
+class RaceChunk:
+    """
+    Selected races; columns hold the requested columns, each at its own
+    row level. entry_start / event_start are rebased to these races.
+    """
+
+    columns: Dict[str, np.ndarray]
+    entry_start: np.ndarray
+    event_start: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.entry_start) - 1
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    def entry_race(self) -> np.ndarray:
+        """Race row of every entry row"""
+        return np.repeat(np.arange(len(self)), np.diff(self.entry_start))
+
+    def event_race(self) -> np.ndarray:
+        """Race row of every event row"""
+        return np.repeat(np.arange(len(self)), np.diff(self.event_start))
+
+
+def _column_list(columns: Optional[Sequence[str]]) -> List[str]:
+    columns = list(ALL_COLUMNS if columns is None else columns)
+    unknown = set(columns) - set(ALL_COLUMNS)
+    if unknown:
+        raise ValueError(f"Unknown archive columns: {sorted(unknown)}")
+    return columns
+
+
+def concat_chunks(
+    chunks: Sequence[RaceChunk], columns: Optional[Sequence[str]] = None
+) -> RaceChunk:
+    """
+    One RaceChunk holding the races of several, in order. With no chunks
+    the result has zero races and an empty array of the right dtype for
+    each of `columns` (all columns by default).
+    """
+    if not chunks:
+        return RaceChunk(
+            {
+                name: np.empty(0, dtype=COLUMN_DTYPES[name])
+                for name in _column_list(columns)
+            },
+            np.zeros(1, dtype=np.int64),
+            np.zeros(1, dtype=np.int64),
+        )
+
+    def starts(name):
+        parts = [getattr(c, name) for c in chunks]
+        shifts = np.cumsum([0] + [p[-1] for p in parts[:-1]])
+        return np.concatenate(
+            [parts[0][:1]] + [p[1:] + shift for p, shift in zip(parts, shifts)]
+        )
+
+    columns = {
+        name: np.concatenate([c.columns[name] for c in chunks])
+        for name in chunks[0].columns
+    }
+    return RaceChunk(columns, starts("entry_start"), starts("event_start"))
+
+
+class RaceArchive:
+    """
+    Month-partitioned chunk store of completed races.
+
+    Args:
+        root: store directory
+        chunk_races: most races written to one chunk file
+    """
+
+    def __init__(self, root: str = STORE_DIR, chunk_races: int = CHUNK_RACES):
+        self.root = root
+        self.chunk_races = chunk_races
+
+    def months(self) -> List[int]:
+        try:
+            names = os.listdir(self.root)
+        except FileNotFoundError:
+            return []
+        return sorted(int(n) for n in names if n.isdigit() and len(n) == 6)
+
+    def chunk_paths(self, months: Filter = None) -> List[str]:
+        wanted = _values(months)
+        paths = []
+        for month in self.months():
+            if wanted is not None and month not in wanted:
+                continue
+            directory = os.path.join(self.root, str(month))
+            names = sorted(n for n in os.listdir(directory) if n.endswith(".bin"))
+            paths.extend(os.path.join(directory, n) for n in names)
+        return paths
+
+    def zone_maps(self, months: Filter = None) -> List[dict]:
+        """Header metadata of every chunk (no column data is read)"""
+        return [read_header(path)[0]["meta"] for path in self.chunk_paths(months)]
+
+    def __len__(self) -> int:
+        return sum(meta["races"] for meta in self.zone_maps())
+
+    def race_ids(self) -> np.ndarray:
+        ids = [read_columns(p)[0]["race_id"] for p in self.chunk_paths()]
+        return np.concatenate(ids) if ids else np.zeros(0, dtype=np.int64)
+
+    # ===== WRITING =====
+
+    def append(self, races: Iterable[dict], month: Optional[int] = None) -> int:
+        """
+        Add races not archived yet; returns how many were written.
+
+        Records may be raw canister or archive records (see race_record()).
+        month partitions records without a startTime (default: this month).
+        """
+        if month is None:
+            month = month_of(time.time_ns())
+        known = set(self.race_ids().tolist())
+        by_month: Dict[int, List[dict]] = {}
+        for race in races:
+            race = race_record(race)
+            if race["raceId"] in known:
+                continue
+            known.add(race["raceId"])
+            start = race.get("startTime")
+            by_month.setdefault(month_of(start) if start else month, []).append(race)
+
+        for part, rows in sorted(by_month.items()):
+            directory = os.path.join(self.root, str(part))
+            os.makedirs(directory, exist_ok=True)
+            index = sum(n.endswith(".bin") for n in os.listdir(directory))
+            for i in range(0, len(rows), self.chunk_races):
+                columns = _chunk_columns(rows[i : i + self.chunk_races])
+                path = os.path.join(directory, f"chunk-{index:05d}.bin")
+                write_columns(path, columns, _zone_map(part, columns), {})
+                index += 1
+        return sum(len(rows) for rows in by_month.values())
+
+    # ===== READING =====
+
+    def scan(
+        self,
+        columns: Optional[Sequence[str]] = None,
+        months: Filter = None,
+        **filters,
+    ) -> Iterator[RaceChunk]:
+        """
+        Matching races, one RaceChunk per chunk file with any (filters as
+        for read_chunk())
+        """
+        for path in self.chunk_paths(months):
+            chunk = read_chunk(path, columns, **filters)
+            if chunk is not None:
+                yield chunk
+
+    def read(self, columns: Optional[Sequence[str]] = None, **filters) -> RaceChunk:
+        """scan() gathered into one RaceChunk (empty columns if nothing matches)"""
+        columns = _column_list(columns)
+        return concat_chunks(list(self.scan(columns, **filters)), columns)
+
+
+def read_chunk(
+    path: str,
+    columns: Optional[Sequence[str]] = None,
+    track_id: Filter = None,
+    terrain: Filter = None,
+    race_class: Filter = None,
+    token_id: Filter = None,
+) -> Optional[RaceChunk]:
+    """
+    Matching races of one chunk file, None when there are none. Filters
+    take one value or a collection (terrain / race_class by name); token_id
+    keeps the races a token entered.
+    """
+    columns = _column_list(columns)
+    tracks = _values(track_id)
+    terrains = _values(terrain, TERRAINS)
+    classes = _values(race_class, RACE_CLASSES)
+    tokens = _values(token_id)
+
+    meta = read_header(path)[0]["meta"]
+    if not _may_match(meta, tracks, terrains, classes, tokens):
+        return None
+    data = read_columns(path)[0]
+    if tokens is not None and not np.isin(tokens, data["tokens"]).any():
+        return None
+
+    keep = np.ones(meta["races"], dtype=bool)
+    if tracks is not None:
+        keep &= np.isin(data["track_id"], tracks)
+    if terrains is not None:
+        keep &= np.isin(data["terrain"], terrains)
+    if classes is not None:
+        keep &= np.isin(data["race_class"], classes)
+    if tokens is not None:
+        entered = np.zeros(meta["races"], dtype=bool)
+        hits = np.flatnonzero(np.isin(data["token_id"], tokens))
+        entered[np.searchsorted(data["entry_start"], hits, "right") - 1] = True
+        keep &= entered
+    rows = np.flatnonzero(keep)
+    if not len(rows):
+        return None
+    return _select(meta["month"], data, columns, rows)
+
+
+def _may_match(meta: dict, tracks, terrains, classes, tokens) -> bool:
+    """Zone-map check: can the chunk hold a matching race?"""
+    if not meta["races"]:
+        return False
+    if tracks is not None and not np.isin(meta["track_ids"], tracks).any():
+        return False
+    if terrains is not None and not np.isin(meta["terrains"], terrains).any():
+        return False
+    if classes is not None and not np.isin(meta["race_classes"], classes).any():
+        return False
+    if tokens is not None:
+        if meta["token_range"] is None:
+            return False
+        low, high = meta["token_range"]
+        return bool(((tokens >= low) & (tokens <= high)).any())
+    return True
+
+
+def _select(month: int, data, columns: List[str], rows: np.ndarray) -> RaceChunk:
+    entry_rows = _ranges(data["entry_start"], rows)
+    event_rows = _ranges(data["event_start"], rows)
+    out = {}
+    for name in columns:
+        if name == "month":
+            out[name] = np.full(len(rows), month, dtype=np.int32)
+        elif name == "name":
+            out[name] = _decode_text(data, name, rows)
+        elif name == "description":
+            out[name] = _decode_text(data, name, event_rows)
+        elif name in RACE_COLUMNS:
+            out[name] = data[name][rows]
+        elif name in ENTRY_COLUMNS:
+            out[name] = data[name][entry_rows]
+        else:
+            out[name] = data[name][event_rows]
+    return RaceChunk(
+        out,
+        _rebase(data["entry_start"], rows),
+        _rebase(data["event_start"], rows),
+    )
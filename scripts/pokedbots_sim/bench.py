@@ -0,0 +1,346 @@
+"""
+Benchmark harness for the engines and the analysis scripts.
+
+Every case runs in a fresh spawned process, so ru_maxrss in the child is
+the peak RSS of that case alone (interpreter + numpy + the case's data).
+Cases report a unit count (races, or simulations for the upgrade model),
+an optional segment count, and the best wall time over their repeats.
+
+Scripts with hyphenated names (analyze-economics.py, ...) are loaded by
+path with load_script(); their module-level code only defines constants
+and functions.
+
+Results are stored as JSON run files; compare_runs() lines two runs up by
+(case, field size) so regressions show as throughput ratios.
+"""
+
+import importlib.util
+import json
+import os
+import platform
+import random
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from multiprocessing import get_context
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .data import CACHE_DIR, load_roster
+from .economy import Fleets, simulate_fleets
+from .engine import get_engine, simulate_race
+from .roster import BotRoster
+from .segmented import simulate_segments
+from .segmented_vectorized import compile_track, race_time_tensor
+from .vectorized import FieldTables, race_time_matrix, standard_schedule
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+RESULTS_DIR = os.path.join(CACHE_DIR, "benchmarks")
+
+# Seeds for the analyze-stat-values.py track benchmarks
+TRACK_SEED = 12345
+
+
+@dataclass
+class BenchResult:
+    """One timed case"""
+
+    name: str
+    field_size: int
+    units: int  # races (or simulations) per run
+    unit: str
+    seconds: float  # best run
+    repeats: int
+    segments: int = 0  # segment evaluations per run, if the case has segments
+    peak_rss_mb: float = 0.0
+
+    @property
+    def rate(self) -> float:
+        return self.units / self.seconds if self.seconds > 0 else float("inf")
+
+    @property
+    def segment_rate(self) -> Optional[float]:
+        if not self.segments:
+            return None
+        return self.segments / self.seconds if self.seconds > 0 else float("inf")
+
+    def to_dict(self) -> dict:
+        row = asdict(self)
+        row["rate"] = self.rate
+        row["segment_rate"] = self.segment_rate
+        return row
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def load_script(name: str):
+    """Import scripts/<name>.py as a module (names may contain hyphens)"""
+    path = os.path.join(SCRIPTS_DIR, f"{name}.py")
+    spec = importlib.util.spec_from_file_location(
+        "_script_" + name.replace("-", "_"), path
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def best_time(run: Callable[[], object], repeats: int) -> float:
+    """Best wall time of `repeats` calls"""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _field(size: int) -> BotRoster:
+    """The first `size` bots of the collection, cycled when it is smaller"""
+    roster = load_roster()
+    return roster.take(np.arange(size) % len(roster))
+
+
+# ===== CASES =====
+# Each case builds its inputs, times the work and returns a BenchResult.
+
+
+def bench_race_time(
+    engine: str, field_size: int, num_races: int, repeats: int
+) -> BenchResult:
+    """Scalar calculate_race_time via simulate_race() (sort included)"""
+    bots = _field(field_size).to_bots()
+    races = standard_schedule(num_races).configs()
+    get_engine(engine)
+
+    def run():
+        for race in races:
+            simulate_race(race, bots, engine=engine)
+
+    seconds = best_time(run, repeats)
+    return BenchResult(
+        f"calculate_race_time[{engine}]",
+        field_size,
+        num_races,
+        "races",
+        seconds,
+        repeats,
+    )
+
+
+def bench_race_time_matrix(
+    engine: str, field_size: int, num_races: int, repeats: int
+) -> BenchResult:
+    """race_time_matrix() over the standard schedule"""
+    stats = _field(field_size).stats_matrix()
+    races = standard_schedule(num_races)
+
+    def run():
+        race_time_matrix(FieldTables(stats), races, engine=engine)
+
+    seconds = best_time(run, repeats)
+    return BenchResult(
+        f"race_time_matrix[{engine}]",
+        field_size,
+        num_races,
+        "races",
+        seconds,
+        repeats,
+    )
+
+
+def _stat_value_tracks() -> Dict[str, List[dict]]:
+    return load_script("analyze-stat-values").TRACKS
+
+
+def bench_segmented_scalar(field_size: int, num_seeds: int, repeats: int):
+    """The segment loop (simulate_segments) over analyze-stat-values tracks"""
+    tracks = _stat_value_tracks()
+    bots = _field(field_size).to_bots()
+
+    def run():
+        for segments in tracks.values():
+            for seed in range(TRACK_SEED, TRACK_SEED + num_seeds):
+                for index, bot in enumerate(bots):
+                    simulate_segments(segments, bot.stats, seed, index)
+
+    seconds = best_time(run, repeats)
+    races = num_seeds * len(tracks)
+    segments = num_seeds * field_size * sum(len(s) for s in tracks.values())
+    return BenchResult(
+        "simulate_segments", field_size, races, "races", seconds, repeats, segments
+    )
+
+
+def bench_segmented_tensor(field_size: int, num_seeds: int, repeats: int):
+    """race_time_tensor() over analyze-stat-values tracks"""
+    tracks = {name: compile_track(s) for name, s in _stat_value_tracks().items()}
+    stats = _field(field_size).stats_matrix()
+    seeds = np.arange(TRACK_SEED, TRACK_SEED + num_seeds)
+    index = np.arange(field_size)
+
+    def run():
+        for track in tracks.values():
+            race_time_tensor(track, stats, seeds, index)
+
+    seconds = best_time(run, repeats)
+    races = num_seeds * len(tracks)
+    segments = num_seeds * field_size * sum(len(t) for t in tracks.values())
+    return BenchResult(
+        "race_time_tensor", field_size, races, "races", seconds, repeats, segments
+    )
+
+
+def bench_simulate_strategy(field_size: int, days: int, repeats: int):
+    """
+    analyze-economics.py simulate_strategy() for a fleet of racers; the
+    fleet is rebuilt inside each timed run since the simulation mutates it
+    """
+    economics = load_script("analyze-economics")
+    stats = _field(field_size).stats_matrix().tolist()
+    total_races = 0
+
+    def run():
+        nonlocal total_races
+        random.seed(0)
+        fleet = [
+            economics.BotConfig(
+                name=f"bot-{i}",
+                role="racer",
+                stats=economics.BotStats(*row),
+                races_per_day=4,
+            )
+            for i, row in enumerate(stats)
+        ]
+        total_races = economics.simulate_strategy(fleet, days).total_races
+
+    seconds = best_time(run, repeats)
+    return BenchResult(
+        "simulate_strategy", field_size, total_races, "races", seconds, repeats
+    )
+
+
+def bench_simulate_fleets(field_size: int, days: int, repeats: int):
+    """economy.simulate_fleets() for the simulate_strategy fleet"""
+    stats = _field(field_size).stats_matrix()
+    fleets = Fleets(
+        fleet=np.zeros(field_size, dtype=np.int64),
+        stats=stats,
+        wins=np.zeros(field_size, dtype=np.int64),
+        races_per_day=np.full(field_size, 4),
+        recharge_below=np.array([50.0]),
+        repair_below=np.array([50.0]),
+    )
+    total_races = 0
+
+    def run():
+        nonlocal total_races
+        total_races = int(simulate_fleets(fleets, days, seed=0).fleets["races"][0])
+
+    seconds = best_time(run, repeats)
+    return BenchResult(
+        "simulate_fleets", field_size, total_races, "races", seconds, repeats
+    )
+
+
+def bench_upgrade_monte_carlo(num_simulations: int, repeats: int):
+    """calculate-upgrade-expectations.py monte_carlo_simulation()"""
+    upgrades = load_script("calculate-upgrade-expectations")
+
+    def run():
+        random.seed(0)
+        upgrades.monte_carlo_simulation(num_simulations=num_simulations)
+
+    seconds = best_time(run, repeats)
+    return BenchResult(
+        "monte_carlo_simulation", 1, num_simulations, "simulations", seconds, repeats
+    )
+
+
+# ===== RUNNER =====
+
+Case = Tuple[Callable[..., BenchResult], tuple]
+
+
+def _run_case(case: Case) -> BenchResult:
+    fn, args = case
+    result = fn(*args)
+    result.peak_rss_mb = peak_rss_mb()
+    return result
+
+
+def run_cases(
+    cases: Sequence[Case], report: Optional[Callable[[BenchResult], None]] = None
+) -> List[BenchResult]:
+    """Run each case in its own spawned process, one at a time"""
+    results = []
+    with ProcessPoolExecutor(
+        max_workers=1, mp_context=get_context("spawn"), max_tasks_per_child=1
+    ) as pool:
+        for case in cases:
+            result = pool.submit(_run_case, case).result()
+            results.append(result)
+            if report is not None:
+                report(result)
+    return results
+
+
+def environment() -> dict:
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def write_run(results: Sequence[BenchResult], path: Optional[str] = None) -> str:
+    """Store a run as JSON (default: RESULTS_DIR/<UTC timestamp>.json)"""
+    if path is None:
+        stamp = time.strftime("%Y%m%dT%H%M%SZ", time.gmtime())
+        path = os.path.join(RESULTS_DIR, f"{stamp}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(
+            {
+                "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                "environment": environment(),
+                "results": [r.to_dict() for r in results],
+            },
+            f,
+            indent=2,
+        )
+    return path
+
+
+def previous_run(before: Optional[str] = None) -> Optional[str]:
+    """Newest run file in RESULTS_DIR (older than `before`, if given)"""
+    try:
+        names = sorted(n for n in os.listdir(RESULTS_DIR) if n.endswith(".json"))
+    except FileNotFoundError:
+        return None
+    if before is not None:
+        names = [n for n in names if n < os.path.basename(before)]
+    return os.path.join(RESULTS_DIR, names[-1]) if names else None
+
+
+def compare_runs(old_path: str, new_path: str) -> List[Tuple[str, int, float]]:
+    """(case, field size, new rate / old rate) for cases in both runs"""
+    runs = []
+    for path in (old_path, new_path):
+        with open(path) as f:
+            rows = json.load(f)["results"]
+        runs.append({(r["name"], r["field_size"]): r["rate"] for r in rows})
+    old, new = runs
+    return [
+        (name, size, new[name, size] / old[name, size])
+        for name, size in new
+        if (name, size) in old
+    ]
@@ -0,0 +1,191 @@
+"""
+Binary column cache for the JSON data files.
+
+A cache file is a fixed frame followed by raw column arrays:
+
+    magic (8 bytes) | header length (uint64 LE) | JSON header | padding
+    column 0 | padding | column 1 | ...
+
+The header records each column's dtype/shape/offset (offsets are
+ALIGN-byte aligned), free-form metadata such as category name tables, and a
+stamp of the source file (size, mtime_ns, sha256). Readers memory-map the
+file and return zero-copy array views.
+
+cached_columns() rebuilds the cache when the source changes: a matching
+size + mtime is trusted as-is, otherwise the source is re-hashed and only
+re-parsed when the hash differs too.
+"""
+
+import hashlib
+import json
+import os
+import struct
+import tempfile
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+MAGIC = b"PKDBCOL1"
+FORMAT_VERSION = 1
+ALIGN = 64
+
+Columns = Dict[str, np.ndarray]
+BuildFn = Callable[[str], Tuple[Columns, dict]]
+
+
+def _aligned(offset: int) -> int:
+    return (offset + ALIGN - 1) // ALIGN * ALIGN
+
+
+def file_digest(path: str) -> str:
+    """sha256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def source_stamp(path: str, digest: Optional[str] = None) -> dict:
+    """Identify a source file by size, mtime and content hash"""
+    st = os.stat(path)
+    return {
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "sha256": digest or file_digest(path),
+    }
+
+
+def write_columns(path: str, columns: Columns, meta: dict, source: dict) -> None:
+    """Write columns to path atomically (temp file + rename)"""
+    entries = []
+    offset = 0
+    for name, array in columns.items():
+        array = np.ascontiguousarray(array)
+        entries.append(
+            {
+                "name": name,
+                "dtype": array.dtype.str,
+                "shape": list(array.shape),
+                "offset": offset,
+                "nbytes": array.nbytes,
+            }
+        )
+        offset = _aligned(offset + array.nbytes)
+
+    header = {
+        "version": FORMAT_VERSION,
+        "source": source,
+        "meta": meta,
+        "columns": entries,
+    }
+    header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    data_start = _aligned(len(MAGIC) + 8 + len(header_bytes))
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(MAGIC)
+            f.write(struct.pack("<Q", len(header_bytes)))
+            f.write(header_bytes)
+            for entry, array in zip(entries, columns.values()):
+                f.seek(data_start + entry["offset"])
+                f.write(np.ascontiguousarray(array).tobytes())
+            f.truncate(data_start + offset)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def read_header(path: str) -> Tuple[dict, int]:
+    """Return (header, data_start) for a cache file"""
+    with open(path, "rb") as f:
+        prefix = f.read(len(MAGIC) + 8)
+        if len(prefix) != len(MAGIC) + 8 or prefix[: len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a column cache file")
+        (header_len,) = struct.unpack("<Q", prefix[len(MAGIC) :])
+        header = json.loads(f.read(header_len).decode("utf-8"))
+    if header.get("version") != FORMAT_VERSION:
+        raise ValueError(f"{path} has unsupported cache version")
+    return header, _aligned(len(MAGIC) + 8 + header_len)
+
+
+def read_columns(path: str) -> Tuple[Columns, dict]:
+    """Memory-map a cache file; returns (columns, header)"""
+    header, data_start = read_header(path)
+    if os.path.getsize(path) == data_start:
+        # np.memmap refuses empty mappings
+        raw = np.zeros(0, dtype=np.uint8)
+    else:
+        raw = np.memmap(path, dtype=np.uint8, mode="r")
+
+    columns = {}
+    for entry in header["columns"]:
+        start = data_start + entry["offset"]
+        buf = raw[start : start + entry["nbytes"]]
+        columns[entry["name"]] = buf.view(np.dtype(entry["dtype"])).reshape(
+            entry["shape"]
+        )
+    return columns, header
+
+
+def cache_path(name: str, cache_dir: str) -> str:
+    return os.path.join(cache_dir, f"{name}.bin")
+
+
+def cached_columns(
+    source_path: str,
+    name: str,
+    build: BuildFn,
+    cache_dir: str,
+    use_cache: bool = True,
+) -> Tuple[Columns, dict]:
+    """
+    Columns parsed from source_path by build(), through the on-disk cache.
+
+    Returns (columns, meta). When the cache directory isn't writable the
+    freshly built columns are returned without caching.
+    """
+    if not use_cache:
+        return build(source_path)
+
+    path = cache_path(name, cache_dir)
+    st = os.stat(source_path)
+    digest = None
+    try:
+        columns, header = read_columns(path)
+        stamp = header["source"]
+        if stamp["size"] == st.st_size and stamp["mtime_ns"] == st.st_mtime_ns:
+            return columns, header["meta"]
+        digest = file_digest(source_path)
+        if stamp["sha256"] == digest:
+            # Touched but unchanged: refresh the stamp, keep the columns
+            columns = {k: np.array(v) for k, v in columns.items()}
+            meta = header["meta"]
+            _try_write(path, columns, meta, source_stamp(source_path, digest))
+            return columns, meta
+    except (OSError, ValueError, KeyError):
+        pass
+
+    columns, meta = build(source_path)
+    _try_write(path, columns, meta, source_stamp(source_path, digest))
+    return columns, meta
+
+
+def _try_write(path: str, columns: Columns, meta: dict, source: dict) -> None:
+    try:
+        write_columns(path, columns, meta, source)
+    except OSError:
+        pass
+
+
+def build_cache(source_path: str, name: str, build: BuildFn, cache_dir: str) -> str:
+    """Force a rebuild of one cache file; returns its path"""
+    columns, meta = build(source_path)
+    path = cache_path(name, cache_dir)
+    write_columns(path, columns, meta, source_stamp(source_path))
+    return path
@@ -0,0 +1,347 @@
+"""
+Parser for Candid textual values, as printed by `dfx canister call`.
+
+Values decode to plain Python objects:
+
+    nat / int / nat8..int64     int ("_" digit separators and hex allowed)
+    float32 / float64           float (repr round-trips, so lossless)
+    text                        str (\\n, \\HH byte and \\u{...} escapes)
+    bool / null                 bool / None
+    opt v                       v, or None for `null`
+    vec { ... }                 list (vec nat8 blobs stay lists of ints)
+    blob "..."                  bytes
+    principal "..."             str
+    record { a = 1; 2 }         dict; named fields by name, hashed field
+                                ids as int, positional fields as 0, 1, ...
+    variant { Tag = v }         {"Tag": v}; {"Tag": None} without payload
+
+Type annotations (`1 : float64`, `(vec {} : vec nat)`) are read, and
+numeric ones decide int vs float. A call reply is an argument tuple
+`( v, ... )`; parse() returns it as a tuple.
+
+The tokenizer is one compiled regex scanned lazily, and iter_vec()
+yields the items of a reply's top-level vec one at a time, so bulk dumps
+(get_completed_races over a whole season) decode in a single linear pass
+without building the full reply first.
+"""
+
+import re
+from itertools import islice
+from typing import Any, Iterator, List, Optional, Tuple
+
+# Leading whitespace and comments are folded into each token's match
+_TOKEN = re.compile(
+    r"""
+    (?:\s+|//[^\n]*|/\*.*?\*/)*
+    (?:
+        (?P<text>"(?:[^"\\]|\\.)*")
+      | (?P<number>[+-]?(?:0[xX][0-9a-fA-F_]+
+            |[0-9][0-9_]*(?:\.[0-9_]*)?(?:[eE][+-]?[0-9_]+)?))
+      | (?P<ident>[A-Za-z_][A-Za-z0-9_]*)
+      | (?P<punct>[{}();=:,])
+      | (?P<error>\S)
+    )
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+_CHUNK_TOKENS = 4096
+
+_ESCAPE = re.compile(r"\\(?:([0-9a-fA-F]{2})|u\{([0-9a-fA-F_]+)\}|(.))", re.DOTALL)
+_SIMPLE_ESCAPES = {"n": "\n", "r": "\r", "t": "\t", "\\": "\\", '"': '"', "'": "'"}
+
+FLOAT_TYPES = frozenset({"float32", "float64"})
+
+
+class CandidError(ValueError):
+    """Malformed Candid text; carries the character offset"""
+
+    def __init__(self, message: str, offset: int):
+        super().__init__(f"{message} at offset {offset}")
+        self.offset = offset
+
+
+# ===== LEXICAL =====
+
+
+def _token_chunks(text: str) -> Iterator[List[Tuple[str, str, int]]]:
+    """(kind, text, offset) tokens, scanned lazily a chunk at a time"""
+    matches = _TOKEN.finditer(text)
+    while True:
+        chunk = [
+            (m.lastgroup, m.group(m.lastgroup), m.start(m.lastgroup))
+            for m in islice(matches, _CHUNK_TOKENS)
+        ]
+        if not chunk:
+            return
+        yield chunk
+
+
+def _unescape_bytes(body: str) -> bytes:
+    out = bytearray()
+    pos = 0
+    for match in _ESCAPE.finditer(body):
+        out += body[pos : match.start()].encode()
+        byte, code, char = match.groups()
+        if byte is not None:
+            out.append(int(byte, 16))
+        elif code is not None:
+            out += chr(int(code.replace("_", ""), 16)).encode()
+        elif char in _SIMPLE_ESCAPES:
+            out += _SIMPLE_ESCAPES[char].encode()
+        else:
+            raise ValueError(f"unknown escape \\{char}")
+        pos = match.end()
+    out += body[pos:].encode()
+    return bytes(out)
+
+
+def _text(token: str) -> str:
+    body = token[1:-1]
+    if "\\" not in body:
+        return body
+    return _unescape_bytes(body).decode()
+
+
+def _number(token: str, annotation: Optional[str] = None):
+    digits = token.replace("_", "")
+    if digits.lstrip("+-")[:2] in ("0x", "0X"):
+        value = int(digits, 16)
+    elif any(c in digits for c in ".eE"):
+        value = float(digits)
+    else:
+        value = int(digits)
+    return float(value) if annotation in FLOAT_TYPES else value
+
+
+# ===== PARSER =====
+
+
+class _Parser:
+    def __init__(self, text: str):
+        self._chunks = _token_chunks(text)
+        self._buf = []
+        self._pos = 0
+        self._eof = ("eof", "", len(text))
+
+    def _refill(self) -> None:
+        self._buf = self._buf[self._pos :]
+        self._pos = 0
+        self._buf.extend(next(self._chunks, None) or [self._eof])
+
+    def peek(self, n: int = 0) -> Tuple[str, str, int]:
+        try:
+            return self._buf[self._pos + n]
+        except IndexError:
+            self._refill()
+            return self.peek(n)
+
+    def take(self) -> Tuple[str, str, int]:
+        token = self.peek()
+        if token is not self._eof:
+            self._pos += 1
+        return token
+
+    def expect(self, value: str) -> None:
+        kind, text, offset = self.take()
+        if text != value or kind == "text":
+            raise CandidError(
+                f"expected {value!r}, found {text or 'end of input'!r}", offset
+            )
+
+    def accept(self, value: str) -> bool:
+        kind, text, _ = self.peek()
+        if text == value and kind in ("punct", "ident"):
+            self.take()
+            return True
+        return False
+
+    def at_end(self) -> bool:
+        return self.peek()[0] == "eof"
+
+    def type_(self) -> str:
+        """Skip a type annotation; returns its head keyword"""
+        kind, text, offset = self.take()
+        if kind != "ident":
+            raise CandidError(f"expected a type, found {text!r}", offset)
+        if text in ("opt", "vec"):
+            self.type_()
+        elif text in ("record", "variant"):
+            self.expect("{")
+            depth = 1
+            while depth:
+                kind, brace, offset = self.take()
+                if kind == "eof":
+                    raise CandidError("unterminated type", offset)
+                if kind == "punct" and brace == "{":
+                    depth += 1
+                elif kind == "punct" and brace == "}":
+                    depth -= 1
+        return text
+
+    def value(self):
+        """One value and its optional type annotation"""
+        kind, text, _ = self.peek()
+        if kind == "number":
+            self.take()
+            return _number(text, self._annotation())
+        value = self._bare()
+        self._annotation()
+        return value
+
+    def _bare(self):
+        kind, text, offset = self.take()
+        if kind == "number":
+            return _number(text)
+        if kind == "text":
+            return _text(text)
+        if kind == "punct":
+            if text == "(":
+                # Parenthesized value, possibly with an annotation inside
+                inner = self.value()
+                self.expect(")")
+                return inner
+            raise CandidError(f"unexpected {text!r}", offset)
+        if kind == "eof":
+            raise CandidError("unexpected end of input", offset)
+        if kind == "error":
+            raise CandidError(f"unexpected character {text!r}", offset)
+
+        if text == "null":
+            return None
+        if text in ("true", "false"):
+            return text == "true"
+        if text == "opt":
+            return self.value()
+        if text == "vec":
+            return self._vec()
+        if text == "record":
+            return self._record()
+        if text == "variant":
+            return self._variant()
+        if text == "blob":
+            kind, body, offset = self.take()
+            if kind != "text":
+                raise CandidError("expected blob text", offset)
+            return _unescape_bytes(body[1:-1])
+        if text == "principal":
+            kind, body, offset = self.take()
+            if kind != "text":
+                raise CandidError("expected principal text", offset)
+            return _text(body)
+        if text in ("nan", "inf"):
+            return float(text)
+        raise CandidError(f"unexpected {text!r}", offset)
+
+    def _annotation(self) -> Optional[str]:
+        if self.peek()[1] == ":" and self.peek()[0] == "punct":
+            self.take()
+            return self.type_()
+        return None
+
+    def _close(self, closing: str) -> bool:
+        """Consume a ';' separator; True once the closing brace is taken"""
+        if self.accept(closing):
+            return True
+        self.expect(";")
+        return self.accept(closing)
+
+    def iter_items(self) -> Iterator[Any]:
+        """Items of a vec whose 'vec {' was already consumed"""
+        if self.accept("}"):
+            return
+        while True:
+            yield self.value()
+            if self._close("}"):
+                return
+
+    def _vec(self) -> List[Any]:
+        self.expect("{")
+        return list(self.iter_items())
+
+    def _field_key(self):
+        """A field label followed by '=', or None for a positional field"""
+        kind, text, _ = self.peek()
+        if kind in ("ident", "number", "text") and self.peek(1)[1] == "=":
+            self.take()
+            self.take()
+            if kind == "number":
+                return int(text.replace("_", ""))
+            return _text(text) if kind == "text" else text
+        return None
+
+    def _record(self) -> dict:
+        self.expect("{")
+        fields = {}
+        if self.accept("}"):
+            return fields
+        position = 0
+        while True:
+            key = self._field_key()
+            if key is None:
+                key = position
+                position += 1
+            fields[key] = self.value()
+            if self._close("}"):
+                return fields
+
+    def _variant(self) -> dict:
+        self.expect("{")
+        key = self._field_key()
+        if key is None:
+            kind, text, offset = self.take()
+            if kind not in ("ident", "number", "text"):
+                raise CandidError(f"expected a variant tag, found {text!r}", offset)
+            key = _text(text) if kind == "text" else text
+            value = None
+        else:
+            value = self.value()
+        self.accept(";")
+        self.expect("}")
+        return {key: value}
+
+    def args(self) -> Tuple[Any, ...]:
+        """An argument tuple `( v, ... )`, or a bare value"""
+        if not self.accept("("):
+            return (self.value(),)
+        values = []
+        while not self.accept(")"):
+            values.append(self.value())
+            if not self.accept(","):
+                self.expect(")")
+                break
+        return tuple(values)
+
+
+def _check_end(parser: _Parser) -> None:
+    if not parser.at_end():
+        kind, text, offset = parser.peek()
+        raise CandidError(f"trailing input {text!r}", offset)
+
+
+def parse(text: str) -> Tuple[Any, ...]:
+    """Decode a call reply (argument tuple) or a single bare value"""
+    parser = _Parser(text)
+    values = parser.args()
+    _check_end(parser)
+    return values
+
+
+def parse_value(text: str):
+    """Decode exactly one value (a one-element reply tuple is unwrapped)"""
+    values = parse(text)
+    if len(values) != 1:
+        raise ValueError(f"expected one value, found {len(values)}")
+    return values[0]
+
+
+def iter_vec(text: str) -> Iterator[Any]:
+    """Items of a reply's single top-level vec, decoded one at a time"""
+    parser = _Parser(text)
+    wrapped = parser.accept("(")
+    parser.expect("vec")
+    parser.expect("{")
+    yield from parser.iter_items()
+    if wrapped:
+        parser.accept(",")
+        parser.expect(")")
+    _check_end(parser)
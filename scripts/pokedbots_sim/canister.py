@@ -0,0 +1,361 @@
+"""
+Backends for the racing canister's analysis queries.
+
+    LocalCanister  in-process stand-in: debug_simulate_race runs the
+                   segment model (events.simulate_track_race) on roster
+                   stats, get_completed_races reads recorded race archives
+    DfxCanister    the deployed canister via `dfx canister call ... --output
+                   json`, run from the repo root (dfx.json)
+
+Both take and return the same plain dicts, shaped like the canister's
+Candid records (opt values unwrapped to None, variants as their tag name,
+nftId as text). Scripts pick one by name with open_canister().
+
+Race archives live under data/races/: JSON-lines files with one
+get_completed_races record per line (record_races() writes them), or raw
+Candid text replies saved as *.candid, e.g.
+
+    dfx canister call pokedbots_racing get_completed_races '(100000)' --ic \\
+        > data/races/season-1.candid
+
+A fetched dfx backend can append what it fetches, so later runs go through
+LocalCanister without network access or a process per call.
+
+The local stand-in races roster base stats; the canister uses each bot's
+current stats at 100% condition with terrain bonuses, so simulated times
+only match the canister for bots it races at base stats.
+"""
+
+import json
+import os
+import subprocess
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+
+from .candid import iter_vec
+from .data import DATA_DIR, load_roster
+from .events import simulate_track_race
+from .roster import BotRoster
+from .tracks import TRACKS, get_track
+
+REPO_ROOT = os.path.abspath(os.path.join(DATA_DIR, ".."))
+ARCHIVE_DIR = os.path.join(DATA_DIR, "races")
+ARCHIVE_EXTENSIONS = (".jsonl", ".candid")
+STAT_KEYS = ("speed", "powerCore", "acceleration", "stability")
+
+
+# ===== RECORD DECODING =====
+
+
+def _number(value):
+    """dfx JSON renders nat/float as numbers or "1_234"-style strings"""
+    if isinstance(value, str):
+        value = value.replace("_", "")
+        return float(value) if any(c in value for c in ".eE") else int(value)
+    return value
+
+
+def _opt(value):
+    """?T as dfx JSON ([] / [x]) or already unwrapped"""
+    if isinstance(value, list) and len(value) <= 1:
+        return value[0] if value else None
+    return value
+
+
+def _variant(value):
+    """Variant as {"Tag": null} or its tag name"""
+    if isinstance(value, dict):
+        (tag,) = value
+        return tag
+    return value
+
+
+def race_record(raw: dict) -> dict:
+    """Normalize one get_completed_races record; results in position order"""
+    results = _opt(raw.get("results"))
+    # An archived one-result list unwraps like an opt; wrap it again
+    if isinstance(results, dict):
+        results = [results]
+    record = {
+        "raceId": int(_number(raw["raceId"])),
+        "name": raw.get("name", ""),
+        "trackId": int(_number(raw["trackId"])),
+        "trackSeed": int(_number(raw["trackSeed"])),
+    }
+    for key in ("terrain", "raceClass"):
+        if key in raw:
+            record[key] = _variant(raw[key])
+    for key in ("distance", "entryCount", "startTime"):
+        if key in raw:
+            record[key] = int(_number(raw[key]))
+    rows = [
+        {
+            "position": int(_number(r.get("position", i + 1))),
+            "nftId": str(r["nftId"]),
+            "finalTime": float(_number(r["finalTime"])),
+        }
+        for i, r in enumerate(results or [])
+    ]
+    record["results"] = sorted(rows, key=lambda r: r["position"])
+    if raw.get("events"):
+        record["events"] = [
+            {
+                # Canister RaceEvent or a commentary timeline row
+                "type": _variant(e["eventType"]) if "eventType" in e else e["type"],
+                "timestamp": float(_number(e["timestamp"])),
+                "segmentIndex": int(_number(e["segmentIndex"])),
+                "description": e["description"],
+            }
+            for e in raw["events"]
+        ]
+    return record
+
+
+# ===== ARCHIVES =====
+
+
+def archive_files(archive: Union[str, Sequence[str]] = ARCHIVE_DIR) -> List[str]:
+    """Archive files in a directory (sorted) or as given"""
+    if not isinstance(archive, str):
+        return list(archive)
+    if not os.path.isdir(archive):
+        return [archive] if os.path.exists(archive) else []
+    names = sorted(os.listdir(archive))
+    return [os.path.join(archive, n) for n in names if n.endswith(ARCHIVE_EXTENSIONS)]
+
+
+def decode_completed_races(text: str) -> Iterator[dict]:
+    """Race records of a get_completed_races Candid text reply, streamed"""
+    for raw in iter_vec(text):
+        yield race_record(raw)
+
+
+def _archive_records(path: str) -> Iterator[dict]:
+    if path.endswith(".candid"):
+        with open(path) as f:
+            yield from decode_completed_races(f.read())
+        return
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                yield race_record(json.loads(line))
+
+
+def load_races(archive: Union[str, Sequence[str]] = ARCHIVE_DIR) -> List[dict]:
+    """Archived races in file order, first record per raceId kept"""
+    races = []
+    seen = set()
+    for path in archive_files(archive):
+        for race in _archive_records(path):
+            if race["raceId"] not in seen:
+                seen.add(race["raceId"])
+                races.append(race)
+    return races
+
+
+def record_races(races: Iterable[dict], path: str) -> int:
+    """Append races missing from the archive file; returns how many"""
+    known = {r["raceId"] for r in load_races(path)}
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    written = 0
+    with open(path, "a") as f:
+        for race in races:
+            race = race_record(race)
+            if race["raceId"] in known:
+                continue
+            known.add(race["raceId"])
+            f.write(json.dumps(race) + "\n")
+            written += 1
+    return written
+
+
+# ===== BACKENDS =====
+
+
+def _simulation_reply(track, token_ids, stats, race) -> dict:
+    """debug_simulate_race's reply record for a simulated race"""
+    total_segments = len(track.segments) * track.laps
+    positions = race.positions()
+    results = [
+        {
+            "tokenIndex": token_ids[i],
+            "position": int(positions[i]),
+            "finalTime": float(race.times[i]),
+            "avgSegmentTime": float(race.times[i]) / total_segments,
+        }
+        for i in race.order.tolist()
+    ]
+    times = race.times
+    return {
+        "track": {
+            "trackId": track.track_id,
+            "name": track.name,
+            "description": track.description,
+            "totalDistance": track.total_distance,
+            "laps": track.laps,
+            "segmentCount": len(track.segments),
+        },
+        "participants": [
+            {"tokenIndex": t, "stats": dict(zip(STAT_KEYS, row))}
+            for t, row in zip(token_ids, stats.tolist())
+        ],
+        "results": results,
+        "analysis": {
+            "winner": results[0]["tokenIndex"],
+            "winnerTime": float(times.min()),
+            "lastPlaceTime": float(times.max()),
+            "timeSpread": float(times.max() - times.min()),
+            "avgTime": float(times.mean()),
+        },
+    }
+
+
+class LocalCanister:
+    """
+    In-process stand-in for the racing canister.
+
+    Args:
+        roster: collection to take participant stats from (default: load_roster())
+        archive: archive directory or JSON-lines files for get_completed_races
+        stats: per-token stat overrides, token -> (speed, powerCore,
+            acceleration, stability)
+    """
+
+    def __init__(
+        self,
+        roster: Optional[BotRoster] = None,
+        archive: Union[str, Sequence[str]] = ARCHIVE_DIR,
+        stats: Optional[Dict[int, Sequence[int]]] = None,
+    ):
+        self.roster = roster if roster is not None else load_roster()
+        self.archive = archive
+        self.stats = dict(stats or {})
+        self._races = None
+
+    def _stats_of(self, token_id: int) -> Optional[List[int]]:
+        if token_id in self.stats:
+            return list(self.stats[token_id])
+        if token_id not in self.roster:
+            return None
+        row = self.roster.row_of(token_id)
+        return self.roster.stats_matrix([row])[0].tolist()
+
+    def debug_simulate_race(
+        self, track_id: int, token_indices: Sequence[int], seed: int
+    ) -> Optional[dict]:
+        """Race tokens (entry order) on a track; None like the canister
+        for an unknown track or fewer than two known bots"""
+        if track_id not in TRACKS:
+            return None
+        token_ids, rows = [], []
+        for token_id in token_indices:
+            row = self._stats_of(int(token_id))
+            # The canister skips bots it has no stats for
+            if row is not None:
+                token_ids.append(int(token_id))
+                rows.append(row)
+        if len(rows) < 2:
+            return None
+        track = get_track(track_id)
+        stats = np.array(rows, dtype=np.int64)
+        race = simulate_track_race(
+            track, stats, seed, [str(t) for t in token_ids], events=False
+        )
+        return _simulation_reply(track, token_ids, stats, race)
+
+    def completed_races(self) -> List[dict]:
+        """Every archived race (loaded once)"""
+        if self._races is None:
+            self._races = load_races(self.archive)
+        return self._races
+
+    def get_completed_races(self, limit: int) -> List[dict]:
+        return self.completed_races()[:limit]
+
+
+class DfxCanister:
+    """
+    The deployed racing canister through the dfx CLI.
+
+    Args:
+        canister: canister name in dfx.json
+        network: dfx network ("ic" or "local")
+        cwd: directory holding dfx.json (default: the repo root)
+        record: archive file to append fetched completed races to
+    """
+
+    def __init__(
+        self,
+        canister: str = "pokedbots_racing",
+        network: str = "ic",
+        cwd: str = REPO_ROOT,
+        record: Optional[str] = None,
+    ):
+        self.canister = canister
+        self.network = network
+        self.cwd = cwd
+        self.record = record
+
+    def call(self, method: str, args: str):
+        """Run a query call and return the decoded JSON reply"""
+        cmd = [
+            "dfx",
+            "canister",
+            "call",
+            self.canister,
+            method,
+            args,
+            "--network",
+            self.network,
+            "--query",
+            "--output",
+            "json",
+        ]
+        result = subprocess.run(
+            cmd, capture_output=True, text=True, check=True, cwd=self.cwd
+        )
+        return json.loads(result.stdout)
+
+    def debug_simulate_race(
+        self, track_id: int, token_indices: Sequence[int], seed: int
+    ) -> Optional[dict]:
+        tokens = "; ".join(str(int(t)) for t in token_indices)
+        reply = _opt(
+            self.call(
+                "debug_simulate_race", f"({track_id}, vec {{ {tokens} }}, {seed})"
+            )
+        )
+        if reply is None:
+            return None
+        for part in reply["participants"]:
+            part["tokenIndex"] = int(_number(part["tokenIndex"]))
+            part["stats"] = {k: int(_number(part["stats"][k])) for k in STAT_KEYS}
+        for r in reply["results"]:
+            r["tokenIndex"] = int(_number(r["tokenIndex"]))
+            r["position"] = int(_number(r["position"]))
+            r["finalTime"] = float(_number(r["finalTime"]))
+            r["avgSegmentTime"] = float(_number(r["avgSegmentTime"]))
+        reply["results"].sort(key=lambda r: r["position"])
+        return reply
+
+    def get_completed_races(self, limit: int) -> List[dict]:
+        races = [race_record(r) for r in self.call("get_completed_races", f"({limit})")]
+        if self.record:
+            record_races(races, self.record)
+        return races
+
+
+BACKENDS = {"local": LocalCanister, "dfx": DfxCanister}
+
+
+def open_canister(backend: str = "local", **kwargs):
+    """Construct a canister backend by name (see BACKENDS)"""
+    try:
+        factory = BACKENDS[backend]
+    except KeyError:
+        raise ValueError(
+            f"Unknown canister backend '{backend}' "
+            f"(expected one of: {', '.join(BACKENDS)})"
+        ) from None
+    return factory(**kwargs)
@@ -0,0 +1,132 @@
+"""
+Loaders for the collection data under data/.
+
+Each source is parsed once into a binary column cache under data/.cache/
+(see cache.py); later loads memory-map the cache instead of decoding JSON.
+Pass use_cache=False to always read the source directly.
+"""
+
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .cache import build_cache, cached_columns
+from .models import Bot
+from .roster import BotRoster
+from .traits import TraitTable
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "data")
+CACHE_DIR = os.path.join(DATA_DIR, ".cache")
+PRECOMPUTED_STATS_PATH = os.path.join(DATA_DIR, "precomputed-stats.json")
+TRAITS_JSONL_PATH = os.path.join(DATA_DIR, "pokedbots_stats.jsonl")
+STATS_JSON_PATH = os.path.join(DATA_DIR, "stats.json")
+
+
+# ===== PARSERS (source file -> columns + metadata) =====
+
+
+def _parse_precomputed_stats(path: str) -> Tuple[Dict[str, np.ndarray], dict]:
+    with open(path, "r") as f:
+        data = json.load(f)
+    roster = BotRoster.from_records(data["stats"])
+    return roster.columns(), {"factions": roster.factions}
+
+
+def _trait_columns(table: TraitTable) -> Tuple[Dict[str, np.ndarray], dict]:
+    columns = {"ids": table.ids}
+    for i, name in enumerate(table.names):
+        columns[f"trait{i}"] = table.codes[name]
+    return columns, {"names": table.names, "values": table.values}
+
+
+def _parse_traits_jsonl(path: str) -> Tuple[Dict[str, np.ndarray], dict]:
+    with open(path, "r") as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    return _trait_columns(TraitTable.from_rows(rows))
+
+
+def _parse_stats_json(path: str) -> Tuple[Dict[str, np.ndarray], dict]:
+    """stats.json: [schema, bots]; schema entries are [id, name, [[value_id, value]]]"""
+    with open(path, "r") as f:
+        schema_raw, bots_raw = json.load(f)
+
+    names = [trait_data[1] for trait_data in schema_raw]
+    values = {}
+    value_codes = []
+    for trait_data in schema_raw:
+        values[trait_data[1]] = [v[1] for v in trait_data[2]]
+        value_codes.append({v[0]: code for code, v in enumerate(trait_data[2])})
+
+    ids = np.array([bot_entry[0] for bot_entry in bots_raw], dtype=np.int32)
+    codes = {name: np.full(len(bots_raw), -1, dtype=np.int16) for name in names}
+    for row, bot_entry in enumerate(bots_raw):
+        for trait_id, value_id in bot_entry[1]:
+            codes[names[trait_id]][row] = value_codes[trait_id][value_id]
+
+    return _trait_columns(TraitTable(ids, names, codes, values))
+
+
+def _trait_table(columns: Dict[str, np.ndarray], meta: dict) -> TraitTable:
+    names = meta["names"]
+    codes = {name: columns[f"trait{i}"] for i, name in enumerate(names)}
+    return TraitTable(columns["ids"], names, codes, meta["values"])
+
+
+# ===== LOADERS =====
+
+
+def load_roster(
+    path: str = PRECOMPUTED_STATS_PATH,
+    id_prefix: str = "PokedBot #",
+    use_cache: bool = True,
+) -> BotRoster:
+    """Load precomputed-stats.json into a column-backed BotRoster"""
+    columns, meta = cached_columns(
+        path, "precomputed-stats", _parse_precomputed_stats, CACHE_DIR, use_cache
+    )
+    return BotRoster.from_columns(columns, meta["factions"], id_prefix=id_prefix)
+
+
+def load_real_bots(
+    limit: Optional[int] = None, id_prefix: str = "PokedBot #"
+) -> List[Bot]:
+    """Load real PokedBot stats from precomputed-stats.json"""
+    roster = load_roster(id_prefix=id_prefix)
+    return roster.to_bots(slice(0, limit) if limit else None)
+
+
+def load_trait_rows(
+    path: str = TRAITS_JSONL_PATH, use_cache: bool = True
+) -> TraitTable:
+    """Load pokedbots_stats.jsonl (one decoded bot per line)"""
+    columns, meta = cached_columns(
+        path, "pokedbots_stats", _parse_traits_jsonl, CACHE_DIR, use_cache
+    )
+    return _trait_table(columns, meta)
+
+
+def load_stats_json(path: str = STATS_JSON_PATH, use_cache: bool = True) -> TraitTable:
+    """Load the raw stats.json metadata export (schema + encoded bots)"""
+    columns, meta = cached_columns(
+        path, "stats", _parse_stats_json, CACHE_DIR, use_cache
+    )
+    return _trait_table(columns, meta)
+
+
+SOURCES = {
+    "precomputed-stats": (PRECOMPUTED_STATS_PATH, _parse_precomputed_stats),
+    "pokedbots_stats": (TRAITS_JSONL_PATH, _parse_traits_jsonl),
+    "stats": (STATS_JSON_PATH, _parse_stats_json),
+}
+
+
+def build_caches(names: Optional[List[str]] = None) -> List[str]:
+    """Rebuild the binary caches for every source present; returns their paths"""
+    paths = []
+    for name in names or SOURCES:
+        source_path, parse = SOURCES[name]
+        if os.path.exists(source_path):
+            paths.append(build_cache(source_path, name, parse, CACHE_DIR))
+    return paths
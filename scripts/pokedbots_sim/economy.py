@@ -0,0 +1,427 @@
+"""
+Batched fleet economy simulator.
+
+analyze-economics.py simulate_strategy() advances one bot and one race at
+a time. Here the battery, condition, wins and stats of every bot of many
+fleets are held in flat arrays (fleet[i] is bot i's fleet), and all bots
+advance together one race tick at a time. Day d has max(races_per_day)
+ticks; bot i races in the first races_per_day[i] of them.
+
+Each tick follows simulate_strategy's racer loop with the "optimal"
+maintenance strategy:
+
+    - a bot under race_floor battery or condition skips the race and is
+      rescued (recharged / repaired if under rescue_below)
+    - otherwise it races: expected position from its battery-penalized
+      rating tier, drain / wear as simulate_race(), position jittered by
+      +-1, prize from the 8-bot pool
+    - after a race that isn't its last of the day, it is recharged /
+      repaired when under its fleet's recharge_below / repair_below
+
+Race class (entry fee and sprint bonus) is fixed at the start of each day.
+Positions come from a numpy Generator, so fleets follow simulate_strategy
+in distribution rather than draw for draw. Per-fleet totals (profit, ROI)
+are summed with bincount.
+
+The scavenging section is the closed-form mission model of
+analyze-scavenging-economics.py: weekly parts value minus the recharges
+the missions' battery use costs, per mission and zone.
+"""
+
+import itertools
+import math
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Race classes of the economy model, by minimum wins
+ECONOMY_CLASSES = ["Scavenger", "Raider", "Elite", "SilentKlan"]
+CLASS_MIN_WINS = [3, 6, 10]  # wins needed for Raider, Elite, SilentKlan
+
+# Expected-position choices by effective rating; row i is for ratings
+# reaching i of RATING_TIERS (< 50, >= 50, >= 60, >= 70)
+RATING_TIERS = [50, 60, 70]
+EXPECTED_POSITIONS = np.array(
+    [
+        [4, 5, 6, 6, 7],
+        [3, 4, 4, 5, 5],
+        [2, 2, 3, 3, 4],
+        [1, 1, 2, 2, 3],
+    ]
+)
+
+# analyze-economics.py Scenario 1: ((speed, powerCore, acceleration,
+# stability), starting wins) of a 3-racer + 2-scavenger stable
+MIXED_FLEET = [
+    ((75, 70, 72, 68), 8),
+    ((72, 68, 70, 70), 7),
+    ((65, 62, 63, 60), 4),
+    ((50, 55, 52, 53), 1),
+    ((48, 58, 50, 54), 0),
+]
+
+FLEET_FIELDS = (
+    "races",
+    "wins",
+    "prize_money",
+    "entry_fees",
+    "recharges",
+    "repairs",
+)
+
+
+@dataclass(frozen=True)
+class EconomyConstants:
+    """Costs and race-economy constants; defaults are analyze-economics.py's"""
+
+    recharge_cost: float = 0.1
+    repair_cost: float = 0.05
+    recharge_amount: int = 75
+    repair_amount: int = 25
+    max_battery: int = 100
+    max_condition: int = 100
+    entry_fees: Dict[str, float] = field(
+        default_factory=lambda: {
+            "Scavenger": 0.05,
+            "Raider": 0.1,
+            "Elite": 0.25,
+            "SilentKlan": 0.5,
+        }
+    )
+    daily_sprint_bonus: Dict[str, float] = field(
+        default_factory=lambda: {
+            "Scavenger": 0.5,
+            "Raider": 0.5,
+            "Elite": 0,
+            "SilentKlan": 0,
+        }
+    )
+    prize_distribution: Tuple[float, ...] = (0.475, 0.2375, 0.1425, 0.095, 0.05)
+    platform_tax: float = 0.05
+    field_size: int = 8
+    battery_drain: float = 10  # short race
+    condition_wear: float = 3
+    terrain_battery_mod: float = 1.0  # MetalRoads
+    terrain_condition_mod: float = 1.0
+    race_floor: int = 20  # skip the race below this battery / condition
+    rescue_below: int = 40  # maintenance on a skipped race
+
+    def class_table(self, values: Dict[str, float]) -> np.ndarray:
+        return np.array([values.get(name, 0) for name in ECONOMY_CLASSES], float)
+
+    def prize_shares(self) -> np.ndarray:
+        """Share of the net pool by finishing position (index 0 unused)"""
+        shares = np.zeros(self.field_size + 2)
+        paid = min(self.field_size, len(self.prize_distribution), 5)
+        shares[1 : paid + 1] = self.prize_distribution[:paid]
+        return shares
+
+
+LIVE_ECONOMY = EconomyConstants()
+
+
+# ===== MECHANICS =====
+
+
+def power_core_efficiency(power_core: np.ndarray) -> np.ndarray:
+    """Battery drain multiplier (calculate_power_core_efficiency)"""
+    normalized = np.maximum(1.0, power_core)
+    log_effect = np.minimum(0.70, 0.70 * (np.log(normalized) / math.log(100.0)))
+    return 1.0 - log_effect
+
+
+def condition_penalty(condition: np.ndarray) -> np.ndarray:
+    return 1.0 + ((100 - condition) / 200.0)
+
+
+def battery_penalty(battery: np.ndarray) -> np.ndarray:
+    """Stat multiplier by battery level (calculate_battery_penalty)"""
+    return np.select(
+        [battery >= 80, battery >= 50, battery >= 25, battery >= 10],
+        [
+            1.0,
+            1.0 - (80 - battery) * 0.25 / 30,
+            0.75 - (50 - battery) * 0.25 / 25,
+            0.50 - (25 - battery) * 0.25 / 15,
+        ],
+        0.25 - (10 - battery) * 0.15 / 10,
+    )
+
+
+def position_wear_mod(position: np.ndarray) -> np.ndarray:
+    """POSITION_MOD: 0.8 for 1st, 1.0 for 2nd, 1.2 for 3rd, 1.4 below"""
+    return np.select(
+        [position == 1, position == 2, position == 3], [0.8, 1.0, 1.2], 1.4
+    )
+
+
+def race_class_codes(wins: np.ndarray) -> np.ndarray:
+    """Index into ECONOMY_CLASSES for each bot's win count"""
+    return np.searchsorted(CLASS_MIN_WINS, wins, side="right")
+
+
+# ===== FLEETS =====
+
+
+@dataclass
+class Fleets:
+    """
+    Bots of many fleets, flattened. stats columns are speed, powerCore,
+    acceleration, stability; thresholds are per fleet.
+    """
+
+    fleet: np.ndarray  # (n,) fleet index of each bot
+    stats: np.ndarray  # (n, 4)
+    wins: np.ndarray  # (n,) starting wins
+    races_per_day: np.ndarray  # (n,)
+    recharge_below: np.ndarray  # (F,)
+    repair_below: np.ndarray  # (F,)
+
+    @property
+    def num_fleets(self) -> int:
+        return len(self.recharge_below)
+
+    def __len__(self) -> int:
+        return len(self.fleet)
+
+
+def fleet_grid(
+    template_stats: Sequence[Sequence[float]],
+    template_wins: Sequence[int],
+    fleet_sizes: Sequence[int],
+    races_per_day: Sequence[int],
+    recharge_below: Sequence[float] = (50,),
+    repair_below: Sequence[float] = (50,),
+    replicates: int = 1,
+) -> Tuple[Fleets, List[dict]]:
+    """
+    Every combination of fleet size x races per day x thresholds, each
+    `replicates` times. A fleet of size k races the first k template bots
+    (cycled). Fleet f belongs to scenario f // replicates.
+    """
+    template_stats = np.asarray(template_stats, dtype=np.float64)
+    template_wins = np.asarray(template_wins, dtype=np.int64)
+    scenarios = [
+        {
+            "fleet_size": size,
+            "races_per_day": rpd,
+            "recharge_below": recharge,
+            "repair_below": repair,
+        }
+        for size, rpd, recharge, repair in itertools.product(
+            fleet_sizes, races_per_day, recharge_below, repair_below
+        )
+    ]
+    sizes = np.repeat([s["fleet_size"] for s in scenarios], replicates)
+    fleet = np.repeat(np.arange(len(sizes)), sizes)
+    slot = np.arange(len(fleet)) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+    rows = slot % len(template_stats)
+
+    def per_fleet(name):
+        return np.repeat([s[name] for s in scenarios], replicates).astype(np.float64)
+
+    fleets = Fleets(
+        fleet=fleet,
+        stats=template_stats[rows],
+        wins=template_wins[rows],
+        races_per_day=per_fleet("races_per_day").astype(np.int64)[fleet],
+        recharge_below=per_fleet("recharge_below"),
+        repair_below=per_fleet("repair_below"),
+    )
+    return fleets, scenarios
+
+
+@dataclass
+class FleetResults:
+    """Per-fleet totals; `bots` holds the same fields per bot"""
+
+    fleets: Dict[str, np.ndarray]
+    bots: Dict[str, np.ndarray]
+    days: int
+    constants: EconomyConstants = LIVE_ECONOMY
+
+    def __len__(self) -> int:
+        return len(self.fleets["races"])
+
+    @property
+    def maintenance_cost(self) -> np.ndarray:
+        return (
+            self.fleets["recharges"] * self.constants.recharge_cost
+            + self.fleets["repairs"] * self.constants.repair_cost
+        )
+
+    @property
+    def total_costs(self) -> np.ndarray:
+        return self.fleets["entry_fees"] + self.maintenance_cost
+
+    @property
+    def net_profit(self) -> np.ndarray:
+        return self.fleets["prize_money"] - self.total_costs
+
+    @property
+    def roi_percentage(self) -> np.ndarray:
+        costs = self.total_costs
+        out = np.zeros(len(self))
+        np.divide(self.net_profit * 100, costs, out=out, where=costs > 0)
+        return out
+
+    @property
+    def hourly_rate(self) -> np.ndarray:
+        return (
+            self.net_profit / self.days / 24 if self.days > 0 else np.zeros(len(self))
+        )
+
+
+def simulate_fleets(
+    fleets: Fleets,
+    days: int = 7,
+    constants: EconomyConstants = LIVE_ECONOMY,
+    seed: Optional[int] = None,
+) -> FleetResults:
+    """Run every fleet for `days` days, all bots one race tick at a time"""
+    rng = np.random.default_rng(seed)
+    n = len(fleets)
+    c = constants
+    battery = np.full(n, c.max_battery, dtype=np.int64)
+    condition = np.full(n, c.max_condition, dtype=np.int64)
+    wins = fleets.wins.astype(np.int64)
+    rating = fleets.stats.sum(axis=1) / 4
+    efficiency = power_core_efficiency(fleets.stats[:, 1])
+    recharge_below = fleets.recharge_below[fleets.fleet]
+    repair_below = fleets.repair_below[fleets.fleet]
+    races_today = fleets.races_per_day
+    fees = c.class_table(c.entry_fees)
+    bonuses = c.class_table(c.daily_sprint_bonus)
+    shares = c.prize_shares()
+
+    totals = {name: np.zeros(n) for name in FLEET_FIELDS}
+
+    def maintain(mask, battery_below, condition_below):
+        recharge = mask & (battery < battery_below)
+        repair = mask & (condition < condition_below)
+        battery[recharge] = np.minimum(
+            c.max_battery, battery[recharge] + c.recharge_amount
+        )
+        condition[repair] = np.minimum(
+            c.max_condition, condition[repair] + c.repair_amount
+        )
+        totals["recharges"] += recharge
+        totals["repairs"] += repair
+
+    ticks = int(races_today.max()) if n else 0
+    for _ in range(days):
+        race_class = race_class_codes(wins)
+        entry_fee = fees[race_class]
+        pool = (c.field_size * entry_fee + bonuses[race_class]) * (1 - c.platform_tax)
+        for race_num in range(ticks):
+            active = race_num < races_today
+            grounded = active & ((battery < c.race_floor) | (condition < c.race_floor))
+            maintain(grounded, c.rescue_below, c.rescue_below)
+            racing = active & ~grounded
+
+            tier = np.searchsorted(
+                RATING_TIERS, rating * battery_penalty(battery), side="right"
+            )
+            expected = EXPECTED_POSITIONS[tier, rng.integers(0, 5, n)]
+            drain = (
+                c.battery_drain
+                * c.terrain_battery_mod
+                * efficiency
+                * condition_penalty(condition)
+            ).astype(np.int64)
+            wear = (
+                c.condition_wear * position_wear_mod(expected) * c.terrain_condition_mod
+            ).astype(np.int64)
+            position = np.clip(expected + rng.integers(-1, 2, n), 1, c.field_size)
+
+            battery -= np.where(racing, np.minimum(battery, drain), 0)
+            condition -= np.where(racing, np.minimum(condition, wear), 0)
+            won = racing & (position == 1)
+            wins += won
+            totals["races"] += racing
+            totals["wins"] += won
+            totals["entry_fees"] += np.where(racing, entry_fee, 0)
+            totals["prize_money"] += np.where(racing, pool * shares[position], 0)
+
+            maintain(
+                racing & (race_num < races_today - 1), recharge_below, repair_below
+            )
+
+    per_fleet = {
+        name: np.bincount(fleets.fleet, weights=values, minlength=fleets.num_fleets)
+        for name, values in totals.items()
+    }
+    return FleetResults(per_fleet, totals, days, constants)
+
+
+def percentiles(values: np.ndarray, q: Sequence[float] = (5, 50, 95)) -> np.ndarray:
+    """Percentiles along the last axis, e.g. of a per-fleet array reshaped
+    to (scenarios, replicates)"""
+    return np.percentile(values, q, axis=-1).T
+
+
+# ===== SCAVENGING =====
+
+
+@dataclass(frozen=True)
+class ScavengingConstants:
+    """Mission and zone tables; defaults are analyze-scavenging-economics.py's"""
+
+    parts_to_icp: float = 0.01
+    recharge_cost: float = 0.1
+    recharge_amount: float = 75
+    missions: Dict[str, dict] = field(
+        default_factory=lambda: {
+            "ShortExpedition": {
+                "duration_hours": 6,
+                "parts_min": 15,
+                "parts_max": 35,
+                "battery_cost": 20,
+            },
+            "DeepSalvage": {
+                "duration_hours": 12,
+                "parts_min": 40,
+                "parts_max": 80,
+                "battery_cost": 40,
+            },
+            "WastelandExpedition": {
+                "duration_hours": 24,
+                "parts_min": 100,
+                "parts_max": 200,
+                "battery_cost": 80,
+            },
+        }
+    )
+    zones: Dict[str, dict] = field(
+        default_factory=lambda: {
+            "ScrapHeaps": {"parts_mult": 1.0, "battery_mult": 1.0},
+            "AbandonedSettlements": {"parts_mult": 1.4, "battery_mult": 1.2},
+            "DeadMachineFields": {"parts_mult": 2.0, "battery_mult": 1.5},
+        }
+    )
+
+
+LIVE_SCAVENGING = ScavengingConstants()
+
+
+def scavenging_income(
+    constants: ScavengingConstants = LIVE_SCAVENGING,
+) -> Dict[Tuple[str, str], dict]:
+    """Weekly parts, value, recharge cost and net per bot, by (mission, zone)"""
+    out = {}
+    for mission, m in constants.missions.items():
+        missions_per_week = 7 * 24 / m["duration_hours"]
+        avg_parts = (m["parts_min"] + m["parts_max"]) / 2
+        for zone, z in constants.zones.items():
+            parts = avg_parts * z["parts_mult"] * missions_per_week
+            battery = m["battery_cost"] * z["battery_mult"] * missions_per_week
+            recharge = battery / constants.recharge_amount * constants.recharge_cost
+            value = parts * constants.parts_to_icp
+            out[mission, zone] = {
+                "parts": parts,
+                "value": value,
+                "recharge_cost": recharge,
+                "net": value - recharge,
+            }
+    return out
@@ -0,0 +1,226 @@
+"""
+Scalar race-time engines.
+
+Engine variants are registered by name in ENGINES:
+- legacy-v1: original seeding (race_id * 7919 chaos, fixed-multiplier noise)
+- hashed-v2: current seeding (mixed_seed * 2654435761 hash)
+- segmented: track-segment model from simulateRaceSegmented
+
+legacy-v1 and hashed-v2 port the seeding and stat modifiers of Motoko
+RacingSimulator.calculateRaceTime plus a Python-only stat-synergy term
+(_stat_synergy) that Motoko does not have, so their times are not the
+canister's.
+
+These are the reference implementations that the array-based engines are
+checked against.
+"""
+
+import heapq
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from .models import Bot, RaceConfig
+from .segmented import calculate_race_time_segmented
+
+RaceTimeFn = Callable[[RaceConfig, Bot, int], float]
+
+
+def _stat_modifiers(race: RaceConfig, bot: Bot) -> Tuple[float, float, float]:
+    """Return (base_time, terrain_mod, distance_mod) for a race"""
+    distance = float(race.distance)
+    stats = bot.stats
+
+    speed = float(stats.speed)
+    power_core = float(stats.powerCore)
+    stability = float(stats.stability)
+    acceleration = float(stats.acceleration)
+
+    base_time = distance * (100.0 / speed) * 30.0
+
+    if race.terrain == "ScrapHeaps":
+        terrain_mod = 1.0 + ((100.0 - stability) / 150.0)
+    elif race.terrain == "WastelandSand":
+        terrain_mod = 1.0 + ((100.0 - power_core) / 200.0)
+    elif race.terrain == "MetalRoads":
+        terrain_mod = 1.0 + ((100.0 - acceleration) / 250.0)
+    else:
+        terrain_mod = 1.0
+
+    if race.distance < 10:
+        distance_mod = 1.0 - ((acceleration + speed - 60.0) / 350.0)
+    elif race.distance > 20:
+        distance_mod = 1.0 - ((power_core + stability - 60.0) / 350.0)
+    else:
+        distance_mod = 1.0 - (
+            (speed + power_core + acceleration + stability - 160.0) / 700.0
+        )
+
+    return base_time, terrain_mod, distance_mod
+
+
+def _stat_synergy(bot: Bot) -> float:
+    """Synergy between complementary stats"""
+    speed = float(bot.stats.speed)
+    power_core = float(bot.stats.powerCore)
+    stability = float(bot.stats.stability)
+    acceleration = float(bot.stats.acceleration)
+
+    if (
+        (speed > 80 and acceleration > 80)
+        or (power_core > 80 and stability > 80)
+        or (speed > 75 and power_core > 75 and acceleration > 75 and stability > 75)
+    ):
+        return 0.95
+    elif (speed < 40 and power_core < 40) or (acceleration < 40 and stability < 40):
+        return 1.08
+    return 1.0
+
+
+def _participant_seed(race: RaceConfig, participant_index: int) -> int:
+    race_time_seed = abs(race.start_time // 1_000_000_000)
+    combined_seed = race.race_id + race_time_seed
+    return combined_seed * 1000 + participant_index
+
+
+def calculate_race_time_legacy(
+    race: RaceConfig, bot: Bot, participant_index: int
+) -> float:
+    """
+    Original Motoko calculateRaceTime seeding (legacy-v1), times the
+    Python-only stat synergy
+    """
+    base_time, terrain_mod, distance_mod = _stat_modifiers(race, bot)
+    seed = _participant_seed(race, participant_index)
+
+    # Race-specific chaos factor
+    race_chaos_seed = (race.race_id * 7919) % 1000
+    race_chaos = 0.90 + (float(race_chaos_seed) / 5000.0)  # ±10%
+
+    # Per-bot randomness (±15%)
+    bot_random_seed = (seed * 2971) % 1000
+    bot_random = 0.85 + (float(bot_random_seed) / 3333.0)
+
+    # Position-based variance (±3%)
+    position_seed = (seed * 4993) % 100
+    position_bonus = 0.97 + (float(position_seed) / 3333.0)
+
+    final_time = (
+        base_time
+        * terrain_mod
+        * distance_mod
+        * race_chaos
+        * bot_random
+        * position_bonus
+        * _stat_synergy(bot)
+    )
+
+    return max(1.0, final_time)
+
+
+def calculate_race_time(race: RaceConfig, bot: Bot, participant_index: int) -> float:
+    """
+    Current Motoko calculateRaceTime seeding (hashed-v2), times the
+    Python-only stat synergy
+    """
+    base_time, terrain_mod, distance_mod = _stat_modifiers(race, bot)
+    seed = _participant_seed(race, participant_index)
+    stats = bot.stats
+
+    # Better pseudo-random using multiple hash-like operations
+    race_seed = (race.race_id * 31337 + 12345) % 100000
+    stat_mix = (
+        stats.speed * 7
+        + stats.powerCore * 11
+        + stats.acceleration * 13
+        + stats.stability * 17
+    ) % 10000
+    mixed_seed = (seed * 2654435761 + race_seed + stat_mix) % 1000000
+
+    # Race-specific chaos factor (±15%)
+    race_chaos_value = (mixed_seed // 7) % 1000
+    race_chaos = 0.85 + (float(race_chaos_value) / 3333.0)
+
+    # Per-bot randomness (±20%)
+    bot_random_value = (mixed_seed // 11) % 1000
+    bot_random = 0.80 + (float(bot_random_value) / 2500.0)
+
+    # Position-based variance (±10%)
+    position_value = (mixed_seed // 13) % 1000
+    position_bonus = 0.90 + (float(position_value) / 5000.0)
+
+    final_time = (
+        base_time
+        * terrain_mod
+        * distance_mod
+        * race_chaos
+        * bot_random
+        * position_bonus
+        * _stat_synergy(bot)
+    )
+
+    return max(1.0, final_time)
+
+
+ENGINES: Dict[str, RaceTimeFn] = {
+    "legacy-v1": calculate_race_time_legacy,
+    "hashed-v2": calculate_race_time,
+    "segmented": calculate_race_time_segmented,
+}
+
+DEFAULT_ENGINE = "hashed-v2"
+
+
+def get_engine(name: str) -> RaceTimeFn:
+    """Look up a race-time function by engine name"""
+    try:
+        return ENGINES[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown engine '{name}' (expected one of: {', '.join(ENGINES)})"
+        ) from None
+
+
+def race_times(
+    race: RaceConfig, bots: List[Bot], engine: str = DEFAULT_ENGINE
+) -> List[float]:
+    """Race time of every bot, in entry order"""
+    race_time = get_engine(engine)
+    return [race_time(race, bot, i) for i, bot in enumerate(bots)]
+
+
+def rank_times(times: Sequence[float], top: Optional[int] = None) -> List[int]:
+    """
+    Entry indices in finishing order; ties keep entry order.
+
+    top=1 is a single min() scan, a small top a heap selection and
+    top=None a full sort.
+    """
+    n = len(times)
+    key = times.__getitem__
+    if top is None or top >= n:
+        return sorted(range(n), key=key)
+    if top == 1:
+        return [min(range(n), key=key)]
+    return heapq.nsmallest(top, range(n), key=key)
+
+
+def rank_race(
+    race: RaceConfig,
+    bots: List[Bot],
+    engine: str = DEFAULT_ENGINE,
+    top: Optional[int] = None,
+) -> List[int]:
+    """Entry indices of the first `top` finishers (all when top is None)"""
+    return rank_times(race_times(race, bots, engine), top)
+
+
+def race_winner(race: RaceConfig, bots: List[Bot], engine: str = DEFAULT_ENGINE) -> Bot:
+    """The winning bot, without ranking the rest of the field"""
+    return bots[rank_race(race, bots, engine, top=1)[0]]
+
+
+def simulate_race(
+    race: RaceConfig, bots: List[Bot], engine: str = DEFAULT_ENGINE
+) -> List[Tuple[Bot, float]]:
+    """Simulate a race and return sorted results"""
+    times = race_times(race, bots, engine)
+    return [(bots[i], times[i]) for i in rank_times(times)]
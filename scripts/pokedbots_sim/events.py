@@ -0,0 +1,461 @@
+"""
+Segmented races with race events (port of simulateRaceSegmented).
+
+Segment times come from the array engine (segment_time_tensor, bit-identical
+to segmented.simulate_segments) and are accumulated segment by segment, so
+final times equal simulate_track(). With events enabled, the standings
+after every segment drive the canister's commentary rules:
+
+    ExceptionalPerformance  segment performance multiplier < 0.97, with a
+                            per-bot streak (reset by a poor segment)
+    PoorPerformance         multiplier > 1.48, first three of a streak,
+                            announced in standings order
+    LeadChange              leader differs from the previous segment's
+    LargeGap                leader > 10s ahead, every 5th segment
+    CloseRacing             top two < 3s apart from segment 3, with a
+                            two-segment cooldown unless the gap shrinks
+    SegmentComplete         race start, lap completions, and the podium
+                            on the final lap
+
+Events are then sorted by timestamp and filtered to the highest-priority
+event per one-second bucket, as the canister returns them. Overtake is part
+of the canister's event type but is never emitted.
+
+Bots are named by nft id text (the token id, as on the canister). Gap
+figures in descriptions use Python's float repr for Float.toText.
+"""
+
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+
+from .models import TERRAINS, Bot, RaceConfig
+from .roster import BotRoster
+from .segmented import race_track_seed
+from .segmented_vectorized import (
+    PERFORMANCE_TABLE,
+    compile_track,
+    race_time_tensor,
+    segment_time_tensor,
+)
+from .tracks import TrackTemplate, get_track, select_track_for_race
+from .vectorized import RaceBatch, stats_matrix
+
+Field = Union[Sequence[Bot], BotRoster, np.ndarray]
+
+OVERTAKE = "Overtake"
+LEAD_CHANGE = "LeadChange"
+LARGE_GAP = "LargeGap"
+CLOSE_RACING = "CloseRacing"
+EXCEPTIONAL_PERFORMANCE = "ExceptionalPerformance"
+POOR_PERFORMANCE = "PoorPerformance"
+SEGMENT_COMPLETE = "SegmentComplete"
+
+EVENT_PRIORITY = {
+    LEAD_CHANGE: 2,
+    OVERTAKE: 2,
+    EXCEPTIONAL_PERFORMANCE: 4,
+    CLOSE_RACING: 5,
+    LARGE_GAP: 6,
+    POOR_PERFORMANCE: 7,
+}
+PODIUM_PHRASES = ("wins the race", "second place", "podium in third")
+
+FIRST_STRUGGLE = [
+    "Bot {} takes that turn wide!",
+    "Bot {} clips the barrier!",
+    "Bot {} misses the apex!",
+    "Bot {} slides through the corner!",
+    "Bot {} loses traction!",
+    "Bot {} runs wide through debris!",
+]
+SECOND_STRUGGLE = [
+    "Bot {} struggles again!",
+    "Bot {} another mistake!",
+    "Bot {} can't find the line!",
+    "Bot {} hits trouble again!",
+]
+GOOD_STREAK = [
+    "Bot {} nails the perfect line!",
+    "Bot {} finds the line again!",
+    "Bot {} is on fire!",
+    "Bot {} is absolutely flying!",
+]
+PODIUM = [
+    "Bot {} wins the race!",
+    "Bot {} takes second place!",
+    "Bot {} rounds out the podium in third!",
+]
+
+
+@dataclass
+class RaceEvent:
+    """One commentary event; data holds the canister variant's fields"""
+
+    event_type: str
+    data: dict
+    timestamp: float  # elapsed race time in seconds
+    segment_index: int
+    description: str
+
+
+@dataclass
+class SegmentedRace:
+    """A simulated race; arrays follow entry order"""
+
+    track_id: int
+    track_seed: int
+    nft_ids: List[str]
+    times: np.ndarray  # (N,) final times
+    order: np.ndarray  # (N,) entry indices in finishing order
+    events: List[RaceEvent] = field(default_factory=list)
+
+    @property
+    def winner(self) -> str:
+        return self.nft_ids[int(self.order[0])]
+
+    def positions(self) -> np.ndarray:
+        """1-based finishing position per entry"""
+        positions = np.empty(len(self.order), dtype=np.int64)
+        positions[self.order] = np.arange(1, len(self.order) + 1)
+        return positions
+
+
+def event_priority(event: RaceEvent) -> int:
+    """1 = podium (highest) ... 7 = poor performance"""
+    if event.event_type == SEGMENT_COMPLETE:
+        if any(phrase in event.description for phrase in PODIUM_PHRASES):
+            return 1
+        return 3
+    return EVENT_PRIORITY[event.event_type]
+
+
+def filter_events(events: Iterable[RaceEvent]) -> List[RaceEvent]:
+    """Highest-priority event per one-second bucket, in timestamp order"""
+    kept: List[RaceEvent] = []
+    last_bucket = -1
+    last_priority = 999
+    for event in sorted(events, key=lambda e: e.timestamp):
+        bucket = abs(int(event.timestamp))
+        priority = event_priority(event)
+        if bucket > last_bucket:
+            kept.append(event)
+            last_bucket = bucket
+            last_priority = priority
+        elif priority < last_priority:
+            kept[-1] = event
+            last_priority = priority
+    return kept
+
+
+def _gap_tenths(gap: float) -> float:
+    return float(abs(int(gap * 10.0))) / 10.0
+
+
+def _gap_text(rounded: float) -> str:
+    if rounded < 0.1:
+        return "0.1"
+    if rounded >= 10.0:
+        return str(abs(int(rounded)))
+    tenths = abs(int(rounded * 10.0))
+    return f"{tenths // 10}.{tenths % 10}"
+
+
+def _race_events(
+    nft_ids: List[str],
+    cumulative: np.ndarray,
+    condition_seed: np.ndarray,
+    lap_length: int,
+    laps: int,
+) -> List[RaceEvent]:
+    """Unfiltered events for one race; arrays are (N x S)"""
+    n, num_segments = cumulative.shape
+    elapsed = cumulative.T.tolist()  # [segment][bot]
+    seeds = condition_seed.T.tolist()
+    performance = PERFORMANCE_TABLE[condition_seed].T.tolist()
+    standings_by_segment = np.argsort(cumulative, axis=0, kind="stable").T.tolist()
+
+    events = [
+        RaceEvent(
+            SEGMENT_COMPLETE,
+            {"segmentIndex": 0, "leader": "none"},
+            0.0,
+            0,
+            f"Race start! {n} bots charge off the line!",
+        )
+    ]
+    good_streaks = {}
+    poor_streaks = {}
+    previous_leader = None
+    previous_gap = 0.0
+    consecutive_large_gaps = 0
+    previous_close_gap = 0.0
+    last_close_segment = 0
+    used_intense_battle = False
+    finisher_count = 0
+    announced = set()
+
+    for s in range(num_segments):
+        times = elapsed[s]
+        poor = {}
+        for i in range(n):
+            bot = nft_ids[i]
+            multiplier = performance[s][i]
+            if multiplier < 0.97:
+                streak = good_streaks.get(bot, 0) + 1
+                good_streaks[bot] = streak
+                events.append(
+                    RaceEvent(
+                        EXCEPTIONAL_PERFORMANCE,
+                        {"bot": bot, "performancePct": (1.0 - multiplier) * 100.0},
+                        times[i],
+                        s,
+                        GOOD_STREAK[min(streak, 4) - 1].format(bot),
+                    )
+                )
+                poor_streaks[bot] = 0
+            elif multiplier > 1.48:
+                streak = poor_streaks.get(bot, 0) + 1
+                poor_streaks[bot] = streak
+                poor[i] = ((multiplier - 1.0) * 100.0, streak, seeds[s][i])
+                good_streaks[bot] = 0
+
+        standings = standings_by_segment[s]
+        for i in standings:
+            if i not in poor:
+                continue
+            percent, streak, seed = poor[i]
+            if streak > 3:
+                continue
+            bot = nft_ids[i]
+            if streak == 1:
+                message = FIRST_STRUGGLE[seed % 6].format(bot)
+            elif streak == 2:
+                message = SECOND_STRUGGLE[seed % 4].format(bot)
+            else:
+                message = f"Just not Bot {bot}'s day at all!"
+            events.append(
+                RaceEvent(
+                    POOR_PERFORMANCE,
+                    {"bot": bot, "performancePct": percent},
+                    times[i],
+                    s,
+                    message,
+                )
+            )
+
+        first, second = standings[0], standings[1]
+        leader = nft_ids[first]
+        chaser = nft_ids[second]
+        if previous_leader is None:
+            events.append(
+                RaceEvent(
+                    LEAD_CHANGE,
+                    {"newLeader": leader, "previousLeader": "none"},
+                    times[first],
+                    s,
+                    f"Bot {leader} takes the early lead!",
+                )
+            )
+        elif leader != previous_leader:
+            events.append(
+                RaceEvent(
+                    LEAD_CHANGE,
+                    {"newLeader": leader, "previousLeader": previous_leader},
+                    times[first],
+                    s,
+                    f"Bot {leader} takes the lead from Bot {previous_leader}!",
+                )
+            )
+        previous_leader = leader
+
+        gap = times[second] - times[first]
+        if gap > 10.0 and s % 5 == 0:
+            growing = gap > previous_gap
+            rounded = repr(_gap_tenths(gap))
+            consecutive_large_gaps += 1
+            if consecutive_large_gaps == 1:
+                message = f"Bot {leader} has pulled {rounded} seconds ahead!"
+            elif consecutive_large_gaps == 2 and growing:
+                message = f"Bot {leader} is still in the lead and the gap is growing!"
+            elif consecutive_large_gaps >= 3 and growing:
+                message = f"Bot {leader} is so far ahead, this race might be over!"
+            elif not growing and gap > 10.0:
+                message = f"Bot {chaser} is gaining on the leader!"
+            else:
+                message = f"Bot {leader} maintains a {rounded} second lead!"
+            events.append(
+                RaceEvent(
+                    LARGE_GAP,
+                    {"leader": leader, "gapSeconds": gap},
+                    times[first],
+                    s,
+                    message,
+                )
+            )
+            previous_gap = gap
+        elif gap <= 10.0:
+            consecutive_large_gaps = 0
+
+        if gap < 3.0 and s >= 3:
+            changed = previous_close_gap == 0.0 or abs(gap - previous_close_gap) > 0.1
+            shrinking = previous_close_gap > 0.0 and gap < previous_close_gap
+            growing = previous_close_gap > 0.0 and gap > previous_close_gap
+            cooldown_passed = s >= last_close_segment and s - last_close_segment >= 2
+            if changed and (cooldown_passed or shrinking):
+                text = _gap_text(_gap_tenths(gap))
+                if shrinking and gap < 0.5:
+                    message = f"Bot {chaser} is right on the heels of Bot {leader}!"
+                elif shrinking:
+                    message = f"Bot {chaser} closing in! Gap down to {text}s!"
+                elif previous_close_gap == 0.0 and not used_intense_battle:
+                    used_intense_battle = True
+                    message = (
+                        f"Intense battle! Bot {leader} and Bot {chaser} "
+                        f"separated by just {text}s!"
+                    )
+                elif growing:
+                    message = f"Bot {leader} pulling away, gap now {text}s"
+                else:
+                    message = f"Still tight racing at {text}s apart"
+                events.append(
+                    RaceEvent(
+                        CLOSE_RACING,
+                        {"bots": [leader, chaser], "gapSeconds": gap},
+                        times[first],
+                        s,
+                        message,
+                    )
+                )
+                last_close_segment = s
+            previous_close_gap = gap
+        else:
+            previous_close_gap = 0.0
+
+        if (s + 1) % lap_length == 0:
+            lap = (s + 1) // lap_length
+            if lap == laps:
+                for i in standings:
+                    bot = nft_ids[i]
+                    if bot in announced or finisher_count >= 3:
+                        continue
+                    finisher_count += 1
+                    announced.add(bot)
+                    events.append(
+                        RaceEvent(
+                            SEGMENT_COMPLETE,
+                            {"segmentIndex": s, "leader": bot},
+                            times[i],
+                            s,
+                            PODIUM[finisher_count - 1].format(bot),
+                        )
+                    )
+            else:
+                events.append(
+                    RaceEvent(
+                        SEGMENT_COMPLETE,
+                        {"segmentIndex": s, "leader": leader},
+                        times[first],
+                        s,
+                        f"Lap {lap} complete! Bot {leader} leads!",
+                    )
+                )
+    return events
+
+
+def _field_columns(field: Field, nft_ids: Optional[Sequence[str]]):
+    if isinstance(field, np.ndarray):
+        stats = np.asarray(field, dtype=np.int64)
+        if nft_ids is None:
+            nft_ids = [str(i) for i in range(len(stats))]
+    else:
+        stats = stats_matrix(field)
+        if nft_ids is None:
+            if isinstance(field, BotRoster):
+                nft_ids = [str(t) for t in field.token_ids.tolist()]
+            else:
+                nft_ids = [str(b.token_id) for b in field]
+    if len(stats) < 2:
+        raise ValueError("a segmented race needs at least two participants")
+    return stats, list(nft_ids)
+
+
+def simulate_track_race(
+    track: TrackTemplate,
+    field: Field,
+    track_seed: int,
+    nft_ids: Optional[Sequence[str]] = None,
+    events: bool = True,
+    filtered: bool = True,
+) -> SegmentedRace:
+    """
+    Race a field (entry order) over a track template, like
+    debug_simulate_race(trackId, tokens, seed).
+
+    Args:
+        events: generate race events (False: times and order only)
+        filtered: apply the canister's one-event-per-second filter
+    """
+    stats, nft_ids = _field_columns(field, nft_ids)
+    compiled = compile_track(track)
+    index = np.arange(len(stats), dtype=np.int64)
+
+    if not events:
+        times = race_time_tensor(compiled, stats, [track_seed], index)[0]
+        order = np.argsort(times, kind="stable")
+        return SegmentedRace(track.track_id, track_seed, nft_ids, times, order)
+
+    segment_times = segment_time_tensor(compiled, stats, [track_seed], index)[0]
+    cumulative = np.cumsum(segment_times, axis=1)
+    # (segment_seed * 31337 + i * 7919 + lap * 12345) % 1000 by residues;
+    # segment_seed = track_seed + i * 1000 + segment
+    seed_mod = (track_seed % 1000 + np.arange(len(compiled))) % 1000
+    condition_seed = (
+        (seed_mod * 31337 + compiled.lap * 12345)[None, :] + (index * 7919)[:, None]
+    ) % 1000
+
+    race_events = _race_events(
+        nft_ids, cumulative, condition_seed, len(track.segments), track.laps
+    )
+    times = cumulative[:, -1]
+    return SegmentedRace(
+        track.track_id,
+        track_seed,
+        nft_ids,
+        times,
+        np.argsort(times, kind="stable"),
+        filter_events(race_events) if filtered else race_events,
+    )
+
+
+def simulate_race_segmented(
+    race: RaceConfig,
+    field: Field,
+    events: bool = True,
+    filtered: bool = True,
+) -> SegmentedRace:
+    """A race config on the track the canister would pick for it"""
+    track = get_track(select_track_for_race(race.terrain, race.race_id))
+    return simulate_track_race(
+        track, field, race_track_seed(race), events=events, filtered=filtered
+    )
+
+
+def iter_segmented_races(
+    races: Union[RaceBatch, Iterable[RaceConfig]],
+    field: Field,
+    events: bool = True,
+) -> Iterator[SegmentedRace]:
+    """simulate_race_segmented() over many races, evaluated lazily"""
+    if isinstance(races, RaceBatch):
+        batch = races
+        races = (batch.config(i) for i in range(len(batch)))
+    stats, nft_ids = _field_columns(field, None)
+    for race in races:
+        if race.terrain not in TERRAINS:
+            raise ValueError(f"Unknown terrain: {race.terrain}")
+        track = get_track(select_track_for_race(race.terrain, race.race_id))
+        yield simulate_track_race(
+            track, stats, race_track_seed(race), nft_ids, events=events
+        )
@@ -0,0 +1,228 @@
+"""
+Pairwise head-to-head win probabilities for a whole field.
+
+Entry (i, j) of the matrix is the fraction of races in the race mix that
+bot i wins in a two-bot race against bot j, with i entered first (the
+analyze_head_to_head(bot1, bot2) convention; ties go to the first entry).
+Each race's outcome is exact, so entries match a simulate_race() loop.
+
+The matrix is built in square tiles: race times for a tile's row bots
+(entry index 0) and column bots (entry index 1) are evaluated for the whole
+race mix and compared race by race, so memory stays at O(races x block +
+block^2) for any field size. Tiles are written straight into a float32
+.npy memory map, and a tile map records finished tiles so an interrupted
+build resumes where it stopped.
+
+A matrix directory holds:
+
+    matrix.npy     (N x N) float32 win probabilities
+    tiles.npy      (T x T) bool, finished tiles
+    token_ids.npy  (N,) token ids in matrix order
+    meta.json      engine, race mix digest, block size
+"""
+
+import hashlib
+import json
+import os
+from typing import List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .engine import DEFAULT_ENGINE, get_engine
+from .models import TERRAINS, Bot
+from .roster import BotRoster
+from .segmented_vectorized import segmented_race_time_matrix
+from .vectorized import RaceBatch, race_time_matrix, standard_schedule, stats_matrix
+
+DEFAULT_BLOCK = 1024
+
+# Race mix used by analyze_head_to_head() in analyze-race-variance.py
+HEAD_TO_HEAD_DISTANCES = [5, 15, 25]
+
+Field = Union[Sequence[Bot], BotRoster]
+
+
+def head_to_head_schedule(
+    num_races: int = 100, distances: Sequence[int] = HEAD_TO_HEAD_DISTANCES
+) -> RaceBatch:
+    """The analyze_head_to_head race mix: terrains and distances cycle together"""
+    return standard_schedule(num_races, TERRAINS, distances)
+
+
+def _races_digest(races: RaceBatch) -> str:
+    digest = hashlib.sha256()
+    for column in (races.race_id, races.distance, races.terrain, races.start_time):
+        digest.update(np.ascontiguousarray(column, dtype=np.int64).tobytes())
+    return digest.hexdigest()
+
+
+def _entry_times(stats, races, engine, entry) -> np.ndarray:
+    """(R x N) race times with every bot at the given entry index"""
+    participant_index = np.full(len(stats), entry, dtype=np.int64)
+    if engine == "segmented":
+        return segmented_race_time_matrix(stats, races, participant_index)
+    return race_time_matrix(stats, races, participant_index, engine=engine)
+
+
+def _tile_wins(first: np.ndarray, second: np.ndarray) -> np.ndarray:
+    """Races won by each first-entry bot against each second-entry bot"""
+    wins = np.zeros((first.shape[1], second.shape[1]), dtype=np.int32)
+    won = np.empty(wins.shape, dtype=bool)
+    for r in range(len(first)):
+        np.less_equal(first[r, :, None], second[r, None, :], out=won)
+        wins += won
+    return wins
+
+
+class HeadToHead:
+    """An on-disk head-to-head matrix, rows and columns in token_ids order"""
+
+    def __init__(self, path: str, mode: str = "r"):
+        self.path = path
+        with open(os.path.join(path, "meta.json")) as f:
+            self.meta = json.load(f)
+        self.token_ids = np.load(os.path.join(path, "token_ids.npy"))
+        self.matrix = np.load(os.path.join(path, "matrix.npy"), mmap_mode=mode)
+        self.tiles = np.load(os.path.join(path, "tiles.npy"), mmap_mode=mode)
+        self._index = {int(t): i for i, t in enumerate(self.token_ids.tolist())}
+
+    def __len__(self) -> int:
+        return len(self.token_ids)
+
+    @property
+    def complete(self) -> bool:
+        return bool(self.tiles.all())
+
+    def index_of(self, token_id: int) -> int:
+        try:
+            return self._index[int(token_id)]
+        except KeyError:
+            raise KeyError(f"Token {token_id} is not in this matrix") from None
+
+    def win_probability(self, token_a: int, token_b: int) -> float:
+        """P(a beats b) with a entered first"""
+        return float(self.matrix[self.index_of(token_a), self.index_of(token_b)])
+
+    def beaten_by(self, token_id: int) -> np.ndarray:
+        """
+        P(each bot beats token_id), averaged over both entry orders; the
+        token's own entry is NaN.
+        """
+        i = self.index_of(token_id)
+        as_first = 1.0 - self.matrix[i, :].astype(np.float64)
+        as_second = self.matrix[:, i].astype(np.float64)
+        p = (as_first + as_second) / 2.0
+        p[i] = np.nan
+        return p
+
+    def _top(self, scores: np.ndarray, k: int) -> List[Tuple[int, float]]:
+        valid = np.flatnonzero(~np.isnan(scores))
+        k = min(k, len(valid))
+        if k == 0:
+            return []
+        top = valid[np.argpartition(-scores[valid], k - 1)[:k]]
+        top = top[np.lexsort((self.token_ids[top], -scores[top]))]
+        return [(int(self.token_ids[j]), float(scores[j])) for j in top]
+
+    def nemeses(self, token_id: int, k: int = 50) -> List[Tuple[int, float]]:
+        """The k bots most likely to beat token_id: [(token_id, P(beats it))]"""
+        return self._top(self.beaten_by(token_id), k)
+
+    def easiest_opponents(self, token_id: int, k: int = 50) -> List[Tuple[int, float]]:
+        """The k bots token_id is most likely to beat: [(token_id, P(win))]"""
+        return self._top(1.0 - self.beaten_by(token_id), k)
+
+
+def _meta(token_ids, races, engine, block) -> dict:
+    return {
+        "engine": engine,
+        "num_races": len(races),
+        "races_sha256": _races_digest(races),
+        "tokens_sha256": hashlib.sha256(
+            np.ascontiguousarray(token_ids, dtype=np.int64).tobytes()
+        ).hexdigest(),
+        "size": len(token_ids),
+        "block": block,
+    }
+
+
+def _create(path: str, token_ids: np.ndarray, meta: dict) -> None:
+    os.makedirs(path, exist_ok=True)
+    n, block = meta["size"], meta["block"]
+    num_tiles = -(-n // block)
+    np.save(os.path.join(path, "token_ids.npy"), token_ids)
+    np.lib.format.open_memmap(
+        os.path.join(path, "matrix.npy"), mode="w+", dtype=np.float32, shape=(n, n)
+    ).flush()
+    np.save(os.path.join(path, "tiles.npy"), np.zeros((num_tiles, num_tiles), bool))
+    # meta.json last: a directory without it is an unfinished create
+    with open(os.path.join(path, "meta.json"), "w") as f:
+        json.dump(meta, f, indent=2)
+
+
+def build_head_to_head(
+    path: str,
+    field: Field,
+    races: Optional[RaceBatch] = None,
+    engine: str = DEFAULT_ENGINE,
+    block: int = DEFAULT_BLOCK,
+    resume: bool = True,
+) -> HeadToHead:
+    """
+    Compute (or finish) the head-to-head matrix for a field over a race mix.
+
+    Args:
+        path: matrix directory (created if needed)
+        field: bots in matrix order
+        races: race mix (default: head_to_head_schedule())
+        resume: keep finished tiles of an existing matrix built for the
+            same field, races and engine; otherwise start over
+    """
+    get_engine(engine)
+    races = races if races is not None else head_to_head_schedule()
+    if not isinstance(races, RaceBatch):
+        races = RaceBatch.from_configs(races)
+    if len(races) == 0:
+        raise ValueError("the race mix is empty")
+
+    stats = stats_matrix(field)
+    if isinstance(field, BotRoster):
+        token_ids = field.token_ids.astype(np.int64)
+    else:
+        token_ids = np.array([b.token_id for b in field], dtype=np.int64)
+
+    meta = _meta(token_ids, races, engine, block)
+    existing = None
+    if resume:
+        try:
+            existing = HeadToHead(path, mode="r+")
+            if existing.meta != meta:
+                existing = None
+        except (OSError, ValueError, KeyError):
+            existing = None
+    if existing is None:
+        _create(path, token_ids, meta)
+        existing = HeadToHead(path, mode="r+")
+
+    h2h = existing
+    n = len(stats)
+    for ti in range(h2h.tiles.shape[0]):
+        if h2h.tiles[ti].all():
+            continue
+        rows = slice(ti * block, min((ti + 1) * block, n))
+        first = _entry_times(stats[rows], races, engine, 0)
+        for tj in range(h2h.tiles.shape[1]):
+            if h2h.tiles[ti, tj]:
+                continue
+            cols = slice(tj * block, min((tj + 1) * block, n))
+            second = _entry_times(stats[cols], races, engine, 1)
+            h2h.matrix[rows, cols] = _tile_wins(first, second) / len(races)
+            h2h.matrix.flush()
+            h2h.tiles[ti, tj] = True
+            h2h.tiles.flush()
+    return h2h
+
+
+def open_head_to_head(path: str) -> HeadToHead:
+    """Open a built matrix read-only"""
+    return HeadToHead(path)
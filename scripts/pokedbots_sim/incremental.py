@@ -0,0 +1,235 @@
+"""
+Incremental re-simulation for single-bot stat changes.
+
+A FieldCache keeps the (races x bots) time matrix of a field over a race
+set, plus the two fastest bots of every race. Changing one bot's stats only
+changes that bot's column (every other time depends on its own stats and
+entry index alone), so a what-if query evaluates one column with the array
+engines and re-ranks against the cached times:
+
+    winner    compare with the fastest other bot (top-1, or top-2 when
+              the changed bot was the fastest)
+    position  count the cached times ahead of the new time
+
+Ties keep entry order, as in a stable sort of the full field.
+"""
+
+from dataclasses import dataclass
+from typing import Optional, Sequence, Union
+
+import numpy as np
+
+from .cache import read_columns, write_columns
+from .engine import DEFAULT_ENGINE, get_engine
+from .models import STAT_NAMES, Bot, RacingStats
+from .roster import BotRoster
+from .segmented_vectorized import as_stats_matrix, segmented_race_time_matrix
+from .vectorized import RaceBatch, finish_order, race_time_matrix, stats_matrix
+
+Field = Union[Sequence[Bot], BotRoster]
+StatsLike = Union[np.ndarray, RacingStats, dict, Sequence[int]]
+
+RACE_COLUMNS = ("race_id", "distance", "terrain", "start_time")
+
+
+def _column_times(stats, races, engine, participant_index) -> np.ndarray:
+    index = np.asarray(participant_index, dtype=np.int64)
+    if engine == "segmented":
+        return segmented_race_time_matrix(stats, races, index)
+    return race_time_matrix(stats, races, index, engine=engine)
+
+
+def _token_ids(field: Field) -> np.ndarray:
+    if isinstance(field, BotRoster):
+        return field.token_ids.astype(np.int64)
+    return np.array([b.token_id for b in field], dtype=np.int64)
+
+
+@dataclass
+class WhatIf:
+    """Outcome of every cached race with one bot's stats replaced"""
+
+    column: int
+    stats: np.ndarray  # (4,) the bot's stats in this scenario
+    times: np.ndarray  # (R,) the bot's new race times
+    positions: np.ndarray  # (R,) the bot's 1-based finishing positions
+    winners: np.ndarray  # (R,) field index of each race's winner
+
+    @property
+    def wins(self) -> int:
+        return int((self.winners == self.column).sum())
+
+    def win_counts(self, size: int) -> np.ndarray:
+        """Wins per field index, for a field of the given size"""
+        return np.bincount(self.winners, minlength=size)
+
+    def position_counts(self, size: int) -> np.ndarray:
+        """Races finished in each position (index p - 1) by the bot"""
+        return np.bincount(self.positions - 1, minlength=size)
+
+    @property
+    def mean_position(self) -> float:
+        return float(self.positions.mean())
+
+
+class FieldCache:
+    """Cached race times of a field (entry order = column order)"""
+
+    def __init__(
+        self,
+        stats: np.ndarray,
+        token_ids: np.ndarray,
+        races: RaceBatch,
+        times: np.ndarray,
+        engine: str = DEFAULT_ENGINE,
+    ):
+        self.stats = np.array(stats, dtype=np.int64)
+        self.token_ids = np.asarray(token_ids, dtype=np.int64)
+        self.races = races
+        self.times = np.array(times, dtype=np.float64)
+        self.engine = engine
+        self._column = {int(t): i for i, t in enumerate(self.token_ids.tolist())}
+        self._update_leaders()
+
+    @classmethod
+    def build(
+        cls, field: Field, races: RaceBatch, engine: str = DEFAULT_ENGINE
+    ) -> "FieldCache":
+        """Simulate the field over the races once"""
+        get_engine(engine)
+        if not isinstance(races, RaceBatch):
+            races = RaceBatch.from_configs(races)
+        stats = stats_matrix(field)
+        times = _column_times(stats, races, engine, np.arange(len(stats)))
+        return cls(stats, _token_ids(field), races, times, engine)
+
+    def __len__(self) -> int:
+        return len(self.token_ids)
+
+    def _update_leaders(self) -> None:
+        # Two fastest bots per race, so any single bot can be taken out
+        self.leaders = finish_order(self.times, min(2, len(self)))
+
+    def column_of(self, token_id: int) -> int:
+        try:
+            return self._column[int(token_id)]
+        except KeyError:
+            raise KeyError(f"Token {token_id} is not in this field") from None
+
+    def _best_other(self, column: int):
+        """(field index, time) of the fastest bot other than column, per race"""
+        if len(self) < 2:
+            raise ValueError("what-if ranking needs at least two bots")
+        pick = np.where(self.leaders[:, 0] == column, 1, 0)
+        index = self.leaders[np.arange(len(self.races)), pick]
+        return index, self.times[np.arange(len(self.races)), index]
+
+    def _rank(self, column: int, stats: np.ndarray, times: np.ndarray) -> WhatIf:
+        rival, rival_time = self._best_other(column)
+        wins = (times < rival_time) | ((times == rival_time) & (column < rival))
+
+        # One pass over the cached times, skipping the bot's own column:
+        # earlier entries win ties, later ones must be strictly faster
+        t = times[:, None]
+        ahead = np.count_nonzero(self.times[:, :column] <= t, axis=1)
+        ahead += np.count_nonzero(self.times[:, column + 1 :] < t, axis=1)
+        return WhatIf(
+            column=column,
+            stats=stats,
+            times=times,
+            positions=ahead + 1,
+            winners=np.where(wins, column, rival),
+        )
+
+    def baseline(self, token_id: int) -> WhatIf:
+        """The cached outcome for one bot, in the same form as what_if()"""
+        column = self.column_of(token_id)
+        return self._rank(column, self.stats[column], self.times[:, column])
+
+    def what_if(self, token_id: int, stats: StatsLike) -> WhatIf:
+        """Re-rank every cached race with token_id's stats replaced"""
+        column = self.column_of(token_id)
+        new_stats = as_stats_matrix(stats).astype(np.int64)
+        times = _column_times(new_stats, self.races, self.engine, [column])[:, 0]
+        return self._rank(column, new_stats[0], times)
+
+    def what_if_delta(self, token_id: int, cap: int = 100, **deltas: int) -> WhatIf:
+        """what_if() with stats raised by deltas, e.g. speed=3 (capped)"""
+        unknown = set(deltas) - set(STAT_NAMES)
+        if unknown:
+            raise ValueError(f"Unknown stats: {sorted(unknown)}")
+        stats = self.stats[self.column_of(token_id)].copy()
+        for name, delta in deltas.items():
+            col = STAT_NAMES.index(name)
+            stats[col] = min(cap, stats[col] + delta)
+        return self.what_if(token_id, stats)
+
+    def apply(self, result: WhatIf) -> None:
+        """Keep a what-if scenario: update the cached column and leaders"""
+        self.stats[result.column] = result.stats
+        self.times[:, result.column] = result.times
+        self._update_leaders()
+
+    # ===== PERSISTENCE =====
+
+    def save(self, path: str) -> None:
+        """Write the cache as a column file (see cache.py)"""
+        columns = {
+            "stats": self.stats,
+            "token_ids": self.token_ids,
+            "times": self.times,
+        }
+        for name in RACE_COLUMNS:
+            columns[f"race_{name}"] = getattr(self.races, name)
+        write_columns(path, columns, {"engine": self.engine}, {})
+
+    @classmethod
+    def load(cls, path: str) -> "FieldCache":
+        columns, header = read_columns(path)
+        races = RaceBatch(
+            **{name: np.asarray(columns[f"race_{name}"]) for name in RACE_COLUMNS}
+        )
+        return cls(
+            columns["stats"],
+            columns["token_ids"],
+            races,
+            columns["times"],
+            header["meta"]["engine"],
+        )
+
+
+def field_cache(
+    field: Field,
+    races: RaceBatch,
+    engine: str = DEFAULT_ENGINE,
+    path: Optional[str] = None,
+) -> FieldCache:
+    """
+    FieldCache.build(), reusing the cache file at path when it matches
+    (same engine, races, stats and token ids in the same order)
+    """
+    stats = stats_matrix(field)
+    if path is not None:
+        try:
+            cached = FieldCache.load(path)
+            same_races = all(
+                np.array_equal(getattr(cached.races, name), getattr(races, name))
+                for name in RACE_COLUMNS
+            )
+            if (
+                cached.engine == engine
+                and same_races
+                and np.array_equal(cached.stats, stats)
+                and np.array_equal(cached.token_ids, _token_ids(field))
+            ):
+                return cached
+        except (OSError, ValueError, KeyError):
+            pass
+
+    cache = FieldCache.build(field, races, engine)
+    if path is not None:
+        try:
+            cache.save(path)
+        except OSError:
+            pass
+    return cache
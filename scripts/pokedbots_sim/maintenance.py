@@ -0,0 +1,628 @@
+"""
+Exact long-run maintenance costs of one racer as a Markov chain.
+
+A racer's only state between race ticks is (battery, condition): ratings
+tier, drain and wear are functions of it (economy.simulate_fleets rules),
+and the only randomness is the expected-position draw (five equally likely
+choices per tier). Each tick of the day is a sparse transition kernel over
+the (max_battery + 1) x (max_condition + 1) states with at most five
+successors per state, stored as successor / probability arrays.
+
+Drain and wear are near-deterministic, so only a few hundred states are
+reachable from full battery and condition. Composing a day's tick kernels
+over those gives a small dense start-of-day matrix whose stationary
+distribution is solved directly (numpy least squares); the per-tick
+occupancy then gives exact expected races, recharges, repairs, wins and
+prize money per day, with no Monte Carlo noise.
+
+Race class only moves fees and prizes, not the battery/condition walk or
+the win odds, and wins only ever grow: a racer with any chance of winning
+climbs to the top class and stays there. steady_state() therefore solves
+the chain in that class by default, or in the class of its starting wins
+when it never wins; pass race_class to pin one.
+
+solve_policy() drops the fixed thresholds: before every race slot it picks
+whether to recharge, repair and race from (wins, battery, condition) by
+discounted value iteration over the same race outcomes, caching the
+solved action table under data/.cache keyed by a hash of the stats and
+constants. A won race moves the bot to the next wins level, and the class
+is the class of its wins, so the value of climbing is part of the
+decision; wins are capped at the top class's CLASS_MIN_WINS, past which
+nothing changes. There are no cooldowns or passive regeneration and costs
+do not change over time, so the slot is the only clock the decision needs.
+"""
+
+import dataclasses
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .cache import cache_path, read_columns, write_columns
+from .data import CACHE_DIR
+from .economy import (
+    CLASS_MIN_WINS,
+    ECONOMY_CLASSES,
+    EXPECTED_POSITIONS,
+    LIVE_ECONOMY,
+    RATING_TIERS,
+    EconomyConstants,
+    battery_penalty,
+    condition_penalty,
+    position_wear_mod,
+    power_core_efficiency,
+    race_class_codes,
+)
+
+TICK_FIELDS = ("races", "recharges", "repairs", "wins", "prize_money")
+
+
+@dataclass
+class TickKernel:
+    """One race tick: successors of every (battery, condition) state"""
+
+    successor: np.ndarray  # (S, 5) state index after the tick
+    probability: np.ndarray  # (S, 5)
+    expected: dict  # TICK_FIELDS -> (S,) expectation of the tick from each state
+
+    def step(self, dist: np.ndarray) -> np.ndarray:
+        """Distribution after the tick"""
+        return np.bincount(
+            self.successor.ravel(),
+            weights=(dist[:, None] * self.probability).ravel(),
+            minlength=len(dist),
+        )
+
+
+def _maintain(battery, condition, mask, battery_below, condition_below, c):
+    recharge = mask & (battery < battery_below)
+    repair = mask & (condition < condition_below)
+    battery = np.where(
+        recharge, np.minimum(c.max_battery, battery + c.recharge_amount), battery
+    )
+    condition = np.where(
+        repair, np.minimum(c.max_condition, condition + c.repair_amount), condition
+    )
+    return battery, condition, recharge, repair
+
+
+@dataclass
+class RaceOutcomes:
+    """Outcome of racing from every (battery, condition) state, unmaintained"""
+
+    battery: np.ndarray  # (S,) state's battery
+    condition: np.ndarray  # (S,) state's condition
+    battery_after: np.ndarray  # (S,)
+    condition_after: np.ndarray  # (S, 5) per expected-position draw
+    prize: np.ndarray  # (S, 5) expected prize money per draw
+    win: np.ndarray  # (S, 5) win probability per draw
+    entry_fee: float
+
+
+def race_outcomes(
+    stats: Sequence[float],
+    race_class: int,
+    constants: EconomyConstants = LIVE_ECONOMY,
+) -> RaceOutcomes:
+    """
+    Drain, wear and prize of one race from every state for a bot with
+    (speed, powerCore, acceleration, stability) `stats`
+    """
+    c = constants
+    width = c.max_condition + 1
+    battery, condition = np.divmod(np.arange((c.max_battery + 1) * width), width)
+    rating = float(np.sum(stats)) / 4
+    efficiency = power_core_efficiency(np.float64(stats[1]))
+
+    tier = np.searchsorted(RATING_TIERS, rating * battery_penalty(battery), "right")
+    drain = (
+        c.battery_drain
+        * c.terrain_battery_mod
+        * efficiency
+        * condition_penalty(condition)
+    ).astype(np.int64)
+
+    fees = c.class_table(c.entry_fees)
+    bonuses = c.class_table(c.daily_sprint_bonus)
+    pool = (c.field_size * fees[race_class] + bonuses[race_class]) * (
+        1 - c.platform_tax
+    )
+    shares = c.prize_shares()
+
+    position = EXPECTED_POSITIONS[tier]
+    wear = (
+        c.condition_wear * position_wear_mod(position) * c.terrain_condition_mod
+    ).astype(np.int64)
+    # Finishing position is the expected one jittered by -1, 0 or +1
+    jittered = np.clip(position[..., None] + np.arange(-1, 2), 1, c.field_size)
+    return RaceOutcomes(
+        battery=battery,
+        condition=condition,
+        battery_after=battery - np.minimum(battery, drain),
+        condition_after=condition[:, None] - np.minimum(condition[:, None], wear),
+        prize=pool * shares[jittered].mean(axis=-1),
+        win=(jittered == 1).mean(axis=-1),
+        entry_fee=float(fees[race_class]),
+    )
+
+
+def tick_kernel(
+    stats: Sequence[float],
+    race_class: int,
+    recharge_below: float,
+    repair_below: float,
+    last: bool,
+    constants: EconomyConstants = LIVE_ECONOMY,
+) -> TickKernel:
+    """
+    Transition of one tick under the threshold policy of simulate_strategy:
+    grounded bots are rescued, racers are maintained after the race except
+    on the day's last tick
+    """
+    c = constants
+    width = c.max_condition + 1
+    race = race_outcomes(stats, race_class, constants)
+    battery, condition = race.battery, race.condition
+
+    grounded = (battery < c.race_floor) | (condition < c.race_floor)
+    racing = ~grounded
+    rescued = _maintain(battery, condition, grounded, c.rescue_below, c.rescue_below, c)
+
+    choices = EXPECTED_POSITIONS.shape[1]
+    successor = np.empty((len(battery), choices), dtype=np.int64)
+    expected = {name: np.zeros(len(battery)) for name in TICK_FIELDS}
+    for k in range(choices):
+        b = np.where(racing, race.battery_after, battery)
+        cond = np.where(racing, race.condition_after[:, k], condition)
+        recharges = rescued[2].astype(np.float64)
+        repairs = rescued[3].astype(np.float64)
+        if not last:
+            b, cond, recharge, repair = _maintain(
+                b, cond, racing, recharge_below, repair_below, c
+            )
+            recharges = recharges + recharge
+            repairs = repairs + repair
+        b = np.where(grounded, rescued[0], b)
+        cond = np.where(grounded, rescued[1], cond)
+        successor[:, k] = b * width + cond
+
+        expected["races"] += racing / choices
+        expected["recharges"] += recharges / choices
+        expected["repairs"] += repairs / choices
+        expected["wins"] += np.where(racing, race.win[:, k], 0) / choices
+        expected["prize_money"] += np.where(racing, race.prize[:, k], 0) / choices
+
+    probability = np.full(successor.shape, 1.0 / choices)
+    return TickKernel(successor, probability, expected)
+
+
+@dataclass
+class SteadyState:
+    """Long-run per-day expectations of one racer under one policy"""
+
+    distribution: np.ndarray  # (S,) start-of-day stationary distribution
+    occupancy: np.ndarray  # (ticks, S) state distribution at each tick
+    per_day: dict  # TICK_FIELDS -> expected count / ICP per day
+    race_class: str
+    entry_fee: float
+    states: np.ndarray  # start-of-day states reachable from full
+    constants: EconomyConstants = LIVE_ECONOMY
+
+    def grid(self, tick: int = 0) -> np.ndarray:
+        """(battery, condition) occupancy at a tick of the day"""
+        c = self.constants
+        return self.occupancy[tick].reshape(c.max_battery + 1, c.max_condition + 1)
+
+    @property
+    def maintenance_per_day(self) -> float:
+        return (
+            self.per_day["recharges"] * self.constants.recharge_cost
+            + self.per_day["repairs"] * self.constants.repair_cost
+        )
+
+    @property
+    def maintenance_per_race(self) -> float:
+        races = self.per_day["races"]
+        return self.maintenance_per_day / races if races > 0 else float("inf")
+
+    @property
+    def recharges_per_race(self) -> float:
+        races = self.per_day["races"]
+        return self.per_day["recharges"] / races if races > 0 else float("inf")
+
+    @property
+    def repairs_per_race(self) -> float:
+        races = self.per_day["races"]
+        return self.per_day["repairs"] / races if races > 0 else float("inf")
+
+    @property
+    def net_per_day(self) -> float:
+        return (
+            self.per_day["prize_money"]
+            - self.per_day["races"] * self.entry_fee
+            - self.maintenance_per_day
+        )
+
+
+def day_kernels(
+    stats: Sequence[float],
+    races_per_day: int,
+    race_class: int,
+    recharge_below: float = 50,
+    repair_below: float = 50,
+    constants: EconomyConstants = LIVE_ECONOMY,
+) -> List[TickKernel]:
+    """The day's tick kernels, in order"""
+    middle = tick_kernel(
+        stats, race_class, recharge_below, repair_below, False, constants
+    )
+    last = tick_kernel(stats, race_class, recharge_below, repair_below, True, constants)
+    return [middle] * (races_per_day - 1) + [last]
+
+
+def reachable_states(kernels: List[TickKernel], start: int) -> np.ndarray:
+    """Sorted start-of-day states reachable from `start` over whole days"""
+    seen = np.zeros(len(kernels[0].successor), dtype=bool)
+    frontier = seen.copy()
+    frontier[start] = True
+    while frontier.any():
+        seen |= frontier
+        mask = frontier
+        for kernel in kernels:
+            reached = np.zeros_like(mask)
+            reached[kernel.successor[mask].ravel()] = True
+            mask = reached
+        frontier = mask & ~seen
+    return np.flatnonzero(seen)
+
+
+def day_matrix(kernels: List[TickKernel], states: np.ndarray) -> np.ndarray:
+    """
+    Dense start-of-day transition matrix over `states` (which must be
+    closed under a day, e.g. from reachable_states)
+    """
+    # Rows: start states; columns: the states reached so far (`current`)
+    current = states
+    dist = np.eye(len(states))
+    for kernel in kernels:
+        successor = kernel.successor[current]
+        reached, local = np.unique(successor, return_inverse=True)
+        local = local.reshape(successor.shape)
+        rows = np.arange(len(states))[:, None, None] * len(reached)
+        after = np.bincount(
+            (rows + local[None]).ravel(),
+            weights=(dist[:, :, None] * kernel.probability[current][None]).ravel(),
+            minlength=len(states) * len(reached),
+        )
+        dist = after.reshape(len(states), len(reached))
+        current = reached
+    out = np.zeros((len(states), len(states)))
+    out[:, np.searchsorted(states, current)] = dist
+    return out
+
+
+def class_code(race_class: Optional[str], wins: int = 0) -> int:
+    """Index into ECONOMY_CLASSES; the class of `wins` when not given"""
+    if race_class is None:
+        return int(race_class_codes(np.array(wins)))
+    if race_class not in ECONOMY_CLASSES:
+        raise ValueError(
+            f"Unknown race class '{race_class}' "
+            f"(expected one of: {', '.join(ECONOMY_CLASSES)})"
+        )
+    return ECONOMY_CLASSES.index(race_class)
+
+
+def solve_chain(
+    kernels: List[TickKernel],
+    race_class: int,
+    constants: EconomyConstants = LIVE_ECONOMY,
+) -> SteadyState:
+    """
+    Stationary distribution and per-day expectations of a day's kernels,
+    racing in ECONOMY_CLASSES[race_class]
+    """
+    # pi (D - I) = 0 with sum(pi) = 1, over the states a full bot can reach
+    num_states = len(kernels[0].successor)
+    states = reachable_states(kernels, num_states - 1)
+    system = np.vstack(
+        [(day_matrix(kernels, states) - np.eye(len(states))).T, np.ones(len(states))]
+    )
+    rhs = np.zeros(len(states) + 1)
+    rhs[-1] = 1.0
+    pi = np.linalg.lstsq(system, rhs, rcond=None)[0]
+    dist = np.zeros(num_states)
+    dist[states] = np.clip(pi, 0.0, None) / np.clip(pi, 0.0, None).sum()
+
+    occupancy = np.empty((len(kernels), num_states))
+    tick = dist
+    for r, kernel in enumerate(kernels):
+        occupancy[r] = tick
+        tick = kernel.step(tick)
+    per_day = {
+        name: float(
+            sum(occ @ kernel.expected[name] for occ, kernel in zip(occupancy, kernels))
+        )
+        for name in TICK_FIELDS
+    }
+    fee = float(constants.class_table(constants.entry_fees)[race_class])
+    return SteadyState(
+        dist, occupancy, per_day, ECONOMY_CLASSES[race_class], fee, states, constants
+    )
+
+
+def steady_state(
+    stats: Sequence[float],
+    wins: int = 0,
+    races_per_day: int = 4,
+    recharge_below: float = 50,
+    repair_below: float = 50,
+    race_class: Optional[str] = None,
+    constants: EconomyConstants = LIVE_ECONOMY,
+) -> SteadyState:
+    """
+    Stationary battery/condition distribution and per-day expectations of
+    a racer under simulate_strategy's threshold policy, starting at full
+    battery and condition. race_class defaults to the class the racer ends
+    up in: the top class if it wins at all, else the class of `wins`
+    """
+    code = class_code(race_class, wins)
+    if races_per_day < 1:
+        raise ValueError("races_per_day must be at least 1")
+    kernels = day_kernels(
+        stats, races_per_day, code, recharge_below, repair_below, constants
+    )
+    solved = solve_chain(kernels, code, constants)
+    top = len(ECONOMY_CLASSES) - 1
+    if race_class is None and code < top and solved.per_day["wins"] > 0:
+        kernels = day_kernels(
+            stats, races_per_day, top, recharge_below, repair_below, constants
+        )
+        solved = solve_chain(kernels, top, constants)
+    return solved
+
+
+# ===== OPTIMAL POLICY =====
+
+# Action bit flags of MaintenancePolicy.action (applied before the race)
+RECHARGE = 1
+REPAIR = 2
+RACE = 4
+POLICY_VERSION = 2
+
+# Wins levels of the policy: 0 .. the top class's minimum, where wins stop mattering
+WIN_LEVELS = CLASS_MIN_WINS[-1] + 1
+
+_POLICIES: Dict[str, "MaintenancePolicy"] = {}
+
+
+@dataclass
+class MaintenancePolicy:
+    """
+    Profit-maximizing recharge / repair / race decision per wins level and
+    (battery, condition) state, for one bot's stats
+    """
+
+    stats: tuple
+    action: np.ndarray  # (WIN_LEVELS, S) RECHARGE | REPAIR | RACE flags
+    value: np.ndarray  # (WIN_LEVELS, S) discounted value in ICP
+    discount: float
+    key: str
+    constants: EconomyConstants = LIVE_ECONOMY
+
+    def decide(self, wins, battery, condition):
+        """Action flags for (wins, battery, condition) arrays or scalars"""
+        width = self.constants.max_condition + 1
+        level = np.minimum(np.asarray(wins), WIN_LEVELS - 1)
+        state = np.asarray(battery) * width + np.asarray(condition)
+        return self.action[level, state]
+
+    def grid(self, wins: int = 0) -> np.ndarray:
+        """(battery, condition) table of action flags at `wins`"""
+        c = self.constants
+        return self.action[min(wins, WIN_LEVELS - 1)].reshape(
+            c.max_battery + 1, c.max_condition + 1
+        )
+
+    def kernel(self, wins: int = 0) -> TickKernel:
+        """One race slot under the policy while the bot has `wins`"""
+        level = min(wins, WIN_LEVELS - 1)
+        race = race_outcomes(self.stats, class_code(None, level), self.constants)
+        maintained, _ = _maintenance_moves(race, self.constants)
+        flags = self.action[level]
+        moved = maintained[flags & (RECHARGE | REPAIR), np.arange(len(flags))]
+        racing = (flags & RACE) > 0
+        width = self.constants.max_condition + 1
+        choices = race.condition_after.shape[1]
+        successor = np.where(
+            racing[:, None],
+            race.battery_after[moved][:, None] * width + race.condition_after[moved],
+            moved[:, None],
+        )
+        expected = {
+            "races": racing.astype(np.float64),
+            "recharges": ((flags & RECHARGE) > 0).astype(np.float64),
+            "repairs": ((flags & REPAIR) > 0).astype(np.float64),
+            "wins": np.where(racing, race.win[moved].mean(axis=1), 0),
+            "prize_money": np.where(racing, race.prize[moved].mean(axis=1), 0),
+        }
+        probability = np.full(successor.shape, 1.0 / choices)
+        return TickKernel(successor, probability, expected)
+
+    def steady_state(self, wins: int = 0, races_per_day: int = 4) -> SteadyState:
+        """
+        Exact long-run expectations of following the policy from `wins`:
+        the chain of the first wins level the bot stops winning at, or of
+        the top level
+        """
+        if races_per_day < 1:
+            raise ValueError("races_per_day must be at least 1")
+        level = min(wins, WIN_LEVELS - 1)
+        while True:
+            kernels = [self.kernel(level)] * races_per_day
+            solved = solve_chain(kernels, class_code(None, level), self.constants)
+            if level == WIN_LEVELS - 1 or solved.per_day["wins"] <= 0:
+                return solved
+            level += 1
+
+
+def _maintenance_moves(race: RaceOutcomes, constants: EconomyConstants):
+    """
+    (4, S) state after each maintenance combination (index = RECHARGE |
+    REPAIR flags) and its (4,) cost
+    """
+    c = constants
+    width = c.max_condition + 1
+    recharged = np.minimum(c.max_battery, race.battery + c.recharge_amount)
+    repaired = np.minimum(c.max_condition, race.condition + c.repair_amount)
+    moves = np.stack(
+        [
+            race.battery * width + race.condition,
+            recharged * width + race.condition,
+            race.battery * width + repaired,
+            recharged * width + repaired,
+        ]
+    )
+    costs = np.array([0.0, c.recharge_cost, c.repair_cost])
+    return moves, np.array([0.0, costs[1], costs[2], costs[1] + costs[2]])
+
+
+def policy_hash(
+    stats: Sequence[float], constants: EconomyConstants, discount: float, tol: float
+) -> str:
+    payload = json.dumps(
+        {
+            "version": POLICY_VERSION,
+            "stats": [float(x) for x in stats],
+            "constants": dataclasses.asdict(constants),
+            "discount": discount,
+            "tol": tol,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def _race_continuation(
+    value: np.ndarray, successor: np.ndarray, win: np.ndarray
+) -> np.ndarray:
+    """
+    Mean of `value` over each state's race successors ((5, S) indices),
+    one wins level up with the draw's (S, 5) `win` probability
+    """
+    promoted = np.vstack([value[1:], value[-1:]])
+    total = np.zeros_like(value)
+    for k, column in enumerate(successor):
+        stay = value[:, column]
+        total += stay + win[:, k] * (promoted[:, column] - stay)
+    return total / len(successor)
+
+
+def value_iteration(
+    stats: Sequence[float],
+    constants: EconomyConstants = LIVE_ECONOMY,
+    discount: float = 0.995,
+    tol: float = 1e-4,
+    max_iterations: int = 100_000,
+):
+    """
+    (action, value) arrays of the discounted-profit optimal policy for
+    every wins level at once; `discount` applies per race slot, and the
+    policy's value is within `tol` ICP of optimal
+    """
+    c = constants
+    races = [race_outcomes(stats, code, c) for code in range(len(ECONOMY_CLASSES))]
+    race = races[0]  # drain, wear and win odds don't depend on class
+    moves, costs = _maintenance_moves(race, c)
+    raceable = (race.battery >= c.race_floor) & (race.condition >= c.race_floor)
+    width = c.max_condition + 1
+    successor = (race.battery_after[:, None] * width + race.condition_after).T
+    # Expected prize less entry fee of racing from each state, per wins level
+    reward = np.stack([r.prize.mean(axis=1) - r.entry_fee for r in races])
+    reward = reward[race_class_codes(np.arange(WIN_LEVELS))]
+    reward = np.where(raceable, reward, -np.inf)
+
+    # Stop on the span of the update: the greedy policy is then within
+    # tol of optimal even while the values still drift by a constant
+    value = np.zeros((WIN_LEVELS, len(race.battery)))
+    stop = tol * (1 - discount) / discount
+    for _ in range(max_iterations):
+        race_value = reward + discount * _race_continuation(value, successor, race.win)
+        slot_value = np.maximum(discount * value, race_value)
+        q = slot_value[:, moves] - costs[None, :, None]
+        updated = q.max(axis=1)
+        delta = updated - value
+        value = updated
+        if delta.max() - delta.min() < stop:
+            break
+
+    race_value = reward + discount * _race_continuation(value, successor, race.win)
+    slot_value = np.maximum(discount * value, race_value)
+    q = slot_value[:, moves] - costs[None, :, None]
+    maintenance = q.argmax(axis=1)
+    moved = moves[maintenance, np.arange(len(race.battery))[None, :]]
+    races_after = np.take_along_axis(race_value, moved, axis=1) > discount * (
+        np.take_along_axis(value, moved, axis=1)
+    )
+    action = (maintenance | np.where(races_after, RACE, 0)).astype(np.uint8)
+    return action, value
+
+
+def _policy_path(key: str, cache_dir: str) -> str:
+    return cache_path(f"maintenance-policy-{key}", cache_dir)
+
+
+def solve_policy(
+    stats: Sequence[float],
+    constants: EconomyConstants = LIVE_ECONOMY,
+    discount: float = 0.995,
+    tol: float = 1e-4,
+    cache_dir: Optional[str] = CACHE_DIR,
+) -> MaintenancePolicy:
+    """
+    The optimal policy for a bot, from memory, the disk cache (keyed by a
+    hash of stats, constants and solver settings), or solved.
+
+    Pass cache_dir=None to skip the disk cache.
+    """
+    stats = tuple(float(x) for x in stats)
+    key = policy_hash(stats, constants, discount, tol)
+    if key in _POLICIES:
+        return _POLICIES[key]
+
+    policy = None
+    if cache_dir is not None:
+        try:
+            columns, header = read_columns(_policy_path(key, cache_dir))
+            if header["source"].get("policy_hash") == key:
+                policy = MaintenancePolicy(
+                    stats, columns["action"], columns["value"], discount, key, constants
+                )
+        except (OSError, ValueError, KeyError):
+            pass
+
+    if policy is None:
+        action, value = value_iteration(stats, constants, discount, tol)
+        policy = MaintenancePolicy(stats, action, value, discount, key, constants)
+        if cache_dir is not None:
+            try:
+                write_columns(
+                    _policy_path(key, cache_dir),
+                    {"action": action, "value": value},
+                    {
+                        "stats": list(stats),
+                        "discount": discount,
+                        "classes": [
+                            ECONOMY_CLASSES[code]
+                            for code in race_class_codes(np.arange(WIN_LEVELS))
+                        ],
+                    },
+                    {"policy_hash": key},
+                )
+            except OSError:
+                pass
+
+    _POLICIES[key] = policy
+    return policy
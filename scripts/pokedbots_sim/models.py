@@ -0,0 +1,50 @@
+"""
+Shared racing data types used by the simulation engines and analysis scripts.
+"""
+
+from dataclasses import dataclass
+
+# Terrain names as they appear in race configs and track segments
+TERRAINS = ["ScrapHeaps", "WastelandSand", "MetalRoads"]
+
+# Race classes (RacingSimulator.RaceClass), lowest ELO band first
+RACE_CLASSES = ["Scrap", "Junker", "Raider", "Elite", "SilentKlan"]
+
+# Race distances (km) used by the standard analysis schedule
+DISTANCES = [5, 10, 15, 20, 25, 30]
+
+# Stat column order used by every array-based engine
+STAT_NAMES = ["speed", "powerCore", "acceleration", "stability"]
+
+
+@dataclass
+class RacingStats:
+    speed: int
+    powerCore: int
+    acceleration: int
+    stability: int
+
+
+@dataclass
+class Bot:
+    id: str
+    token_id: int
+    stats: RacingStats
+    faction: str = ""
+
+    @property
+    def total_stats(self) -> int:
+        return (
+            self.stats.speed
+            + self.stats.powerCore
+            + self.stats.acceleration
+            + self.stats.stability
+        )
+
+
+@dataclass
+class RaceConfig:
+    race_id: int
+    distance: int  # km
+    terrain: str  # ScrapHeaps, WastelandSand, MetalRoads
+    start_time: int = 0  # Unix timestamp in nanoseconds
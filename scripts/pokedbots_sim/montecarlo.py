@@ -0,0 +1,383 @@
+"""
+Multi-core Monte Carlo runner for the standard race schedule.
+
+Races are independent and seeded only by race_id/start_time, so the
+schedule is split into contiguous race_id shards and each worker process
+tallies its shards with the array engines. The field's stats are handed
+to the workers once through shared memory.
+
+Tallies are integer counts plus "first seen" race markers, so merging is
+order-independent and the result is identical for any worker count. The
+markers let RaceTally.counters() rebuild the defaultdicts the analysis
+scripts use with the same key order a sequential race loop would produce.
+
+Finishing positions are histogrammed for the first stream.DEFAULT_PLACES
+places only (a full histogram is N x N per worker); mean and spread of
+each bot's position come from exact per-bot position sums instead.
+"""
+
+import math
+import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from fractions import Fraction
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from .engine import DEFAULT_ENGINE, get_engine
+from .models import DISTANCES, TERRAINS, Bot
+from .roster import BotRoster
+from .segmented_vectorized import segmented_race_time_matrix
+from .stream import DEFAULT_PLACES
+from .vectorized import (
+    CHUNK_CELLS,
+    FieldTables,
+    finish_order,
+    race_time_matrix,
+    standard_schedule,
+    stats_matrix,
+)
+
+# Largest race_id range handed to a worker in one task
+SHARD_RACES = 20_000
+
+NEVER = np.iinfo(np.int64).max
+
+
+@dataclass
+class RaceTally:
+    """
+    Outcome counts for a fixed field over a block of races.
+
+    Rows follow the field order; columns follow terrains / distances /
+    finishing position (1-based position p is column p - 1, for the first
+    `places` places). position_sum / position_sq_sum add up every
+    finishing position of each bot when positions were tallied.
+    """
+
+    token_ids: np.ndarray
+    terrains: List[str]
+    distances: List[int]
+    num_races: int
+    wins: np.ndarray
+    wins_by_terrain: np.ndarray
+    wins_by_distance: np.ndarray
+    position_counts: np.ndarray
+    position_sum: Optional[np.ndarray]
+    position_sq_sum: Optional[np.ndarray]
+    first_win: np.ndarray
+    first_placed: np.ndarray
+
+    @classmethod
+    def empty(
+        cls,
+        token_ids: np.ndarray,
+        terrains: Sequence[str],
+        distances: Sequence[int],
+        places: int,
+        positions: bool = True,
+    ) -> "RaceTally":
+        n = len(token_ids)
+        return cls(
+            token_ids=np.asarray(token_ids, dtype=np.int64),
+            terrains=list(terrains),
+            distances=list(distances),
+            num_races=0,
+            wins=np.zeros(n, dtype=np.int64),
+            wins_by_terrain=np.zeros((n, len(terrains)), dtype=np.int64),
+            wins_by_distance=np.zeros((n, len(distances)), dtype=np.int64),
+            position_counts=np.zeros((n, places), dtype=np.int64),
+            position_sum=np.zeros(n, dtype=np.int64) if positions else None,
+            position_sq_sum=np.zeros(n, dtype=np.int64) if positions else None,
+            first_win=np.full(n, NEVER, dtype=np.int64),
+            first_placed=np.full(n, NEVER, dtype=np.int64),
+        )
+
+    def merge(self, other: "RaceTally") -> "RaceTally":
+        """Add another tally for the same field (in place)"""
+        self.num_races += other.num_races
+        self.wins += other.wins
+        self.wins_by_terrain += other.wins_by_terrain
+        self.wins_by_distance += other.wins_by_distance
+        self.position_counts += other.position_counts
+        if self.position_sum is not None:
+            self.position_sum += other.position_sum
+            self.position_sq_sum += other.position_sq_sum
+        np.minimum(self.first_win, other.first_win, out=self.first_win)
+        np.minimum(self.first_placed, other.first_placed, out=self.first_placed)
+        return self
+
+    def counters(self) -> Dict[str, defaultdict]:
+        """
+        The tallies as the nested defaultdicts used by the analysis scripts
+        (overall_wins, wins_by_terrain, wins_by_distance, position_counts),
+        keyed by token_id.
+        """
+        overall_wins = defaultdict(int)
+        wins_by_terrain = defaultdict(lambda: defaultdict(int))
+        wins_by_distance = defaultdict(lambda: defaultdict(int))
+        position_counts = defaultdict(lambda: defaultdict(int))
+
+        winners = np.flatnonzero(self.wins)
+        for row in winners[np.argsort(self.first_win[winners], kind="stable")]:
+            token_id = int(self.token_ids[row])
+            overall_wins[token_id] += int(self.wins[row])
+            for col in np.flatnonzero(self.wins_by_terrain[row]):
+                wins_by_terrain[token_id][self.terrains[col]] += int(
+                    self.wins_by_terrain[row, col]
+                )
+            for col in np.flatnonzero(self.wins_by_distance[row]):
+                wins_by_distance[token_id][self.distances[col]] += int(
+                    self.wins_by_distance[row, col]
+                )
+
+        placed = np.flatnonzero(self.position_counts.any(axis=1))
+        for row in placed[np.argsort(self.first_placed[placed], kind="stable")]:
+            token_id = int(self.token_ids[row])
+            for col in np.flatnonzero(self.position_counts[row]):
+                position_counts[token_id][int(col) + 1] += int(
+                    self.position_counts[row, col]
+                )
+
+        return {
+            "overall_wins": overall_wins,
+            "wins_by_terrain": wins_by_terrain,
+            "wins_by_distance": wins_by_distance,
+            "position_counts": position_counts,
+        }
+
+    def _position_sums(self, row: int):
+        if self.position_sum is None:
+            raise ValueError("finishing positions were not tallied (positions=False)")
+        return (
+            self.num_races,
+            int(self.position_sum[row]),
+            int(self.position_sq_sum[row]),
+        )
+
+    def mean_position(self, row: int) -> float:
+        n, s1, _ = self._position_sums(row)
+        return float(Fraction(s1, n))
+
+    def position_stdev(self, row: int) -> float:
+        """Sample standard deviation of the bot's finishing positions"""
+        n, s1, s2 = self._position_sums(row)
+        if n < 2:
+            raise ValueError("position_stdev requires at least two races")
+        return math.sqrt(Fraction(n * s2 - s1 * s1, n * (n - 1)))
+
+
+# ===== SHARD EVALUATION =====
+
+
+def _finish_order(stats, tables, races, engine, places) -> np.ndarray:
+    """
+    (R x places) field indices in finishing order (ties keep field order);
+    places=None ranks the whole field
+    """
+    if engine == "segmented":
+        times = segmented_race_time_matrix(stats, races)
+    else:
+        times = race_time_matrix(tables, races, engine=engine)
+    return finish_order(times, places)
+
+
+def tally_races(
+    stats: np.ndarray,
+    token_ids: np.ndarray,
+    first_race_id: int,
+    num_races: int,
+    terrains: Sequence[str] = TERRAINS,
+    distances: Sequence[int] = DISTANCES,
+    engine: str = DEFAULT_ENGINE,
+    places: Optional[int] = None,
+    tables: Optional[FieldTables] = None,
+    positions: bool = True,
+) -> RaceTally:
+    """
+    Tally standard-schedule races [first_race_id, first_race_id + num_races);
+    see run_monte_carlo for places / positions
+    """
+    n = len(stats)
+    places = min(DEFAULT_PLACES if places is None else places, n)
+    tables = tables if tables is not None else FieldTables(stats)
+    tally = RaceTally.empty(token_ids, terrains, distances, places, positions)
+    num_terrains, num_distances = len(terrains), len(distances)
+
+    block = max(1, CHUNK_CELLS // max(n, 1))
+    for start in range(first_race_id, first_race_id + num_races, block):
+        count = min(block, first_race_id + num_races - start)
+        races = standard_schedule(count, terrains, distances, first_race_id=start)
+        order = _finish_order(
+            stats, tables, races, engine, None if positions else places
+        )
+        race_ids = races.race_id
+
+        if positions:
+            ranks = np.empty_like(order)
+            np.put_along_axis(ranks, order, np.arange(1, n + 1)[None, :], axis=1)
+            tally.position_sum += ranks.sum(axis=0)
+            tally.position_sq_sum += (ranks * ranks).sum(axis=0)
+
+        winners = order[:, 0]
+        tally.wins += np.bincount(winners, minlength=n)
+        tally.wins_by_terrain += np.bincount(
+            winners * num_terrains + race_ids % num_terrains,
+            minlength=n * num_terrains,
+        ).reshape(n, num_terrains)
+        tally.wins_by_distance += np.bincount(
+            winners * num_distances + race_ids % num_distances,
+            minlength=n * num_distances,
+        ).reshape(n, num_distances)
+
+        placed = order[:, :places].ravel()
+        tally.position_counts += np.bincount(
+            placed * places + np.tile(np.arange(places), count),
+            minlength=n * places,
+        ).reshape(n, places)
+
+        # First occurrence in race order (row-major order of `order`)
+        rows, first = np.unique(winners, return_index=True)
+        np.minimum.at(tally.first_win, rows, race_ids[first])
+        rows, first = np.unique(placed, return_index=True)
+        marker = race_ids[first // places] * places + first % places
+        np.minimum.at(tally.first_placed, rows, marker)
+
+    tally.num_races = num_races
+    return tally
+
+
+# ===== WORKER PROCESSES =====
+
+_WORKER = {}
+
+
+def _init_worker(
+    shm_name, shape, token_ids, terrains, distances, engine, places, positions
+):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    stats = np.ndarray(shape, dtype=np.int64, buffer=shm.buf)
+    _WORKER.update(
+        shm=shm,
+        stats=stats,
+        tables=FieldTables(stats),
+        token_ids=token_ids,
+        terrains=terrains,
+        distances=distances,
+        engine=engine,
+        places=places,
+        positions=positions,
+    )
+
+
+def _run_shard(first_race_id: int, num_races: int) -> RaceTally:
+    w = _WORKER
+    return tally_races(
+        w["stats"],
+        w["token_ids"],
+        first_race_id,
+        num_races,
+        w["terrains"],
+        w["distances"],
+        w["engine"],
+        w["places"],
+        tables=w["tables"],
+        positions=w["positions"],
+    )
+
+
+def shard_ranges(num_races: int, workers: int, first_race_id: int = 0):
+    """Contiguous (first_race_id, count) shards covering the schedule"""
+    size = max(1, min(SHARD_RACES, math.ceil(num_races / max(workers, 1))))
+    return [
+        (start, min(size, first_race_id + num_races - start))
+        for start in range(first_race_id, first_race_id + num_races, size)
+    ]
+
+
+def run_monte_carlo(
+    field: Union[Sequence[Bot], BotRoster],
+    num_races: int,
+    terrains: Sequence[str] = TERRAINS,
+    distances: Sequence[int] = DISTANCES,
+    engine: str = DEFAULT_ENGINE,
+    workers: Optional[int] = None,
+    places: Optional[int] = None,
+    first_race_id: int = 0,
+    positions: bool = True,
+) -> RaceTally:
+    """
+    Race the whole field against itself over the standard schedule.
+
+    Args:
+        field: bots in entry order (entry index seeds the race like
+            enumerate() in simulate_race)
+        workers: worker processes (default: all cores; 1 runs in-process)
+        places: finishing positions to histogram per race (default
+            DEFAULT_PLACES; len(field) gives the full N x N histogram)
+        positions: tally exact per-bot position sums for mean_position /
+            position_stdev; this ranks the whole field every race, so pass
+            False when only winners or the first places are needed
+
+    Returns:
+        RaceTally merged over all races; identical for any worker count
+    """
+    get_engine(engine)
+    stats = stats_matrix(field)
+    if isinstance(field, BotRoster):
+        token_ids = field.token_ids.astype(np.int64)
+    else:
+        token_ids = np.array([b.token_id for b in field], dtype=np.int64)
+    terrains, distances = list(terrains), list(distances)
+    places = min(DEFAULT_PLACES if places is None else places, len(stats))
+
+    workers = workers or os.cpu_count() or 1
+    shards = shard_ranges(num_races, workers, first_race_id)
+    total = RaceTally.empty(token_ids, terrains, distances, places, positions)
+
+    if workers == 1 or len(shards) == 1:
+        tables = FieldTables(stats)
+        for start, count in shards:
+            total.merge(
+                tally_races(
+                    stats,
+                    token_ids,
+                    start,
+                    count,
+                    terrains,
+                    distances,
+                    engine,
+                    places,
+                    tables=tables,
+                    positions=positions,
+                )
+            )
+        return total
+
+    shm = shared_memory.SharedMemory(create=True, size=max(stats.nbytes, 1))
+    try:
+        np.ndarray(stats.shape, dtype=np.int64, buffer=shm.buf)[:] = stats
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(shards)),
+            initializer=_init_worker,
+            initargs=(
+                shm.name,
+                stats.shape,
+                token_ids,
+                terrains,
+                distances,
+                engine,
+                places,
+                positions,
+            ),
+        ) as pool:
+            starts, counts = zip(*shards)
+            for tally in pool.map(_run_shard, starts, counts):
+                total.merge(tally)
+    finally:
+        shm.close()
+        shm.unlink()
+    return total
@@ -0,0 +1,304 @@
+"""
+Golden-output parity corpus for the race engines.
+
+A corpus is a JSON-lines file of fixtures, one simulated race each:
+
+    kind "race"   a race config run through a named engine (legacy-v1,
+                  hashed-v2, segmented), like simulate_race()
+    kind "track"  a track template + track seed run through the segment
+                  model, like the canister's debug_simulate_race
+
+Every fixture stores the participants in entry order (entry index seeds
+the race), their expected times, the expected finishing order (entry
+indices, ties in entry order) and a `source` naming where the expected
+values came from:
+
+    motoko:debug_simulate_race   captured from the canister
+                                 (capture-parity-corpus.py)
+    python:<engine>              the Python scalar reference engines
+
+check_corpus() re-runs each fixture through every engine variant and
+reports the max ULP distance and max relative error of the times plus
+finishing-order mismatches:
+
+    scalar      engine.py / segmented.py, one bot at a time
+    vectorized  race_time_matrix / segmented_race_time_matrix /
+                race_time_tensor
+    parallel    the montecarlo.py shard tally (tally_races) in a process
+                pool; order only, and only for standard-schedule races
+
+Motoko calculateRaceTime has no stat-synergy term while the Python
+legacy-v1 / hashed-v2 ports multiply one in, so only the segment model
+can be captured from the canister for comparison.
+"""
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .data import DATA_DIR, load_roster
+from .engine import get_engine
+from .models import Bot, RaceConfig, RacingStats
+from .montecarlo import tally_races
+from .segmented import simulate_track
+from .segmented_vectorized import (
+    compile_track,
+    race_time_tensor,
+    segmented_race_time_matrix,
+)
+from .tracks import TRACKS, get_track
+from .vectorized import RaceBatch, race_time_matrix, standard_schedule
+
+PARITY_DIR = os.path.join(DATA_DIR, "parity")
+REFERENCE_CORPUS = os.path.join(PARITY_DIR, "python-reference.jsonl")
+
+VARIANTS = ("scalar", "vectorized", "parallel")
+
+
+@dataclass
+class ParityCase:
+    """One fixture; stats rows are (speed, powerCore, acceleration, stability)"""
+
+    id: str
+    kind: str  # "race" or "track"
+    engine: str
+    token_ids: List[int]
+    stats: List[List[int]]
+    times: List[float]
+    order: List[int]
+    source: str
+    race: Optional[dict] = None  # race_id, distance, terrain, start_time
+    track_id: Optional[int] = None
+    seed: Optional[int] = None
+
+    def race_config(self) -> RaceConfig:
+        return RaceConfig(**self.race)
+
+    def bots(self) -> List[Bot]:
+        return [
+            Bot(f"PokedBot #{t}", t, RacingStats(*row))
+            for t, row in zip(self.token_ids, self.stats)
+        ]
+
+
+@dataclass
+class ParityReport:
+    """Worst-case agreement of one engine variant with the corpus"""
+
+    variant: str
+    cases: int = 0
+    cells: int = 0
+    skipped: int = 0
+    max_ulp: int = 0
+    max_rel_error: float = 0.0
+    order_mismatches: List[str] = field(default_factory=list)
+    worst_case: Optional[str] = None
+
+    @property
+    def exact(self) -> bool:
+        return self.max_ulp == 0 and not self.order_mismatches
+
+
+def load_corpus(path: str) -> List[ParityCase]:
+    with open(path) as f:
+        return [ParityCase(**json.loads(line)) for line in f if line.strip()]
+
+
+def write_corpus(path: str, cases: Sequence[ParityCase]) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        for case in cases:
+            row = {k: v for k, v in asdict(case).items() if v is not None}
+            f.write(json.dumps(row) + "\n")
+
+
+def corpus_files(directory: str = PARITY_DIR) -> List[str]:
+    try:
+        names = sorted(os.listdir(directory))
+    except FileNotFoundError:
+        return []
+    return [os.path.join(directory, n) for n in names if n.endswith(".jsonl")]
+
+
+def finishing_order(times: Sequence[float]) -> List[int]:
+    """Entry indices by time, ties in entry order"""
+    return np.argsort(np.asarray(times), kind="stable").tolist()
+
+
+def ulp_distance(a, b) -> np.ndarray:
+    """Number of representable float64 values between a and b"""
+    ia = np.asarray(a, dtype=np.float64).view(np.int64)
+    ib = np.asarray(b, dtype=np.float64).view(np.int64)
+    # Map the sign-magnitude bit patterns onto a monotonic integer line
+    low = np.iinfo(np.int64).min
+    ia = np.where(ia < 0, low - ia, ia)
+    ib = np.where(ib < 0, low - ib, ib)
+    return np.abs(ia - ib)
+
+
+# ===== ENGINE VARIANTS =====
+
+
+def scalar_times(case: ParityCase) -> np.ndarray:
+    bots = case.bots()
+    if case.kind == "track":
+        track = get_track(case.track_id)
+        return np.array(
+            [simulate_track(track, b.stats, case.seed, i) for i, b in enumerate(bots)]
+        )
+    race_time = get_engine(case.engine)
+    race = case.race_config()
+    return np.array([race_time(race, b, i) for i, b in enumerate(bots)])
+
+
+def vectorized_times(case: ParityCase) -> np.ndarray:
+    stats = np.array(case.stats, dtype=np.int64)
+    index = np.arange(len(stats))
+    if case.kind == "track":
+        track = compile_track(get_track(case.track_id))
+        return race_time_tensor(track, stats, [case.seed], index)[0]
+    races = RaceBatch.from_configs([case.race_config()])
+    if case.engine == "segmented":
+        return segmented_race_time_matrix(stats, races, index)[0]
+    return race_time_matrix(stats, races, index, engine=case.engine)[0]
+
+
+def _on_standard_schedule(case: ParityCase) -> bool:
+    if case.kind != "race":
+        return False
+    race = case.race_config()
+    return standard_schedule(1, first_race_id=race.race_id).config(0) == race
+
+
+def parallel_order(case: ParityCase) -> List[int]:
+    """Finishing order from a one-race shard tally"""
+    stats = np.array(case.stats, dtype=np.int64)
+    tally = tally_races(
+        stats,
+        np.array(case.token_ids, dtype=np.int64),
+        case.race["race_id"],
+        1,
+        engine=case.engine,
+    )
+    # One race: position_sum[i] is entry i's finishing position
+    return np.argsort(tally.position_sum, kind="stable").tolist()
+
+
+def _compare(report: ParityReport, case: ParityCase, times: np.ndarray) -> None:
+    expected = np.asarray(case.times, dtype=np.float64)
+    ulps = int(ulp_distance(times, expected).max())
+    rel = float((np.abs(times - expected) / np.abs(expected)).max())
+    report.cases += 1
+    report.cells += len(expected)
+    if ulps > report.max_ulp:
+        report.max_ulp = ulps
+        report.worst_case = case.id
+    report.max_rel_error = max(report.max_rel_error, rel)
+    if finishing_order(times) != case.order:
+        report.order_mismatches.append(case.id)
+
+
+def check_corpus(
+    cases: Sequence[ParityCase],
+    variants: Sequence[str] = VARIANTS,
+    workers: Optional[int] = None,
+) -> Dict[str, ParityReport]:
+    """Run every fixture through each engine variant"""
+    unknown = set(variants) - set(VARIANTS)
+    if unknown:
+        raise ValueError(f"Unknown parity variants: {sorted(unknown)}")
+    reports = {}
+    for variant in variants:
+        report = reports[variant] = ParityReport(variant)
+        if variant == "parallel":
+            runnable = [c for c in cases if _on_standard_schedule(c)]
+            report.skipped = len(cases) - len(runnable)
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                orders = list(pool.map(parallel_order, runnable, chunksize=16))
+            for case, order in zip(runnable, orders):
+                report.cases += 1
+                report.cells += len(order)
+                if order != case.order:
+                    report.order_mismatches.append(case.id)
+            continue
+        run = scalar_times if variant == "scalar" else vectorized_times
+        for case in cases:
+            _compare(report, case, run(case))
+    return reports
+
+
+# ===== REFERENCE CORPUS =====
+
+
+def reference_corpus(
+    races_per_field: int = 12,
+    field_sizes: Sequence[int] = (2, 8, 16),
+    seeds_per_track: int = 4,
+) -> List[ParityCase]:
+    """
+    Fixtures with expected values from the Python scalar engines, over
+    standard-schedule races and every track template. Fields are fixed
+    strided picks from the collection.
+    """
+    roster = load_roster()
+    cases = []
+
+    def fixture(case_id, kind, engine, rows, times, **where):
+        return ParityCase(
+            id=case_id,
+            kind=kind,
+            engine=engine,
+            token_ids=roster.token_ids[rows].tolist(),
+            stats=roster.stats_matrix(rows).tolist(),
+            times=[float(t) for t in times],
+            order=finishing_order(times),
+            source=f"python:{engine}",
+            **where,
+        )
+
+    for engine in ("legacy-v1", "hashed-v2", "segmented"):
+        race_time = get_engine(engine)
+        for size in field_sizes:
+            rows = (np.arange(size) * (len(roster) // size) + size) % len(roster)
+            bots = roster.to_bots(rows)
+            first = 1000 * size
+            for race in standard_schedule(
+                races_per_field, first_race_id=first
+            ).configs():
+                times = [race_time(race, b, i) for i, b in enumerate(bots)]
+                cases.append(
+                    fixture(
+                        f"{engine}-n{size}-r{race.race_id}",
+                        "race",
+                        engine,
+                        rows,
+                        times,
+                        race=asdict(race),
+                    )
+                )
+
+    rows = np.arange(8) * 1237 % len(roster)
+    bots = roster.to_bots(rows)
+    for track_id, track in sorted(TRACKS.items()):
+        for seed in range(seeds_per_track):
+            track_seed = 7919 * (track_id + 1) * (seed + 1)
+            times = [
+                simulate_track(track, b.stats, track_seed, i)
+                for i, b in enumerate(bots)
+            ]
+            cases.append(
+                fixture(
+                    f"track{track_id}-s{track_seed}",
+                    "track",
+                    "segmented",
+                    rows,
+                    times,
+                    track_id=track_id,
+                    seed=track_seed,
+                )
+            )
+    return cases
@@ -0,0 +1,277 @@
+"""
+Replay archived races under a candidate balance change.
+
+Each race in the archive (archive.py) is re-simulated twice with the
+segment model: once with a baseline set of SegmentConstants (default: the
+live values) and once with the candidate. The diff covers per-entry
+position changes and time deltas, and per-race winner and podium flips.
+It is summarized by terrain and race class.
+
+get_completed_races carries neither entry order nor stats, so replays race
+the archived results order (participant index = archived position - 1)
+with roster base stats. Races the baseline replays in the archived order
+are counted as `faithful`, which bounds how much the archive's outcomes
+can be trusted against the replays. Races with a bot missing from the
+roster or an unknown track are skipped.
+
+Bots of every race on one track are evaluated together
+(paired_race_times), and chunk files are replayed in a process pool.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .archive import RaceArchive, RaceChunk, read_chunk
+from .data import load_roster
+from .models import RACE_CLASSES, TERRAINS
+from .roster import BotRoster
+from .segmented_vectorized import (
+    LIVE_CONSTANTS,
+    SegmentConstants,
+    compile_track,
+    paired_race_times,
+    segment_divisors,
+)
+from .tracks import TRACKS, get_track
+
+REPLAY_COLUMNS = (
+    "race_id",
+    "track_id",
+    "track_seed",
+    "terrain",
+    "race_class",
+    "token_id",
+    "position",
+)
+RACE_FIELDS = (
+    "race_id",
+    "terrain",
+    "race_class",
+    "faithful",
+    "winner_flip",
+    "podium_flip",
+)
+ENTRY_FIELDS = (
+    "token_id",
+    "archived_position",
+    "baseline_position",
+    "candidate_position",
+    "baseline_time",
+    "candidate_time",
+)
+
+
+@dataclass
+class ReplayResult:
+    """Replay diffs; race fields are per race, entry fields per result row"""
+
+    races: Dict[str, np.ndarray]
+    entries: Dict[str, np.ndarray]
+    entry_start: np.ndarray
+    skipped: int = 0
+
+    def __len__(self) -> int:
+        return len(self.entry_start) - 1
+
+    @property
+    def position_change(self) -> np.ndarray:
+        return self.entries["candidate_position"] - self.entries["baseline_position"]
+
+    @property
+    def time_delta(self) -> np.ndarray:
+        return self.entries["candidate_time"] - self.entries["baseline_time"]
+
+    def entry_race(self) -> np.ndarray:
+        return np.repeat(np.arange(len(self)), np.diff(self.entry_start))
+
+    def race_diff(self, row: int) -> dict:
+        """One race's diff: flips plus the entries whose position changed"""
+        rows = slice(self.entry_start[row], self.entry_start[row + 1])
+        moved = [
+            {
+                "tokenId": int(token),
+                "from": int(before),
+                "to": int(after),
+                "timeDelta": float(after_time - before_time),
+            }
+            for token, before, after, before_time, after_time in zip(
+                self.entries["token_id"][rows],
+                self.entries["baseline_position"][rows],
+                self.entries["candidate_position"][rows],
+                self.entries["baseline_time"][rows],
+                self.entries["candidate_time"][rows],
+            )
+            if before != after
+        ]
+        return {
+            "raceId": int(self.races["race_id"][row]),
+            "winnerFlip": bool(self.races["winner_flip"][row]),
+            "podiumFlip": bool(self.races["podium_flip"][row]),
+            "moved": moved,
+        }
+
+    def summary(self, by: str = "terrain") -> Dict[str, dict]:
+        """Flip rates per terrain or race_class (unknown codes as "?")"""
+        names = {"terrain": TERRAINS, "race_class": RACE_CLASSES}[by]
+        codes = self.races[by]
+        moved = np.bincount(
+            self.entry_race(),
+            weights=self.position_change != 0,
+            minlength=len(self),
+        )
+        abs_delta = np.abs(self.time_delta)
+        entry_codes = codes[self.entry_race()]
+        out = {}
+        for code in np.unique(codes).tolist():
+            races = codes == code
+            n = int(races.sum())
+            out[names[code] if code >= 0 else "?"] = {
+                "races": n,
+                "faithful": int(self.races["faithful"][races].sum()),
+                "winner_flips": int(self.races["winner_flip"][races].sum()),
+                "winner_flip_rate": float(self.races["winner_flip"][races].mean()),
+                "podium_flip_rate": float(self.races["podium_flip"][races].mean()),
+                "moved_per_race": float(moved[races].sum() / n),
+                "mean_abs_time_delta": float(abs_delta[entry_codes == code].mean()),
+            }
+        return out
+
+
+def _finishing_positions(times, entry_race, participant) -> np.ndarray:
+    """1-based position of each entry within its race, ties in entry order"""
+    order = np.lexsort((participant, times, entry_race))
+    first = np.searchsorted(entry_race[order], entry_race[order], side="left")
+    positions = np.empty(len(times), dtype=np.int64)
+    positions[order] = np.arange(len(times)) - first + 1
+    return positions
+
+
+def replay_chunk(
+    chunk: RaceChunk,
+    candidate: SegmentConstants,
+    baseline: SegmentConstants = LIVE_CONSTANTS,
+    roster: Optional[BotRoster] = None,
+) -> ReplayResult:
+    """Replay the races of one RaceChunk (REPLAY_COLUMNS needed)"""
+    roster = roster if roster is not None else load_roster()
+    entry_race = chunk.entry_race()
+    known = np.isin(chunk["token_id"], roster.token_ids)
+    runnable = np.isin(chunk["track_id"], list(TRACKS))
+    runnable &= np.bincount(entry_race, weights=~known, minlength=len(chunk)) == 0
+    rows = np.flatnonzero(runnable)
+
+    # Entries of the runnable races; archived order stands in for entry order
+    keep = runnable[entry_race]
+    participant = (np.arange(len(entry_race)) - chunk.entry_start[entry_race])[keep]
+    entry_race = np.searchsorted(rows, entry_race[keep])
+    token_ids = chunk["token_id"][keep]
+    track_ids = chunk["track_id"][rows][entry_race]
+    seeds = chunk["track_seed"][rows][entry_race]
+    stats = roster.stats_matrix(roster.rows_of(token_ids.tolist()))
+
+    times = {
+        "baseline": np.empty(len(token_ids), dtype=np.float64),
+        "candidate": np.empty(len(token_ids), dtype=np.float64),
+    }
+    for track_id in np.unique(track_ids).tolist():
+        sel = np.flatnonzero(track_ids == track_id)
+        track = compile_track(get_track(track_id))
+        for name, constants in (("baseline", baseline), ("candidate", candidate)):
+            factors = segment_divisors(track, stats[sel], constants)
+            times[name][sel] = paired_race_times(
+                track, stats[sel], seeds[sel], participant[sel], factors
+            )
+
+    baseline_position = _finishing_positions(times["baseline"], entry_race, participant)
+    candidate_position = _finishing_positions(
+        times["candidate"], entry_race, participant
+    )
+    archived_position = chunk["position"][keep].astype(np.int64)
+
+    def per_race(mask):
+        return np.bincount(entry_race, weights=mask, minlength=len(rows)) > 0
+
+    winner = (baseline_position == 1) != (candidate_position == 1)
+    podium = (baseline_position <= 3) != (candidate_position <= 3)
+    entry_start = np.zeros(len(rows) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(entry_race, minlength=len(rows)), out=entry_start[1:])
+    return ReplayResult(
+        races={
+            "race_id": chunk["race_id"][rows],
+            "terrain": chunk["terrain"][rows],
+            "race_class": chunk["race_class"][rows],
+            "faithful": ~per_race(baseline_position != archived_position),
+            "winner_flip": per_race(winner),
+            "podium_flip": per_race(podium),
+        },
+        entries={
+            "token_id": token_ids,
+            "archived_position": archived_position,
+            "baseline_position": baseline_position,
+            "candidate_position": candidate_position,
+            "baseline_time": times["baseline"],
+            "candidate_time": times["candidate"],
+        },
+        entry_start=entry_start,
+        skipped=len(chunk) - len(rows),
+    )
+
+
+def _replay_path(task) -> Optional[ReplayResult]:
+    path, filters, candidate, baseline = task
+    chunk = read_chunk(path, REPLAY_COLUMNS, **filters)
+    if chunk is None:
+        return None
+    return replay_chunk(chunk, candidate, baseline)
+
+
+def merge_results(results: List[ReplayResult]) -> ReplayResult:
+    """Concatenate replay results in order"""
+    results = [r for r in results if r is not None]
+    races = {
+        name: (
+            np.concatenate([r.races[name] for r in results]) if results else np.zeros(0)
+        )
+        for name in RACE_FIELDS
+    }
+    entries = {
+        name: (
+            np.concatenate([r.entries[name] for r in results])
+            if results
+            else np.zeros(0)
+        )
+        for name in ENTRY_FIELDS
+    }
+    counts = [np.diff(r.entry_start) for r in results]
+    entry_start = np.zeros(sum(len(c) for c in counts) + 1, dtype=np.int64)
+    if counts:
+        np.cumsum(np.concatenate(counts), out=entry_start[1:])
+    return ReplayResult(races, entries, entry_start, sum(r.skipped for r in results))
+
+
+def replay_archive(
+    candidate: SegmentConstants,
+    baseline: SegmentConstants = LIVE_CONSTANTS,
+    archive: Optional[RaceArchive] = None,
+    workers: Optional[int] = None,
+    months=None,
+    **filters,
+) -> ReplayResult:
+    """
+    Replay every archived race (optionally filtered like
+    RaceArchive.scan) under baseline and candidate constants.
+
+    Args:
+        workers: worker processes (default: all cores; 1 runs in-process)
+    """
+    archive = archive or RaceArchive()
+    tasks = [(p, filters, candidate, baseline) for p in archive.chunk_paths(months)]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(tasks) <= 1:
+        return merge_results([_replay_path(task) for task in tasks])
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+        return merge_results(list(pool.map(_replay_path, tasks)))
@@ -0,0 +1,238 @@
+"""
+Precomputed per-track stat response tables.
+
+Every factor of calculate_segment_time other than the seeded noise depends
+on one stat and one segment, and stats are small integers, so each track
+gets a table per factor indexed by [segment, stat value]:
+
+    terrain_mod     stat picked by the segment's terrain
+    angle_mod       powerCore
+    difficulty_mod  stability
+    momentum_mod    acceleration
+    base_speed      speed (same for every segment)
+
+Race times are then table gathers plus the seed terms, multiplied in the
+original order so they stay bit-identical to the scalar engine. Tables are
+cached on disk under data/.cache/, keyed by a hash of the compiled track,
+the SegmentConstants they were built from and RESPONSE_VERSION (bump it
+when the table formulas change).
+"""
+
+import dataclasses
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence, Union
+
+import numpy as np
+
+from .cache import cache_path, read_columns, write_columns
+from .data import CACHE_DIR
+from .models import STAT_NAMES
+from .segmented_vectorized import (
+    LIVE_CONSTANTS,
+    CompiledTrack,
+    SegmentConstants,
+    StatsLike,
+    as_stats_matrix,
+    compile_track,
+    race_time_tensor,
+)
+from .tracks import TrackTemplate
+
+# Version of the table formulas, part of the cache key
+RESPONSE_VERSION = 2
+
+# Stat values covered by the tables (roster stats are uint8)
+STAT_VALUES = 256
+
+SPEED, POWER_CORE, ACCELERATION, STABILITY = range(len(STAT_NAMES))
+
+# Stat column driving the terrain modifier per terrain code; the unknown
+# terrain code reads a column of ones
+TERRAIN_STAT = np.array([STABILITY, POWER_CORE, ACCELERATION, SPEED])
+
+TABLE_COLUMNS = (
+    "base_speed",
+    "terrain_mod",
+    "angle_mod",
+    "difficulty_mod",
+    "momentum_mod",
+)
+
+_LOADED: Dict[str, "TrackResponse"] = {}
+
+
+def track_hash(
+    track: CompiledTrack, constants: SegmentConstants = LIVE_CONSTANTS
+) -> str:
+    """Content hash of a compiled track (segments, laps) and the constants"""
+    digest = hashlib.sha256()
+    header = {"version": RESPONSE_VERSION, "constants": dataclasses.asdict(constants)}
+    digest.update(json.dumps(header, sort_keys=True).encode("utf-8"))
+    for column in (
+        track.length,
+        track.angle,
+        track.terrain,
+        track.difficulty,
+        track.previous_difficulty,
+        track.lap,
+    ):
+        digest.update(np.ascontiguousarray(column).tobytes())
+    return digest.hexdigest()[:32]
+
+
+@dataclass
+class TrackResponse:
+    """Stat response tables for one compiled track"""
+
+    track: CompiledTrack
+    key: str
+    base_speed: np.ndarray  # (V,)
+    terrain_mod: np.ndarray  # (S x V)
+    angle_mod: np.ndarray  # (S x V)
+    difficulty_mod: np.ndarray  # (S x V)
+    momentum_mod: np.ndarray  # (S x V)
+
+    @classmethod
+    def build(
+        cls, track: CompiledTrack, constants: SegmentConstants = LIVE_CONSTANTS
+    ) -> "TrackResponse":
+        v = np.arange(STAT_VALUES, dtype=np.float64)[None, :]
+        num_segments = len(track)
+
+        base_speed = np.sqrt(v[0]) * 7.5
+
+        terrain_mods = np.stack(
+            [
+                1.0 + ((100.0 - v[0]) / constants.scrap_heaps_penalty),
+                1.0 + ((100.0 - v[0]) / constants.wasteland_sand_penalty),
+                1.0 + ((100.0 - v[0]) / constants.metal_roads_penalty),
+                np.ones(STAT_VALUES),
+            ]
+        )
+        terrain_mod = terrain_mods[track.terrain]
+
+        angle = track.angle[:, None]
+        angle_mod = np.where(
+            angle > 0, 1.0 + (angle * (100.0 - v) / constants.angle_penalty), 1.0
+        )
+
+        difficulty = track.difficulty[:, None]
+        stability_factor = 1.0 + ((100.0 - v) / constants.difficulty_penalty)
+        difficulty_mod = np.where(
+            difficulty > 1.0, difficulty * stability_factor, difficulty
+        )
+
+        prev = track.previous_difficulty[:, None]
+        momentum_loss = np.where(
+            prev > 1.0, (prev - 1.0) * constants.momentum_loss, 0.0
+        )
+        momentum_mod = 1.0 + (
+            momentum_loss * (1.0 - (v / constants.acceleration_recovery))
+        )
+
+        shape = (num_segments, STAT_VALUES)
+        return cls(
+            track=track,
+            key=track_hash(track, constants),
+            base_speed=base_speed,
+            terrain_mod=np.broadcast_to(terrain_mod, shape).copy(),
+            angle_mod=np.broadcast_to(angle_mod, shape).copy(),
+            difficulty_mod=np.broadcast_to(difficulty_mod, shape).copy(),
+            momentum_mod=np.broadcast_to(momentum_mod, shape).copy(),
+        )
+
+    def factors(self, stats: StatsLike):
+        """(base_speed (N x 1), divisor (N x S)) by table lookup"""
+        s = as_stats_matrix(stats).astype(np.intp)
+        if s.size and (s.min() < 0 or s.max() >= STAT_VALUES):
+            raise ValueError(f"stats must be in 0..{STAT_VALUES - 1}")
+        segments = np.arange(len(self.track))
+
+        terrain_values = s[:, TERRAIN_STAT[self.track.terrain]]
+        divisor = (
+            self.terrain_mod[segments, terrain_values]
+            * self.angle_mod[segments, s[:, POWER_CORE : POWER_CORE + 1]]
+            * self.difficulty_mod[segments, s[:, STABILITY : STABILITY + 1]]
+            * self.momentum_mod[segments, s[:, ACCELERATION : ACCELERATION + 1]]
+        )
+        return self.base_speed[s[:, SPEED : SPEED + 1]], divisor
+
+    def race_times(
+        self, stats: StatsLike, track_seeds, participant_index=None
+    ) -> np.ndarray:
+        """(K x N) race times, bit-identical to race_time_tensor()"""
+        return race_time_tensor(
+            self.track,
+            stats,
+            track_seeds,
+            participant_index,
+            factors=self.factors(stats),
+        )
+
+
+def _table_path(key: str, cache_dir: str) -> str:
+    return cache_path(f"track-response-{key}", cache_dir)
+
+
+def track_response(
+    track: Union[CompiledTrack, TrackTemplate, Sequence[dict]],
+    cache_dir: Optional[str] = CACHE_DIR,
+    constants: SegmentConstants = LIVE_CONSTANTS,
+) -> TrackResponse:
+    """
+    Response tables for a track under `constants`, from memory, the disk
+    cache, or built.
+
+    Pass cache_dir=None to skip the disk cache.
+    """
+    if not isinstance(track, CompiledTrack):
+        track = compile_track(track)
+    key = track_hash(track, constants)
+    if key in _LOADED:
+        return _LOADED[key]
+
+    response = None
+    if cache_dir is not None:
+        path = _table_path(key, cache_dir)
+        try:
+            columns, header = read_columns(path)
+            if header["source"].get("track_hash") == key:
+                response = TrackResponse(
+                    track=track,
+                    key=key,
+                    **{name: columns[name] for name in TABLE_COLUMNS},
+                )
+        except (OSError, ValueError, KeyError):
+            pass
+
+    if response is None:
+        response = TrackResponse.build(track, constants)
+        if cache_dir is not None:
+            try:
+                write_columns(
+                    _table_path(key, cache_dir),
+                    {name: getattr(response, name) for name in TABLE_COLUMNS},
+                    {"segments": len(track), "stat_values": STAT_VALUES},
+                    {"track_hash": key},
+                )
+            except OSError:
+                pass
+
+    _LOADED[key] = response
+    return response
+
+
+def score_tracks(
+    tracks: Dict[str, Union[CompiledTrack, TrackTemplate, Sequence[dict]]],
+    stats: StatsLike,
+    track_seeds,
+    participant_index=None,
+) -> Dict[str, np.ndarray]:
+    """(K x N) race times for a whole field on every track"""
+    stats = as_stats_matrix(stats)
+    return {
+        name: track_response(track).race_times(stats, track_seeds, participant_index)
+        for name, track in tracks.items()
+    }
@@ -0,0 +1,333 @@
+"""
+Column-backed bot roster.
+
+BotRoster keeps the collection as one uint8 array per stat, faction codes
+into an interned name table and a dense tokenId -> row index, so the full
+10k collection costs a few hundred KB instead of 10k dataclass instances.
+BotView / StatsView give row-backed objects for code written against Bot.
+"""
+
+import sys
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from .models import STAT_NAMES, Bot, RacingStats
+
+NO_ROW = -1
+
+# Stored columns; total_stats and the tokenId index are derived on load
+ROSTER_COLUMNS = (
+    "token_ids",
+    "speed",
+    "power_core",
+    "acceleration",
+    "stability",
+    "faction_codes",
+)
+
+
+class StatsView:
+    """Read-only RacingStats look-alike backed by one roster row"""
+
+    __slots__ = ("_roster", "_row")
+
+    def __init__(self, roster: "BotRoster", row: int):
+        self._roster = roster
+        self._row = row
+
+    @property
+    def speed(self) -> int:
+        return int(self._roster.speed[self._row])
+
+    @property
+    def powerCore(self) -> int:
+        return int(self._roster.power_core[self._row])
+
+    @property
+    def acceleration(self) -> int:
+        return int(self._roster.acceleration[self._row])
+
+    @property
+    def stability(self) -> int:
+        return int(self._roster.stability[self._row])
+
+    def to_stats(self) -> RacingStats:
+        return RacingStats(
+            speed=self.speed,
+            powerCore=self.powerCore,
+            acceleration=self.acceleration,
+            stability=self.stability,
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"StatsView(speed={self.speed}, powerCore={self.powerCore}, "
+            f"acceleration={self.acceleration}, stability={self.stability})"
+        )
+
+
+class BotView:
+    """Read-only Bot look-alike backed by one roster row"""
+
+    __slots__ = ("_roster", "_row", "stats")
+
+    def __init__(self, roster: "BotRoster", row: int):
+        self._roster = roster
+        self._row = row
+        self.stats = StatsView(roster, row)
+
+    @property
+    def row(self) -> int:
+        return self._row
+
+    @property
+    def token_id(self) -> int:
+        return int(self._roster.token_ids[self._row])
+
+    @property
+    def id(self) -> str:
+        return f"{self._roster.id_prefix}{self.token_id}"
+
+    @property
+    def faction(self) -> str:
+        return self._roster.factions[self._roster.faction_codes[self._row]]
+
+    @property
+    def total_stats(self) -> int:
+        return int(self._roster.total_stats[self._row])
+
+    def to_bot(self) -> Bot:
+        return Bot(
+            id=self.id,
+            token_id=self.token_id,
+            stats=self.stats.to_stats(),
+            faction=self.faction,
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"BotView(id={self.id!r}, stats={self.stats!r}, faction={self.faction!r})"
+        )
+
+
+class BotRoster:
+    """
+    The bot collection as parallel columns.
+
+    speed/power_core/acceleration/stability are contiguous uint8 arrays,
+    faction_codes index into `factions`, and token lookups go through a
+    dense array indexed by tokenId.
+    """
+
+    def __init__(
+        self,
+        token_ids: Sequence[int],
+        stats: np.ndarray,
+        faction_codes: Sequence[int],
+        factions: Sequence[str],
+        id_prefix: str = "PokedBot #",
+    ):
+        stats = np.asarray(stats)
+        if stats.ndim != 2 or stats.shape[1] != len(STAT_NAMES):
+            raise ValueError(f"stats must be (N x 4), got shape {stats.shape}")
+        if stats.size and (stats.min() < 0 or stats.max() > 255):
+            raise ValueError("stats must fit in uint8 (0-255)")
+
+        self.token_ids = np.ascontiguousarray(token_ids, dtype=np.int32)
+        if len(self.token_ids) != len(stats):
+            raise ValueError("token_ids and stats have different lengths")
+        if self.token_ids.size and self.token_ids.min() < 0:
+            raise ValueError("tokenIds must be non-negative")
+
+        columns = stats.astype(np.uint8)
+        self.speed = np.ascontiguousarray(columns[:, 0])
+        self.power_core = np.ascontiguousarray(columns[:, 1])
+        self.acceleration = np.ascontiguousarray(columns[:, 2])
+        self.stability = np.ascontiguousarray(columns[:, 3])
+        self.faction_codes = np.ascontiguousarray(faction_codes, dtype=np.uint8)
+        self.factions = [sys.intern(name) for name in factions]
+        self.id_prefix = id_prefix
+        self._index()
+
+    def _index(self):
+        self.total_stats = (
+            self.speed.astype(np.uint16)
+            + self.power_core
+            + self.acceleration
+            + self.stability
+        )
+        size = int(self.token_ids.max()) + 1 if self.token_ids.size else 0
+        self._row_index = np.full(size, NO_ROW, dtype=np.int32)
+        self._row_index[self.token_ids] = np.arange(len(self.token_ids))
+        if np.count_nonzero(self._row_index != NO_ROW) != len(self.token_ids):
+            raise ValueError("duplicate tokenIds in roster")
+
+    @classmethod
+    def from_columns(
+        cls,
+        columns: Dict[str, np.ndarray],
+        factions: Sequence[str],
+        id_prefix: str = "PokedBot #",
+    ) -> "BotRoster":
+        """Wrap existing column arrays (see columns()) without copying them"""
+        roster = cls.__new__(cls)
+        for name in ROSTER_COLUMNS:
+            setattr(roster, name, columns[name])
+        roster.factions = [sys.intern(name) for name in factions]
+        roster.id_prefix = id_prefix
+        roster._index()
+        return roster
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """The stored columns, keyed as from_columns() expects"""
+        return {name: getattr(self, name) for name in ROSTER_COLUMNS}
+
+    @classmethod
+    def from_records(
+        cls, records: Iterable[Dict], id_prefix: str = "PokedBot #"
+    ) -> "BotRoster":
+        """Build from precomputed-stats.json style dicts"""
+        records = list(records)
+        factions: List[str] = []
+        codes: Dict[str, int] = {}
+        faction_codes = []
+        for record in records:
+            name = record.get("faction", "")
+            if name not in codes:
+                codes[name] = len(factions)
+                factions.append(name)
+            faction_codes.append(codes[name])
+
+        stats = np.array(
+            [[record[name] for name in STAT_NAMES] for record in records],
+            dtype=np.int64,
+        ).reshape(-1, len(STAT_NAMES))
+        return cls(
+            [record["tokenId"] for record in records],
+            stats,
+            faction_codes,
+            factions,
+            id_prefix=id_prefix,
+        )
+
+    @classmethod
+    def from_bots(
+        cls, bots: Sequence[Bot], id_prefix: str = "PokedBot #"
+    ) -> "BotRoster":
+        return cls.from_records(
+            (
+                {
+                    "tokenId": b.token_id,
+                    "speed": b.stats.speed,
+                    "powerCore": b.stats.powerCore,
+                    "acceleration": b.stats.acceleration,
+                    "stability": b.stats.stability,
+                    "faction": b.faction,
+                }
+                for b in bots
+            ),
+            id_prefix=id_prefix,
+        )
+
+    def __len__(self) -> int:
+        return len(self.token_ids)
+
+    def __iter__(self) -> Iterator[BotView]:
+        return (BotView(self, row) for row in range(len(self)))
+
+    def __contains__(self, token_id: int) -> bool:
+        return self.row_of(token_id, default=NO_ROW) != NO_ROW
+
+    def row_of(self, token_id: int, default: Optional[int] = None) -> int:
+        """Row holding token_id (KeyError if absent and no default)"""
+        if 0 <= token_id < len(self._row_index):
+            row = int(self._row_index[token_id])
+            if row != NO_ROW:
+                return row
+        if default is not None:
+            return default
+        raise KeyError(f"tokenId {token_id} not in roster")
+
+    def rows_of(self, token_ids: Iterable[int]) -> np.ndarray:
+        """Rows for several tokenIds, in the order given"""
+        return np.array([self.row_of(t) for t in token_ids], dtype=np.int64)
+
+    def view(self, row: int) -> BotView:
+        return BotView(self, row)
+
+    def bot(self, token_id: int) -> BotView:
+        """O(1) lookup by tokenId"""
+        return BotView(self, self.row_of(token_id))
+
+    def faction_of(self, row: int) -> str:
+        return self.factions[self.faction_codes[row]]
+
+    def faction_mask(self, faction: str) -> np.ndarray:
+        if faction not in self.factions:
+            return np.zeros(len(self), dtype=bool)
+        return self.faction_codes == self.factions.index(faction)
+
+    def stats_matrix(self, rows=None) -> np.ndarray:
+        """(N x 4) int64 stats in STAT_NAMES order, for the array engines"""
+        columns = (self.speed, self.power_core, self.acceleration, self.stability)
+        if rows is not None:
+            columns = tuple(column[rows] for column in columns)
+        return np.stack(columns, axis=1).astype(np.int64)
+
+    def take(self, rows) -> "BotRoster":
+        """Sub-roster with the given rows (index array or boolean mask)"""
+        rows = np.arange(len(self))[rows]
+        return BotRoster(
+            self.token_ids[rows],
+            self.stats_matrix(rows),
+            self.faction_codes[rows],
+            self.factions,
+            id_prefix=self.id_prefix,
+        )
+
+    def views(self, rows=None) -> List[BotView]:
+        rows = range(len(self)) if rows is None else np.arange(len(self))[rows]
+        return [BotView(self, int(row)) for row in rows]
+
+    def to_bots(self, rows=None) -> List[Bot]:
+        """Materialize full Bot dataclasses (for code that mutates them)"""
+        rows = slice(None) if rows is None else rows
+        columns = zip(
+            self.token_ids[rows].tolist(),
+            self.speed[rows].tolist(),
+            self.power_core[rows].tolist(),
+            self.acceleration[rows].tolist(),
+            self.stability[rows].tolist(),
+            self.faction_codes[rows].tolist(),
+        )
+        return [
+            Bot(
+                id=f"{self.id_prefix}{token_id}",
+                token_id=token_id,
+                stats=RacingStats(
+                    speed=speed,
+                    powerCore=power_core,
+                    acceleration=acceleration,
+                    stability=stability,
+                ),
+                faction=self.factions[code],
+            )
+            for token_id, speed, power_core, acceleration, stability, code in columns
+        ]
+
+    @property
+    def nbytes(self) -> int:
+        return sum(
+            a.nbytes
+            for a in (
+                self.token_ids,
+                self.speed,
+                self.power_core,
+                self.acceleration,
+                self.stability,
+                self.total_stats,
+                self.faction_codes,
+                self._row_index,
+            )
+        )
@@ -0,0 +1,140 @@
+"""
+Segmented race engine (Python port of RacingSimulator.simulateRaceSegmented
+timing, without race events).
+"""
+
+import math
+from typing import List, Optional
+
+from .models import Bot, RaceConfig, RacingStats
+from .tracks import TrackTemplate, get_track, select_track_for_race
+
+
+def calculate_segment_time(
+    segment: dict, stats: RacingStats, seed: int, previous_difficulty: float
+) -> float:
+    """Calculate time for a single segment."""
+    speed = stats.speed
+    power_core = stats.powerCore
+    stability = stats.stability
+    acceleration = stats.acceleration
+
+    # Base time for segment
+    segment_length = segment["length"]
+    base_speed = math.sqrt(speed) * 7.5
+
+    # Terrain modifier based on segment terrain
+    terrain = segment["terrain"]
+    if terrain == "ScrapHeaps":
+        terrain_mod = 1.0 + ((100.0 - stability) / 150.0)  # Up to 67% penalty
+    elif terrain == "WastelandSand":
+        terrain_mod = 1.0 + ((100.0 - power_core) / 200.0)  # Up to 50% penalty
+    elif terrain == "MetalRoads":
+        terrain_mod = 1.0 + ((100.0 - acceleration) / 160.0)  # Up to 62% penalty
+    else:
+        terrain_mod = 1.0
+
+    # Angle modifier (uphill slows)
+    angle = segment["angle"]
+    if angle > 0:
+        angle_mod = 1.0 + (angle * (100.0 - power_core) / 3000.0)
+    else:
+        angle_mod = 1.0
+
+    # Momentum system: acceleration affects recovery after difficult sections
+    if previous_difficulty > 1.0:
+        momentum_loss = (previous_difficulty - 1.0) * 0.15
+    else:
+        momentum_loss = 0.0
+
+    acceleration_recovery = acceleration / 140.0
+    momentum_mod = 1.0 + (momentum_loss * (1.0 - acceleration_recovery))
+
+    # Segment difficulty - scales with stability
+    difficulty = segment["difficulty"]
+    if difficulty > 1.0:
+        stability_factor = 1.0 + ((100.0 - stability) / 300.0)
+        difficulty_mod = difficulty * stability_factor
+    else:
+        difficulty_mod = difficulty
+
+    # Randomness for this segment (±10%)
+    segment_seed = seed % 1000
+    random_mod = 0.90 + (segment_seed / 5000.0)
+
+    # Calculate segment time
+    effective_speed = base_speed / (
+        terrain_mod * angle_mod * difficulty_mod * momentum_mod
+    )
+    segment_time = (segment_length / effective_speed) * random_mod
+
+    # 10x speed multiplier
+    return max(0.1, segment_time / 10.0)
+
+
+def simulate_segments(
+    segments: List[dict],
+    stats: RacingStats,
+    track_seed: int,
+    participant_index: int,
+    lap_length: Optional[int] = None,
+) -> float:
+    """
+    Simulate a full race over a segment list and return total time.
+
+    lap_length is the number of segments per lap (used for the per-lap
+    performance seed); it defaults to the whole list, i.e. a single lap.
+    """
+    lap_length = lap_length or len(segments)
+    total_time = 0.0
+    previous_difficulty = 1.0
+
+    for segment_idx, segment in enumerate(segments):
+        # Use trackSeed + participant index + segment index for deterministic randomness
+        segment_seed = track_seed + (participant_index * 1000) + segment_idx
+
+        # Calculate base segment time
+        base_segment_time = calculate_segment_time(
+            segment, stats, segment_seed, previous_difficulty
+        )
+
+        # Per-segment performance variation (±6%)
+        lap = segment_idx // lap_length
+        segment_condition_seed = (
+            segment_seed * 31337 + participant_index * 7919 + lap * 12345
+        ) % 1000
+        segment_performance = 0.94 + (segment_condition_seed / 1666.67)
+
+        segment_time = base_segment_time * segment_performance
+        total_time += segment_time
+
+        # Update previous difficulty
+        previous_difficulty = segment["difficulty"]
+
+    return total_time
+
+
+def simulate_track(
+    track: TrackTemplate, stats: RacingStats, track_seed: int, participant_index: int
+) -> float:
+    """Simulate a full race on a track template (all laps)"""
+    return simulate_segments(
+        track.all_segments(),
+        stats,
+        track_seed,
+        participant_index,
+        lap_length=len(track.segments),
+    )
+
+
+def race_track_seed(race: RaceConfig) -> int:
+    """trackSeed as generated at race start in main.mo"""
+    return abs(race.race_id * 7919 + race.start_time)
+
+
+def calculate_race_time_segmented(
+    race: RaceConfig, bot: Bot, participant_index: int
+) -> float:
+    """Race time on the track the canister would pick for this race config"""
+    track = get_track(select_track_for_race(race.terrain, race.race_id))
+    return simulate_track(track, bot.stats, race_track_seed(race), participant_index)
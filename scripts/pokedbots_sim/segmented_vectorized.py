@@ -0,0 +1,389 @@
+"""
+Array-based segmented race engine.
+
+A track is compiled once into per-segment arrays (length, angle, terrain
+code, difficulty, previous-segment difficulty, lap). Segment times for
+every (seed, bot, segment) are then evaluated with numpy, in the same
+floating-point operation order as segmented.calculate_segment_time /
+simulate_segments so results are bit-identical to the scalar engine.
+
+The momentum term only depends on the previous segment's difficulty, which
+is a property of the track, so the compiled previous_difficulty column
+turns it into an ordinary per-segment factor. Totals are still summed
+segment by segment, matching the scalar accumulation order.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence, Union
+
+import numpy as np
+
+from .models import STAT_NAMES, TERRAINS, RacingStats
+from .tracks import TrackTemplate, get_track, select_track_for_race
+from .vectorized import (
+    TERRAIN_CODES,
+    UNKNOWN_TERRAIN,
+    RaceBatch,
+    stats_matrix,
+)
+
+# Seeds / bots evaluated per block in race_time_tensor
+CHUNK_CELLS = 1 << 18
+
+StatsLike = Union[np.ndarray, RacingStats, dict, Sequence]
+
+# Seed-driven factors by seed residue (0..999)
+RANDOM_MOD_TABLE = 0.90 + (np.arange(1000, dtype=np.float64) / 5000.0)
+PERFORMANCE_TABLE = 0.94 + (np.arange(1000, dtype=np.float64) / 1666.67)
+
+
+@dataclass(frozen=True)
+class SegmentConstants:
+    """
+    Balance constants of calculate_segment_time; the defaults are the live
+    values, so candidate balance changes can be raced without touching the
+    scalar engine
+    """
+
+    scrap_heaps_penalty: float = 150.0  # (100 - stability) / x on ScrapHeaps
+    wasteland_sand_penalty: float = 200.0  # (100 - powerCore) / x on sand
+    metal_roads_penalty: float = 160.0  # (100 - acceleration) / x on roads
+    angle_penalty: float = 3000.0  # angle * (100 - powerCore) / x uphill
+    momentum_loss: float = 0.15  # per unit of previous difficulty above 1
+    acceleration_recovery: float = 140.0  # acceleration / x of the loss
+    difficulty_penalty: float = 300.0  # (100 - stability) / x on hard segments
+
+
+LIVE_CONSTANTS = SegmentConstants()
+
+
+@dataclass
+class CompiledTrack:
+    """Per-segment arrays for one full race (all laps)"""
+
+    length: np.ndarray
+    angle: np.ndarray
+    terrain: np.ndarray  # TERRAIN_CODES, UNKNOWN_TERRAIN otherwise
+    difficulty: np.ndarray
+    previous_difficulty: np.ndarray
+    lap: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.length)
+
+
+def compile_track(
+    track: Union[TrackTemplate, Sequence[dict]], lap_length: Optional[int] = None
+) -> CompiledTrack:
+    """
+    Compile a TrackTemplate (all laps) or a flat segment list.
+
+    lap_length follows simulate_segments: a template uses its lap size, a
+    flat list defaults to a single lap.
+    """
+    if isinstance(track, TrackTemplate):
+        segments = track.all_segments()
+        lap_length = lap_length or len(track.segments)
+    else:
+        segments = list(track)
+        lap_length = lap_length or len(segments)
+
+    difficulty = np.array([s["difficulty"] for s in segments], dtype=np.float64)
+    previous = np.empty_like(difficulty)
+    previous[:1] = 1.0
+    previous[1:] = difficulty[:-1]
+    return CompiledTrack(
+        length=np.array([s["length"] for s in segments], dtype=np.float64),
+        angle=np.array([s["angle"] for s in segments], dtype=np.float64),
+        terrain=np.array(
+            [TERRAIN_CODES.get(s["terrain"], UNKNOWN_TERRAIN) for s in segments],
+            dtype=np.int64,
+        ),
+        difficulty=difficulty,
+        previous_difficulty=previous,
+        lap=np.arange(len(segments), dtype=np.int64) // max(lap_length, 1),
+    )
+
+
+def as_stats_matrix(stats: StatsLike) -> np.ndarray:
+    """(N x 4) stats from a matrix, a RacingStats/dict, or a list of either"""
+    if isinstance(stats, np.ndarray):
+        return stats.reshape(-1, len(STAT_NAMES))
+    if isinstance(stats, (RacingStats, dict)):
+        stats = [stats]
+    rows = []
+    for s in stats:
+        if isinstance(s, dict):
+            rows.append([s[name] for name in STAT_NAMES])
+        elif isinstance(s, RacingStats):
+            rows.append([getattr(s, name) for name in STAT_NAMES])
+        else:
+            return stats_matrix(stats)
+    return np.array(rows, dtype=np.int64).reshape(-1, len(STAT_NAMES))
+
+
+# ===== DETERMINISTIC SEGMENT FACTORS =====
+
+
+def momentum_terms(
+    track: CompiledTrack,
+    stats: StatsLike,
+    constants: SegmentConstants = LIVE_CONSTANTS,
+):
+    """(momentum_loss (S,), momentum_mod (N x S)) for the momentum system"""
+    s = as_stats_matrix(stats).astype(np.float64)
+    acceleration = s[:, 2:3]
+    prev = track.previous_difficulty
+    momentum_loss = np.where(prev > 1.0, (prev - 1.0) * constants.momentum_loss, 0.0)
+    acceleration_recovery = acceleration / constants.acceleration_recovery
+    momentum_mod = 1.0 + (momentum_loss * (1.0 - acceleration_recovery))
+    return momentum_loss, momentum_mod
+
+
+def segment_divisors(
+    track: CompiledTrack,
+    stats: StatsLike,
+    constants: SegmentConstants = LIVE_CONSTANTS,
+):
+    """
+    Seed-independent parts of calculate_segment_time.
+
+    Returns (base_speed (N x 1), divisor (N x S)) where
+    effective_speed = base_speed / divisor.
+    """
+    s = as_stats_matrix(stats).astype(np.float64)
+    speed, power_core = s[:, 0:1], s[:, 1:2]
+    acceleration, stability = s[:, 2:3], s[:, 3:4]
+
+    base_speed = np.sqrt(speed) * 7.5
+
+    terrain_mods = np.concatenate(
+        [
+            1.0 + ((100.0 - stability) / constants.scrap_heaps_penalty),
+            1.0 + ((100.0 - power_core) / constants.wasteland_sand_penalty),
+            1.0 + ((100.0 - acceleration) / constants.metal_roads_penalty),
+            np.ones_like(speed),
+        ],
+        axis=1,
+    )
+    terrain_mod = terrain_mods[:, track.terrain]
+
+    angle = track.angle
+    angle_mod = np.where(
+        angle > 0,
+        1.0 + (angle * (100.0 - power_core) / constants.angle_penalty),
+        1.0,
+    )
+
+    _, momentum_mod = momentum_terms(track, s, constants)
+
+    difficulty = track.difficulty
+    stability_factor = 1.0 + ((100.0 - stability) / constants.difficulty_penalty)
+    difficulty_mod = np.where(
+        difficulty > 1.0, difficulty * stability_factor, difficulty
+    )
+
+    divisor = terrain_mod * angle_mod * difficulty_mod * momentum_mod
+    return base_speed, divisor
+
+
+# ===== SEEDED EVALUATION =====
+
+
+def _seed_residues(track_seeds) -> np.ndarray:
+    # segment_seed % 1000 only depends on track_seed % 1000 (participant
+    # offsets are multiples of 1000), so arbitrarily large seeds reduce first
+    return np.array(
+        [int(seed) % 1000 for seed in np.ravel(track_seeds)], dtype=np.int64
+    )
+
+
+def _segment_times(track, base_speed, divisor, seeds, participant_index, performance):
+    n, num_segments = divisor.shape
+    if participant_index is None:
+        participant_index = np.arange(n, dtype=np.int64)
+    participant_index = np.broadcast_to(
+        np.asarray(participant_index, dtype=np.int64), (n,)
+    )
+
+    segment_index = np.arange(num_segments, dtype=np.int64)
+    seed_mod = (seeds[:, None] + segment_index) % 1000  # (K x S)
+    random_mod = RANDOM_MOD_TABLE[seed_mod]
+
+    effective_speed = base_speed / divisor  # (N x S)
+    segment_time = (track.length / effective_speed) * random_mod[:, None, :]
+    times = np.maximum(0.1, segment_time / 10.0)
+
+    if performance:
+        # (seed * 31337 + participant * 7919 + lap * 12345) % 1000, split
+        # into a per-(seed, segment) and a per-bot residue
+        seed_part = (seed_mod * 31337 + track.lap * 12345) % 1000
+        bot_part = (participant_index * 7919) % 1000
+        condition_seed = seed_part[:, None, :] + bot_part[None, :, None]
+        condition_seed[condition_seed >= 1000] -= 1000
+        times *= PERFORMANCE_TABLE[condition_seed]
+    return times
+
+
+def segment_time_tensor(
+    track: CompiledTrack,
+    stats: StatsLike,
+    track_seeds,
+    participant_index=None,
+    performance: bool = True,
+) -> np.ndarray:
+    """
+    Segment times for every (seed, bot, segment): (K x N x S).
+
+    With performance=False this is calculate_segment_time alone (no
+    per-segment performance variation), seeded with
+    track_seed + participant_index * 1000 + segment_index.
+    """
+    base_speed, divisor = segment_divisors(track, stats)
+    return _segment_times(
+        track,
+        base_speed,
+        divisor,
+        _seed_residues(track_seeds),
+        participant_index,
+        performance,
+    )
+
+
+def race_time_tensor(
+    track: CompiledTrack,
+    stats: StatsLike,
+    track_seeds,
+    participant_index=None,
+    factors=None,
+) -> np.ndarray:
+    """
+    Total race time for every (seed, bot): (K x N)
+
+    factors: optional precomputed (base_speed, divisor) for these stats,
+    as returned by segment_divisors() (or gathered from response tables).
+    """
+    base_speed, divisor = factors or segment_divisors(track, stats)
+    seeds = _seed_residues(track_seeds)
+    n = len(divisor)
+    out = np.empty((len(seeds), n), dtype=np.float64)
+    block = max(1, CHUNK_CELLS // max(n * max(len(track), 1), 1))
+    for start in range(0, len(seeds), block):
+        times = _segment_times(
+            track,
+            base_speed,
+            divisor,
+            seeds[start : start + block],
+            participant_index,
+            True,
+        )
+        total = np.zeros(times.shape[:2], dtype=np.float64)
+        for segment in range(times.shape[2]):
+            total += times[:, :, segment]
+        out[start : start + block] = total
+    return out
+
+
+def paired_race_times(
+    track: CompiledTrack,
+    stats: StatsLike,
+    track_seeds,
+    participant_index,
+    factors=None,
+) -> np.ndarray:
+    """
+    Total race time per bot where every row has its own track seed and
+    participant index (bots from many races on one track): (N,)
+
+    Same operation order as race_time_tensor, so each time matches that
+    bot's race evaluated on its own.
+    """
+    base_speed, divisor = factors or segment_divisors(track, stats)
+    seed_mod = (_seed_residues(track_seeds)[:, None] + np.arange(len(track))) % 1000
+    participant_index = np.asarray(participant_index, dtype=np.int64)
+
+    effective_speed = base_speed / divisor  # (N x S)
+    segment_time = (track.length / effective_speed) * RANDOM_MOD_TABLE[seed_mod]
+    times = np.maximum(0.1, segment_time / 10.0)
+    condition_seed = (seed_mod * 31337 + track.lap * 12345) % 1000
+    condition_seed += ((participant_index * 7919) % 1000)[:, None]
+    condition_seed[condition_seed >= 1000] -= 1000
+    times *= PERFORMANCE_TABLE[condition_seed]
+
+    total = np.zeros(len(times), dtype=np.float64)
+    for segment in range(times.shape[1]):
+        total += times[:, segment]
+    return total
+
+
+def segmented_race_time_matrix(
+    stats: StatsLike, races: RaceBatch, participant_index=None
+) -> np.ndarray:
+    """(R x N) race times for the "segmented" engine over a RaceBatch"""
+    if not isinstance(races, RaceBatch):
+        races = RaceBatch.from_configs(races)
+    stats = as_stats_matrix(stats)
+    if np.any(races.terrain == UNKNOWN_TERRAIN):
+        raise ValueError("segmented engine needs a known terrain for every race")
+
+    out = np.empty((len(races), len(stats)), dtype=np.float64)
+    track_ids = np.array(
+        [
+            select_track_for_race(TERRAINS[code], race_id)
+            for code, race_id in zip(races.terrain.tolist(), races.race_id.tolist())
+        ],
+        dtype=np.int64,
+    )
+    seeds = np.array(
+        [
+            abs(race_id * 7919 + start_time)
+            for race_id, start_time in zip(
+                races.race_id.tolist(), races.start_time.tolist()
+            )
+        ],
+        dtype=object,
+    )
+    for track_id in np.unique(track_ids):
+        rows = np.flatnonzero(track_ids == track_id)
+        track = compile_track(get_track(int(track_id)))
+        out[rows] = race_time_tensor(track, stats, seeds[rows], participant_index)
+    return out
+
+
+# ===== STAT SWEEPS =====
+
+
+def marginal_value_sweep(
+    tracks: Dict[str, Union[TrackTemplate, Sequence[dict]]],
+    base_stats: Sequence[StatsLike],
+    stats_to_test: Sequence[str] = STAT_NAMES,
+    delta: int = 10,
+    track_seed: int = 12345,
+    participant_index: int = 0,
+    cap: int = 100,
+) -> Dict[str, Dict[str, np.ndarray]]:
+    """
+    Race time with each base stat line, and with each tested stat raised by
+    delta (capped), on every track in one batched evaluation per track.
+
+    Returns {track_name: {"base_time": (B,), "improved_time": (B x T)}}
+    with T following stats_to_test.
+    """
+    base = np.concatenate([as_stats_matrix(b) for b in base_stats])
+    columns = [STAT_NAMES.index(name) for name in stats_to_test]
+
+    # Rows: each base line, then one bumped copy per tested stat
+    variants = [base]
+    for col in columns:
+        bumped = base.copy()
+        bumped[:, col] = np.minimum(cap, base[:, col] + delta)
+        variants.append(bumped)
+    field = np.concatenate(variants)
+
+    results = {}
+    for name, track in tracks.items():
+        compiled = track if isinstance(track, CompiledTrack) else compile_track(track)
+        times = race_time_tensor(compiled, field, [track_seed], participant_index)[0]
+        times = times.reshape(len(variants), len(base))
+        results[name] = {"base_time": times[0], "improved_time": times[1:].T}
+    return results
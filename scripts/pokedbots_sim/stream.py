@@ -0,0 +1,224 @@
+"""
+Streaming race aggregation.
+
+Races are produced as a generator of blocks (a RaceBatch chunk and its
+(races x bots) time matrix) and folded into fixed-size online
+accumulators, so memory does not grow with the number of races:
+
+    RunningStats     Welford mean / variance per column, mergeable
+    FieldAggregator  per-bot position sums and a histogram of the first
+                     places, wins by terrain and by distance, and running
+                     race-time statistics
+
+Position statistics come from exact per-bot integer sums of positions and
+squared positions, so they equal statistics.mean/stdev over the full
+position lists without keeping an N x N histogram.
+"""
+
+import math
+from fractions import Fraction
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .engine import DEFAULT_ENGINE, get_engine
+from .models import DISTANCES, TERRAINS, Bot, RaceConfig
+from .roster import BotRoster
+from .segmented_vectorized import segmented_race_time_matrix
+from .vectorized import (
+    CHUNK_CELLS,
+    FieldTables,
+    RaceBatch,
+    race_time_matrix,
+    standard_schedule,
+    stats_matrix,
+)
+
+# Finishing positions histogrammed per bot unless places= says otherwise
+DEFAULT_PLACES = 10
+
+Field = Union[Sequence[Bot], BotRoster]
+RaceBlock = Tuple[RaceBatch, np.ndarray]
+
+
+class RunningStats:
+    """Welford running mean / variance over rows, one accumulator per column"""
+
+    def __init__(self, size: int = 1):
+        self.count = 0
+        self.mean = np.zeros(size)
+        self.m2 = np.zeros(size)
+
+    def push(self, values) -> None:
+        """Add one observation per column"""
+        values = np.asarray(values, dtype=np.float64)
+        self.count += 1
+        delta = values - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (values - self.mean)
+
+    def push_block(self, block) -> None:
+        """Add a (rows x columns) block of observations"""
+        block = np.asarray(block, dtype=np.float64).reshape(-1, len(self.mean))
+        if len(block):
+            other = RunningStats(len(self.mean))
+            other.count = len(block)
+            other.mean = block.mean(axis=0)
+            other.m2 = ((block - other.mean) ** 2).sum(axis=0)
+            self.merge(other)
+
+    def merge(self, other: "RunningStats") -> "RunningStats":
+        """Combine with another accumulator (Chan et al.), in place"""
+        if other.count == 0:
+            return self
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean = self.mean + delta * (other.count / total)
+        self.m2 = self.m2 + other.m2 + delta**2 * (self.count * other.count / total)
+        self.count = total
+        return self
+
+    @property
+    def variance(self) -> np.ndarray:
+        """Sample variance (NaN below two observations)"""
+        if self.count < 2:
+            return np.full(len(self.mean), np.nan)
+        return self.m2 / (self.count - 1)
+
+    @property
+    def stdev(self) -> np.ndarray:
+        return np.sqrt(self.variance)
+
+
+class FieldAggregator:
+    """
+    Online per-bot outcome counts for a fixed field.
+
+    Columns follow the field order. position_counts[i, p - 1] counts the
+    races bot i finished in position p, for p up to `places` (default
+    DEFAULT_PLACES; pass len(field) for the full histogram, which is
+    N x N and so only sensible for small fields).
+    """
+
+    def __init__(self, field: Field, places: Optional[int] = None):
+        if isinstance(field, BotRoster):
+            self.token_ids = field.token_ids.astype(np.int64)
+        else:
+            self.token_ids = np.array([b.token_id for b in field], dtype=np.int64)
+        n = len(self.token_ids)
+        self.places = min(DEFAULT_PLACES if places is None else places, n)
+        self.num_races = 0
+        self.position_counts = np.zeros((n, self.places), dtype=np.int64)
+        self.position_sum = np.zeros(n, dtype=np.int64)
+        self.position_sq_sum = np.zeros(n, dtype=np.int64)
+        self.wins_by_terrain = np.zeros((len(TERRAINS) + 1, n), dtype=np.int64)
+        self.wins_by_distance: Dict[int, np.ndarray] = {}
+        self.times = RunningStats(n)
+        # Finishing order of the first race seen (field indices)
+        self.first_order: Optional[np.ndarray] = None
+        self._column = {int(t): i for i, t in enumerate(self.token_ids.tolist())}
+
+    def __len__(self) -> int:
+        return len(self.token_ids)
+
+    @property
+    def wins(self) -> np.ndarray:
+        return self.position_counts[:, 0]
+
+    def add_block(self, races: RaceBatch, times: np.ndarray) -> None:
+        """Fold in a (races x bots) time matrix; ties keep field order"""
+        n = len(self)
+        order = times.argsort(axis=1, kind="stable")
+        if self.first_order is None and len(order):
+            self.first_order = order[0].copy()
+
+        places = self.places
+        self.position_counts += np.bincount(
+            (order[:, :places] * places + np.arange(places)).ravel(),
+            minlength=n * places,
+        ).reshape(n, places)
+        positions = np.empty_like(order)
+        np.put_along_axis(positions, order, np.arange(1, n + 1)[None, :], axis=1)
+        self.position_sum += positions.sum(axis=0)
+        self.position_sq_sum += (positions * positions).sum(axis=0)
+        winners = order[:, 0]
+        np.add.at(self.wins_by_terrain, (races.terrain, winners), 1)
+        for distance in np.unique(races.distance).tolist():
+            counts = self.wins_by_distance.setdefault(
+                int(distance), np.zeros(n, dtype=np.int64)
+            )
+            counts += np.bincount(winners[races.distance == distance], minlength=n)
+        self.times.push_block(times)
+        self.num_races += len(races)
+
+    def add_results(self, race: RaceConfig, results: List[Tuple[Bot, float]]) -> None:
+        """Fold in one simulate_race() result list"""
+        times = np.empty((1, len(self)))
+        for bot, time in results:
+            times[0, self._column[bot.token_id]] = time
+        self.add_block(RaceBatch.from_configs([race]), times)
+
+    def consume(self, blocks: Iterable[RaceBlock]) -> "FieldAggregator":
+        """Fold in every (races, times) block of a generator"""
+        for races, times in blocks:
+            self.add_block(races, times)
+        return self
+
+    def terrain_wins(self, terrain: str) -> np.ndarray:
+        return self.wins_by_terrain[TERRAINS.index(terrain)]
+
+    def distance_wins(self, distance: int) -> np.ndarray:
+        return self.wins_by_distance.get(int(distance), np.zeros(len(self), np.int64))
+
+    def _position_sums(self, column: int) -> Tuple[int, int, int]:
+        return (
+            self.num_races,
+            int(self.position_sum[column]),
+            int(self.position_sq_sum[column]),
+        )
+
+    def mean_position(self, column: int) -> float:
+        n, s1, _ = self._position_sums(column)
+        return float(Fraction(s1, n))
+
+    def position_stdev(self, column: int) -> float:
+        """Sample standard deviation of the bot's finishing positions"""
+        n, s1, s2 = self._position_sums(column)
+        if n < 2:
+            raise ValueError("position_stdev requires at least two races")
+        return math.sqrt(Fraction(n * s2 - s1 * s1, n * (n - 1)))
+
+
+# ===== RACE GENERATORS =====
+
+
+def iter_schedule(
+    num_races: int,
+    terrains: Sequence[str] = TERRAINS,
+    distances: Sequence[int] = DISTANCES,
+    first_race_id: int = 0,
+    chunk: int = 4096,
+) -> Iterator[RaceBatch]:
+    """standard_schedule() in chunks of at most `chunk` races"""
+    end = first_race_id + num_races
+    for start in range(first_race_id, end, chunk):
+        yield standard_schedule(min(chunk, end - start), terrains, distances, start)
+
+
+def iter_race_blocks(
+    field: Field,
+    races: Iterable[RaceBatch],
+    engine: str = DEFAULT_ENGINE,
+) -> Iterator[RaceBlock]:
+    """Race times for each RaceBatch chunk, evaluated as it is consumed"""
+    get_engine(engine)
+    stats = stats_matrix(field)
+    tables = FieldTables(stats) if engine != "segmented" else None
+    block = max(1, CHUNK_CELLS // max(len(stats), 1))
+    for batch in races:
+        for start in range(0, len(batch), block):
+            part = batch.take(slice(start, start + block))
+            if engine == "segmented":
+                yield part, segmented_race_time_matrix(stats, part)
+            else:
+                yield part, race_time_matrix(tables, part, engine=engine)
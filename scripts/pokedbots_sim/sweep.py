@@ -0,0 +1,320 @@
+"""
+Parameter sweeps over the economy models.
+
+A sweep is a list of points, {parameter: value} dicts, evaluated by a
+named evaluator (EVALUATORS) in a process pool. Points come from grid()
+(every combination) or latin_hypercube() (stratified samples of ranges).
+
+Parameters address the model constants by dotted path:
+
+    recharge_cost                      EconomyConstants / ScavengingConstants
+    entry_fees.Elite                   one class of a per-class table
+    prize_distribution.0               one place of the prize split
+    zones.DeadMachineFields.parts_mult one zone / mission field
+    fleet.races_per_day                racing fleet knobs (FLEET_DEFAULTS)
+
+Each result is appended to a JSONL file as soon as its batch finishes,
+keyed by a hash of (evaluator, point). Re-running the same sweep skips
+points already in the file, so an interrupted sweep resumes where it
+stopped and a grown grid only computes the new points.
+"""
+
+import dataclasses
+import hashlib
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .economy import (
+    LIVE_ECONOMY,
+    LIVE_SCAVENGING,
+    MIXED_FLEET,
+    Fleets,
+    percentiles,
+    scavenging_income,
+    simulate_fleets,
+)
+
+# Points handed to a worker per task
+BATCH_POINTS = 8
+
+# Racing fleet knobs, overridable as fleet.<name>
+FLEET_DEFAULTS = {
+    "size": 5,
+    "races_per_day": 4,
+    "recharge_below": 50,
+    "repair_below": 50,
+    "replicates": 200,
+    "days": 7,
+    "seed": 0,
+}
+
+
+# ===== POINTS =====
+
+
+def grid(axes: Dict[str, Sequence]) -> List[dict]:
+    """Every combination of the axis values (last axis varies fastest)"""
+    names = list(axes)
+    return [
+        dict(zip(names, values))
+        for values in itertools.product(*(axes[name] for name in names))
+    ]
+
+
+def latin_hypercube(
+    ranges: Dict[str, Tuple[float, float]], samples: int, seed: int = 0
+) -> List[dict]:
+    """
+    `samples` points with each parameter's (low, high) range cut into
+    `samples` strata, every stratum used once per parameter
+    """
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for name, (low, high) in ranges.items():
+        u = (rng.permutation(samples) + rng.random(samples)) / samples
+        columns[name] = low + u * (high - low)
+    return [{name: float(columns[name][i]) for name in ranges} for i in range(samples)]
+
+
+def point_key(evaluator: str, point: dict) -> str:
+    """Stable id of an evaluated point (independent of key order)"""
+    payload = json.dumps([evaluator, point], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+# ===== OVERRIDES =====
+
+
+def _set_path(value, path: List[str], new):
+    """Copy of nested dict / tuple `value` with the item at `path` replaced"""
+    if not path:
+        return new
+    head, rest = path[0], path[1:]
+    if isinstance(value, dict):
+        if head not in value:
+            raise ValueError(
+                f"Unknown key '{head}' (expected one of: {', '.join(value)})"
+            )
+        return {**value, head: _set_path(value[head], rest, new)}
+    if isinstance(value, (tuple, list)):
+        items = list(value)
+        items[int(head)] = _set_path(items[int(head)], rest, new)
+        return type(value)(items)
+    raise ValueError(f"Cannot index {type(value).__name__} with '{head}'")
+
+
+def with_overrides(constants, point: dict, skip: Iterable[str] = ()):
+    """
+    A copy of a constants dataclass with the point's dotted parameters
+    applied; parameters starting with one of `skip` are left out
+    """
+    fields = {f.name for f in dataclasses.fields(constants)}
+    changes = {}
+    for name, value in point.items():
+        if any(name.startswith(prefix) for prefix in skip):
+            continue
+        head, *rest = name.split(".")
+        if head not in fields:
+            raise ValueError(
+                f"Unknown parameter '{name}' (expected one of: "
+                f"{', '.join(sorted(fields))})"
+            )
+        current = changes.get(head, getattr(constants, head))
+        changes[head] = _set_path(current, rest, value)
+    return dataclasses.replace(constants, **changes)
+
+
+# ===== EVALUATORS =====
+
+
+def _fleet_params(point: dict) -> dict:
+    params = dict(FLEET_DEFAULTS)
+    for name, value in point.items():
+        if name.startswith("fleet."):
+            key = name[len("fleet.") :]
+            if key not in params:
+                raise ValueError(
+                    f"Unknown parameter '{name}' (expected one of: "
+                    f"{', '.join('fleet.' + k for k in FLEET_DEFAULTS)})"
+                )
+            params[key] = value
+    return params
+
+
+def evaluate_racing(point: dict) -> dict:
+    """Weekly profit / ROI distribution of MIXED_FLEET racing (simulate_fleets)"""
+    constants = with_overrides(LIVE_ECONOMY, point, skip=("fleet.",))
+    params = _fleet_params(point)
+    size, replicates = int(params["size"]), int(params["replicates"])
+    rows = np.arange(size) % len(MIXED_FLEET)
+    stats = np.array([MIXED_FLEET[i][0] for i in rows], dtype=np.float64)
+    wins = np.array([MIXED_FLEET[i][1] for i in rows], dtype=np.int64)
+    fleets = Fleets(
+        fleet=np.repeat(np.arange(replicates), size),
+        stats=np.tile(stats, (replicates, 1)),
+        wins=np.tile(wins, replicates),
+        races_per_day=np.full(size * replicates, int(params["races_per_day"])),
+        recharge_below=np.full(replicates, float(params["recharge_below"])),
+        repair_below=np.full(replicates, float(params["repair_below"])),
+    )
+    results = simulate_fleets(
+        fleets, int(params["days"]), constants, seed=int(params["seed"])
+    )
+    p5, p50, p95 = percentiles(results.net_profit)
+    races = results.fleets["races"]
+    return {
+        "net_profit_p5": float(p5),
+        "net_profit_p50": float(p50),
+        "net_profit_p95": float(p95),
+        "net_per_bot_p50": float(p50) / size,
+        "roi_p50": float(np.median(results.roi_percentage)),
+        "losing_share": float((results.net_profit < 0).mean()),
+        "maintenance_per_race": float(
+            results.maintenance_cost.sum() / max(1.0, races.sum())
+        ),
+        "races": float(races.mean()),
+    }
+
+
+def evaluate_scavenging(point: dict) -> dict:
+    """Weekly net per bot of each mission x zone (scavenging_income)"""
+    constants = with_overrides(LIVE_SCAVENGING, point)
+    income = scavenging_income(constants)
+    metrics = {f"{m}.{z}.net": row["net"] for (m, z), row in income.items()}
+    metrics["best_net"] = max(row["net"] for row in income.values())
+    return metrics
+
+
+def evaluate_balance(point: dict) -> dict:
+    """
+    Scavenging net per bot against the racing fleet's median net per bot
+    (balance-scavenging-vs-racing.py). Racing parameters are the
+    EconomyConstants ones and fleet.*; scavenging ones carry a
+    "scavenging." prefix.
+    """
+    prefix = "scavenging."
+    racing = evaluate_racing(
+        {k: v for k, v in point.items() if not k.startswith(prefix)}
+    )
+    scavenging = evaluate_scavenging(
+        {k[len(prefix) :]: v for k, v in point.items() if k.startswith(prefix)}
+    )
+    per_bot = racing["net_per_bot_p50"]
+    metrics = {f"racing.{k}": v for k, v in racing.items()}
+    for name, net in scavenging.items():
+        metrics[f"scavenging.{name}"] = net
+        if name.endswith(".net"):
+            ratio = net / per_bot if per_bot > 0 else float("inf")
+            metrics[f"ratio.{name[: -len('.net')]}"] = ratio
+    return metrics
+
+
+EVALUATORS: Dict[str, Callable[[dict], dict]] = {
+    "racing": evaluate_racing,
+    "scavenging": evaluate_scavenging,
+    "balance": evaluate_balance,
+}
+
+
+def get_evaluator(name: str) -> Callable[[dict], dict]:
+    try:
+        return EVALUATORS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown evaluator '{name}' (expected one of: {', '.join(EVALUATORS)})"
+        ) from None
+
+
+# ===== RUNNER =====
+
+
+def load_results(path: str) -> Dict[str, dict]:
+    """Rows of a results file by key; a torn last line is ignored"""
+    rows = {}
+    try:
+        with open(path) as f:
+            for line in f:
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                rows[row["key"]] = row
+    except FileNotFoundError:
+        pass
+    return rows
+
+
+def _evaluate_batch(task) -> List[dict]:
+    evaluator, batch = task
+    evaluate = get_evaluator(evaluator)
+    return [
+        {
+            "key": key,
+            "evaluator": evaluator,
+            "params": point,
+            "metrics": evaluate(point),
+        }
+        for key, point in batch
+    ]
+
+
+def run_sweep(
+    evaluator: str,
+    points: Sequence[dict],
+    path: str,
+    workers: Optional[int] = None,
+    batch_points: int = BATCH_POINTS,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> List[dict]:
+    """
+    Evaluate every point not already in `path`, appending results as they
+    arrive, and return the rows of all `points` in order.
+
+    Args:
+        workers: worker processes (default: all cores; 1 runs in-process)
+        progress: called with (computed, to compute) after each batch
+    """
+    get_evaluator(evaluator)
+    keyed = [(point_key(evaluator, point), point) for point in points]
+    done = load_results(path)
+    pending = list({key: point for key, point in keyed if key not in done}.items())
+    tasks = [
+        (evaluator, pending[i : i + batch_points])
+        for i in range(0, len(pending), batch_points)
+    ]
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "a+") as out:
+        # Start on a fresh line after a torn write
+        if out.tell() > 0:
+            out.seek(out.tell() - 1)
+            if out.read(1) != "\n":
+                out.write("\n")
+        computed = 0
+
+        def record(rows):
+            nonlocal computed
+            for row in rows:
+                out.write(json.dumps(row) + "\n")
+                done[row["key"]] = row
+            out.flush()
+            computed += len(rows)
+            if progress is not None:
+                progress(computed, len(pending))
+
+        workers = workers or os.cpu_count() or 1
+        if workers == 1 or len(tasks) <= 1:
+            for task in tasks:
+                record(_evaluate_batch(task))
+        else:
+            with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+                for future in as_completed(
+                    [pool.submit(_evaluate_batch, task) for task in tasks]
+                ):
+                    record(future.result())
+    return [done[key] for key, _ in keyed]
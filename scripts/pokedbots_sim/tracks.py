@@ -0,0 +1,291 @@
+"""
+Track library (Python copy of the templates in RacingSimulator.mo).
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+
+@dataclass
+class TrackTemplate:
+    track_id: int
+    name: str
+    description: str
+    total_distance: int  # meters
+    primary_terrain: str
+    laps: int  # 1 for point-to-point, 2+ for circuits
+    segments: List[dict]  # One lap's worth of segments
+
+    def all_segments(self) -> List[dict]:
+        """Full segment list (segments x laps)"""
+        return self.segments * self.laps
+
+
+def _segment(length: int, angle: int, terrain: str, difficulty: float) -> dict:
+    return {
+        "length": length,
+        "angle": angle,
+        "terrain": terrain,
+        "difficulty": difficulty,
+    }
+
+
+SCRAP_MOUNTAIN_CIRCUIT = TrackTemplate(
+    track_id=1,
+    name="Scrap Mountain Circuit",
+    description="Technical climb through unstable debris",
+    total_distance=10100,
+    primary_terrain="ScrapHeaps",
+    laps=2,
+    segments=[
+        _segment(500, 5, "ScrapHeaps", 1.0),
+        _segment(400, 12, "ScrapHeaps", 1.1),
+        _segment(300, 18, "ScrapHeaps", 1.15),
+        _segment(350, -8, "ScrapHeaps", 1.05),
+        _segment(250, 0, "ScrapHeaps", 1.2),
+        _segment(400, 15, "ScrapHeaps", 1.12),
+        _segment(300, -5, "ScrapHeaps", 1.08),
+        _segment(200, 0, "ScrapHeaps", 1.15),
+        _segment(350, 8, "ScrapHeaps", 1.1),
+        _segment(450, 22, "ScrapHeaps", 1.25),
+        _segment(500, -12, "ScrapHeaps", 1.0),
+        _segment(400, -18, "ScrapHeaps", 0.95),
+        _segment(350, -15, "ScrapHeaps", 1.0),
+        _segment(300, -7, "ScrapHeaps", 1.1),
+        _segment(250, -15, "ScrapHeaps", 1.05),
+    ],
+)
+
+HIGHWAY_OF_THE_DEAD = TrackTemplate(
+    track_id=2,
+    name="Highway of the Dead",
+    description="Rusted highways with occasional debris obstacles",
+    total_distance=6700,
+    primary_terrain="MetalRoads",
+    laps=1,
+    segments=[
+        _segment(800, 0, "MetalRoads", 0.85),
+        _segment(700, 0, "MetalRoads", 0.9),
+        _segment(600, -3, "MetalRoads", 0.82),
+        _segment(500, -5, "MetalRoads", 0.8),
+        _segment(400, 3, "ScrapHeaps", 1.15),
+        _segment(500, 5, "ScrapHeaps", 1.2),
+        _segment(600, 0, "MetalRoads", 0.88),
+        _segment(700, 0, "MetalRoads", 0.9),
+        _segment(500, 0, "MetalRoads", 0.92),
+        _segment(450, 0, "MetalRoads", 0.95),
+        _segment(550, 0, "MetalRoads", 0.85),
+        _segment(400, 0, "MetalRoads", 0.9),
+    ],
+)
+
+WASTELAND_GAUNTLET = TrackTemplate(
+    track_id=3,
+    name="Wasteland Gauntlet",
+    description="Endurance test through deep sand",
+    total_distance=13300,
+    primary_terrain="WastelandSand",
+    laps=1,
+    segments=[
+        _segment(1000, 0, "WastelandSand", 1.1),
+        _segment(800, 3, "WastelandSand", 1.15),
+        _segment(700, 8, "WastelandSand", 1.22),
+        _segment(900, 12, "WastelandSand", 1.25),
+        _segment(600, -5, "WastelandSand", 1.12),
+        _segment(800, 0, "WastelandSand", 1.18),
+        _segment(700, 0, "WastelandSand", 1.15),
+        _segment(650, -4, "WastelandSand", 1.08),
+        _segment(750, -8, "WastelandSand", 1.05),
+        _segment(900, 0, "WastelandSand", 1.2),
+        _segment(800, 5, "WastelandSand", 1.22),
+        _segment(700, 8, "WastelandSand", 1.25),
+        _segment(600, -10, "WastelandSand", 1.1),
+        _segment(500, -5, "WastelandSand", 1.08),
+        _segment(900, 0, "WastelandSand", 1.12),
+        _segment(700, 0, "WastelandSand", 1.1),
+        _segment(600, -4, "WastelandSand", 1.05),
+    ],
+)
+
+JUNKYARD_SPRINT = TrackTemplate(
+    track_id=4,
+    name="Junkyard Sprint",
+    description="Short aggressive circuit",
+    total_distance=4050,
+    primary_terrain="ScrapHeaps",
+    laps=3,
+    segments=[
+        _segment(200, 0, "ScrapHeaps", 1.05),
+        _segment(150, 5, "ScrapHeaps", 1.1),
+        _segment(180, 8, "ScrapHeaps", 1.15),
+        _segment(160, 12, "ScrapHeaps", 1.2),
+        _segment(140, -6, "ScrapHeaps", 1.12),
+        _segment(170, -10, "ScrapHeaps", 1.08),
+        _segment(150, -5, "ScrapHeaps", 1.1),
+        _segment(180, 0, "ScrapHeaps", 1.15),
+        _segment(160, -4, "ScrapHeaps", 1.05),
+    ],
+)
+
+METAL_MESA_LOOP = TrackTemplate(
+    track_id=5,
+    name="Metal Mesa Loop",
+    description="Mixed terrain balanced circuit",
+    total_distance=7400,
+    primary_terrain="MetalRoads",
+    laps=2,
+    segments=[
+        _segment(400, 0, "MetalRoads", 0.92),
+        _segment(350, 0, "MetalRoads", 0.95),
+        _segment(300, 3, "MetalRoads", 0.98),
+        _segment(250, 8, "ScrapHeaps", 1.12),
+        _segment(300, 12, "ScrapHeaps", 1.18),
+        _segment(250, 15, "ScrapHeaps", 1.22),
+        _segment(300, -8, "MetalRoads", 0.88),
+        _segment(350, -10, "MetalRoads", 0.85),
+        _segment(400, -5, "WastelandSand", 1.08),
+        _segment(350, 0, "WastelandSand", 1.12),
+        _segment(300, 0, "WastelandSand", 1.1),
+        _segment(250, -15, "WastelandSand", 1.05),
+    ],
+)
+
+DUNE_RUNNER = TrackTemplate(
+    track_id=6,
+    name="Dune Runner",
+    description="Brutal marathon through endless dunes - pure power core test",
+    total_distance=16600,
+    primary_terrain="WastelandSand",
+    laps=1,
+    segments=[
+        _segment(1200, 5, "WastelandSand", 1.18),
+        _segment(1100, 8, "WastelandSand", 1.22),
+        _segment(1000, 12, "WastelandSand", 1.28),
+        _segment(1300, 15, "WastelandSand", 1.32),
+        _segment(1200, 10, "WastelandSand", 1.25),
+        _segment(1100, 0, "WastelandSand", 1.2),
+        _segment(1000, -8, "WastelandSand", 1.15),
+        _segment(900, -12, "WastelandSand", 1.1),
+        _segment(1200, 0, "WastelandSand", 1.22),
+        _segment(1100, 6, "WastelandSand", 1.25),
+        _segment(1000, 10, "WastelandSand", 1.28),
+        _segment(900, 8, "WastelandSand", 1.2),
+        _segment(1300, 0, "WastelandSand", 1.18),
+        _segment(1200, -15, "WastelandSand", 1.12),
+        _segment(1000, -39, "WastelandSand", 1.08),
+    ],
+)
+
+RUST_BELT_RALLY = TrackTemplate(
+    track_id=7,
+    name="Rust Belt Rally",
+    description="High-speed highway blast - acceleration and top speed critical",
+    total_distance=9200,
+    primary_terrain="MetalRoads",
+    laps=1,
+    segments=[
+        _segment(900, 0, "MetalRoads", 0.82),
+        _segment(850, -2, "MetalRoads", 0.78),
+        _segment(800, 0, "MetalRoads", 0.8),
+        _segment(750, 0, "MetalRoads", 0.85),
+        _segment(700, -4, "MetalRoads", 0.76),
+        _segment(650, 0, "MetalRoads", 0.88),
+        _segment(600, 0, "MetalRoads", 0.9),
+        _segment(550, 0, "MetalRoads", 0.85),
+        _segment(900, 0, "MetalRoads", 0.82),
+        _segment(850, 3, "MetalRoads", 0.8),
+        _segment(800, 0, "MetalRoads", 0.78),
+        _segment(850, 3, "MetalRoads", 0.83),
+    ],
+)
+
+DEBRIS_FIELD_DASH = TrackTemplate(
+    track_id=8,
+    name="Debris Field Dash",
+    description="Treacherous obstacle course favoring stability masters",
+    total_distance=7100,
+    primary_terrain="ScrapHeaps",
+    laps=2,
+    segments=[
+        _segment(300, 8, "ScrapHeaps", 1.22),
+        _segment(350, 12, "ScrapHeaps", 1.28),
+        _segment(280, 18, "ScrapHeaps", 1.35),
+        _segment(320, -10, "ScrapHeaps", 1.18),
+        _segment(400, 0, "ScrapHeaps", 1.25),
+        _segment(350, 15, "ScrapHeaps", 1.3),
+        _segment(300, 20, "ScrapHeaps", 1.38),
+        _segment(280, -15, "ScrapHeaps", 1.2),
+        _segment(320, -8, "ScrapHeaps", 1.15),
+        _segment(350, 0, "ScrapHeaps", 1.28),
+        _segment(300, -40, "ScrapHeaps", 1.25),
+    ],
+)
+
+VELOCITY_VIADUCT = TrackTemplate(
+    track_id=9,
+    name="Velocity Viaduct",
+    description="Lightning-fast elevated highway section - pure acceleration",
+    total_distance=4500,
+    primary_terrain="MetalRoads",
+    laps=3,
+    segments=[
+        _segment(300, 0, "MetalRoads", 0.8),
+        _segment(250, 0, "MetalRoads", 0.78),
+        _segment(280, -5, "MetalRoads", 0.75),
+        _segment(220, -8, "MetalRoads", 0.72),
+        _segment(200, 5, "MetalRoads", 0.85),
+        _segment(250, 8, "MetalRoads", 0.82),
+    ],
+)
+
+SANDSTORM_CIRCUIT = TrackTemplate(
+    track_id=10,
+    name="Sandstorm Circuit",
+    description="Circular desert track with varying dune intensities",
+    total_distance=10800,
+    primary_terrain="WastelandSand",
+    laps=2,
+    segments=[
+        _segment(600, 0, "WastelandSand", 1.15),
+        _segment(550, 5, "WastelandSand", 1.2),
+        _segment(500, 10, "WastelandSand", 1.25),
+        _segment(450, 12, "WastelandSand", 1.28),
+        _segment(500, 8, "WastelandSand", 1.22),
+        _segment(550, 0, "WastelandSand", 1.18),
+        _segment(600, -6, "WastelandSand", 1.12),
+        _segment(550, -10, "WastelandSand", 1.08),
+        _segment(500, -8, "WastelandSand", 1.1),
+        _segment(600, -11, "WastelandSand", 1.15),
+    ],
+)
+
+TRACKS: Dict[int, TrackTemplate] = {
+    1: SCRAP_MOUNTAIN_CIRCUIT,
+    2: HIGHWAY_OF_THE_DEAD,
+    3: WASTELAND_GAUNTLET,
+    4: JUNKYARD_SPRINT,
+    5: METAL_MESA_LOOP,
+    6: DUNE_RUNNER,
+    7: RUST_BELT_RALLY,
+    8: DEBRIS_FIELD_DASH,
+    9: VELOCITY_VIADUCT,
+    10: SANDSTORM_CIRCUIT,
+}
+
+# Track pools per terrain, as in RaceManager.selectTrackForRace
+TRACKS_BY_TERRAIN = {
+    "ScrapHeaps": [1, 4, 8],
+    "MetalRoads": [2, 5, 7, 9],
+    "WastelandSand": [3, 6, 10],
+}
+
+
+def get_track(track_id: int) -> Optional[TrackTemplate]:
+    """Get track template by ID"""
+    return TRACKS.get(track_id)
+
+
+def select_track_for_race(terrain: str, race_id: int) -> int:
+    """Select a track for the race terrain using race_id for variety"""
+    matches = TRACKS_BY_TERRAIN[terrain]
+    return matches[race_id % len(matches)]
@@ -0,0 +1,92 @@
+"""
+Categorical trait table for the NFT metadata (stats.json / pokedbots_stats.jsonl).
+"""
+
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+MISSING = -1
+
+
+class TraitTable:
+    """
+    One row per bot: ids plus an int16 code column per trait.
+
+    values[name][code] is the decoded trait value; MISSING marks a bot
+    without that trait.
+    """
+
+    def __init__(
+        self,
+        ids: np.ndarray,
+        names: List[str],
+        codes: Dict[str, np.ndarray],
+        values: Dict[str, list],
+    ):
+        self.ids = ids
+        self.names = names
+        self.codes = codes
+        self.values = values
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict], id_key: str = "id") -> "TraitTable":
+        """Build from decoded dicts (one per bot), e.g. jsonl lines"""
+        rows = list(rows)
+        names: List[str] = []
+        lookup: Dict[str, Dict] = {}
+        for row in rows:
+            for key in row:
+                if key != id_key and key not in lookup:
+                    names.append(key)
+                    lookup[key] = {}
+
+        codes = {name: np.full(len(rows), MISSING, dtype=np.int16) for name in names}
+        for i, row in enumerate(rows):
+            for key, value in row.items():
+                if key == id_key:
+                    continue
+                table = lookup[key]
+                code = table.get(value)
+                if code is None:
+                    code = table[value] = len(table)
+                codes[key][i] = code
+
+        ids = np.array([row[id_key] for row in rows], dtype=np.int32)
+        values = {name: list(lookup[name]) for name in names}
+        return cls(ids, names, codes, values)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def decode(self, name: str, row: int):
+        code = int(self.codes[name][row])
+        return None if code == MISSING else self.values[name][code]
+
+    def value_counts(self, name: str) -> Counter:
+        """Counter of decoded values for one trait"""
+        codes = self.codes[name]
+        counts = np.bincount(codes[codes != MISSING], minlength=len(self.values[name]))
+        return Counter(
+            {value: int(n) for value, n in zip(self.values[name], counts) if n}
+        )
+
+    def records(
+        self, key: Optional[Callable[[str], str]] = None, id_key: str = "id"
+    ) -> List[Dict]:
+        """Decode back into one dict per bot (trait names mapped through key)"""
+        keys = [key(name) if key else name for name in self.names]
+        columns = [
+            (k, self.codes[name].tolist(), self.values[name])
+            for k, name in zip(keys, self.names)
+        ]
+        records = []
+        for i, bot_id in enumerate(self.ids.tolist()):
+            record = {id_key: bot_id}
+            for k, codes, values in columns:
+                code = codes[i]
+                if code != MISSING:
+                    record[k] = values[code]
+            records.append(record)
+        return records
@@ -0,0 +1,209 @@
+"""
+Exact distribution of the attempts, ICP and hours an upgrade run takes.
+
+calculate-upgrade-expectations.py samples upgrade runs one random.random()
+at a time. The run is a Markov chain over (successes, consecutive_fails):
+each attempt succeeds with success_rate(successes, consecutive_fails)
+percent, a success moves to the next stat point and resets the pity
+counter, a failure refunds part of the attempt's cost and bumps the
+counter. The chain restarts at zero fails after every success, so the
+fails spent on success s are independent of the others.
+
+upgrade_distribution() walks the consecutive_fails chain of each success
+to its probability of taking exactly k fails (until less than `tail` of
+the mass is left), then convolves the successes together:
+
+    attempts = target_successes + sum_s fails_s          exact
+    cost     = sum_s cost_s * (1 + (1 - refund) * fails_s)
+
+Cost is carried on a grid of cost_step ICP; each atom is split between
+its two neighbouring grid points so the mean stays exact. Quantile
+queries on the result are a binary search of a precomputed CDF.
+
+The rules themselves (success_rate, upgrade_cost) are passed in, so the
+script that defines them stays their only copy.
+"""
+
+from dataclasses import dataclass
+from typing import Callable, Dict, Sequence
+
+import numpy as np
+
+# Fail count after which a success that never comes is treated as unreachable
+MAX_FAILS = 100_000
+
+_DISTRIBUTIONS: Dict[tuple, "UpgradeDistribution"] = {}
+
+
+@dataclass
+class UpgradeDistribution:
+    """
+    Distribution of one upgrade run. attempts_pmf[n] is P(run takes n
+    attempts); cost_pmf[i] is P(run costs base_cost + i * cost_step ICP).
+    Mass beyond `tail` per success is dropped (`truncated` in total).
+    """
+
+    target_successes: int
+    starting_stat: int
+    attempts_pmf: np.ndarray
+    cost_pmf: np.ndarray
+    base_cost: float
+    cost_step: float
+    hours_per_attempt: float
+    stage_attempts: np.ndarray  # expected attempts per success
+    stage_cost: np.ndarray  # expected ICP per success
+    truncated: float
+
+    def __post_init__(self):
+        self._attempts_cdf = np.cumsum(self.attempts_pmf)
+        self._cost_cdf = np.cumsum(self.cost_pmf)
+
+    @property
+    def final_stat(self) -> int:
+        return self.starting_stat + self.target_successes
+
+    @property
+    def mean_attempts(self) -> float:
+        return float(self.stage_attempts.sum())
+
+    @property
+    def mean_cost(self) -> float:
+        return float(self.stage_cost.sum())
+
+    @property
+    def mean_hours(self) -> float:
+        return self.mean_attempts * self.hours_per_attempt
+
+    def attempts_quantile(self, q: float) -> float:
+        """Fewest attempts that finish with probability >= q (inf past the tail)"""
+        i = int(np.searchsorted(self._attempts_cdf, q - 1e-12))
+        return float(i) if i < len(self._attempts_cdf) else float("inf")
+
+    def hours_quantile(self, q: float) -> float:
+        return self.attempts_quantile(q) * self.hours_per_attempt
+
+    def cost_quantile(self, q: float) -> float:
+        """Lowest ICP (to cost_step) that finishes with probability >= q"""
+        i = int(np.searchsorted(self._cost_cdf, q - 1e-12))
+        if i >= len(self._cost_cdf):
+            return float("inf")
+        return self.base_cost + i * self.cost_step
+
+    def percentiles(self, qs: Sequence[float] = (0.5, 0.9, 0.99)) -> Dict[str, list]:
+        """attempts / cost / hours at each quantile of `qs`"""
+        return {
+            "attempts": [self.attempts_quantile(q) for q in qs],
+            "cost": [self.cost_quantile(q) for q in qs],
+            "hours": [self.hours_quantile(q) for q in qs],
+        }
+
+
+def fail_distribution(
+    success_rate: Callable[[int, int], float], successes: int, tail: float = 1e-12
+) -> np.ndarray:
+    """
+    pmf[k] = P(success number `successes` + 1 comes after exactly k fails),
+    walking consecutive_fails from 0 until less than `tail` mass is left
+    """
+    pmf = []
+    survival = 1.0
+    while survival >= tail:
+        if len(pmf) > MAX_FAILS:
+            raise ValueError(
+                f"Success {successes + 1} is unreachable: "
+                f"{survival:.3g} mass left after {MAX_FAILS} fails"
+            )
+        p = min(max(success_rate(successes, len(pmf)) / 100.0, 0.0), 1.0)
+        pmf.append(survival * p)
+        survival *= 1.0 - p
+    return np.array(pmf)
+
+
+def _convolve_sparse(dense: np.ndarray, index: np.ndarray, weight: np.ndarray):
+    """dense convolved with the sparse pmf {index[j]: weight[j]}"""
+    out = np.zeros(len(dense) + int(index.max()))
+    for i, w in zip(index.tolist(), weight.tolist()):
+        out[i : i + len(dense)] += w * dense
+    return out
+
+
+def upgrade_distribution(
+    success_rate: Callable[[int, int], float],
+    upgrade_cost: Callable[[float], float],
+    target_successes: int = 9,
+    starting_stat: int = 40,
+    refund: float = 0.5,
+    hours_per_attempt: float = 12.0,
+    cost_step: float = 0.001,
+    tail: float = 1e-12,
+) -> UpgradeDistribution:
+    """
+    Exact distribution of a run of `target_successes` upgrades of one stat.
+
+    Args:
+        success_rate: (successes so far, consecutive fails) -> percent
+        upgrade_cost: current stat -> ICP per attempt
+        refund: share of the cost returned on a failed attempt
+        cost_step: ICP resolution of the cost distribution
+        tail: probability mass per success left out of the walk
+
+    Results are memoized per argument tuple.
+    """
+    key = (
+        success_rate,
+        upgrade_cost,
+        target_successes,
+        starting_stat,
+        refund,
+        hours_per_attempt,
+        cost_step,
+        tail,
+    )
+    cached = _DISTRIBUTIONS.get(key)
+    if cached is not None:
+        return cached
+
+    attempts_pmf = np.zeros(target_successes + 1)
+    attempts_pmf[target_successes] = 1.0
+    cost_pmf = np.ones(1)
+    base_cost = 0.0
+    stage_attempts = np.zeros(target_successes)
+    stage_cost = np.zeros(target_successes)
+    truncated = 0.0
+
+    for s in range(target_successes):
+        fails = fail_distribution(success_rate, s, tail)
+        k = np.arange(len(fails))
+        mass = fails.sum()
+        truncated += 1.0 - mass
+        cost = upgrade_cost(starting_stat + s)
+        fail_cost = cost * (1.0 - refund)
+        stage_attempts[s] = (fails * (k + 1)).sum() / mass
+        stage_cost[s] = cost + fail_cost * (fails * k).sum() / mass
+        base_cost += cost
+
+        attempts_pmf = np.convolve(attempts_pmf, fails)
+
+        # Fail costs on the grid, each split between its two neighbours
+        position = k * fail_cost / cost_step
+        low = np.floor(position).astype(np.int64)
+        high_share = position - low
+        index = np.concatenate([low, low + 1])
+        weight = np.concatenate([fails * (1.0 - high_share), fails * high_share])
+        keep = weight > 0
+        cost_pmf = _convolve_sparse(cost_pmf, index[keep], weight[keep])
+
+    result = UpgradeDistribution(
+        target_successes=target_successes,
+        starting_stat=starting_stat,
+        attempts_pmf=attempts_pmf,
+        cost_pmf=cost_pmf,
+        base_cost=base_cost,
+        cost_step=cost_step,
+        hours_per_attempt=hours_per_attempt,
+        stage_attempts=stage_attempts,
+        stage_cost=stage_cost,
+        truncated=truncated,
+    )
+    _DISTRIBUTIONS[key] = result
+    return result
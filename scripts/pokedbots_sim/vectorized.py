@@ -0,0 +1,315 @@
+"""
+Vectorized race-time engine.
+
+Evaluates calculate_race_time for a whole field over a whole schedule in one
+call: a stats matrix (N bots x 4) and a batch of race configs produce a
+(races x bots) time matrix. Every floating-point operation is applied in the
+same order as the scalar ports in engine.py, so results are bit-identical.
+Supports the legacy-v1 and hashed-v2 engines.
+"""
+
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+
+from .engine import DEFAULT_ENGINE
+from .models import DISTANCES, TERRAINS, Bot, RaceConfig
+from .roster import BotRoster
+
+# Terrain name -> row in the terrain modifier table. Unknown terrains map to
+# the extra row of ones, matching the scalar engine's fallback branch.
+TERRAIN_CODES = {name: code for code, name in enumerate(TERRAINS)}
+UNKNOWN_TERRAIN = len(TERRAINS)
+
+# Distance classes (<10km sprint, 10-20km medium, >20km long trek)
+SHORT, MEDIUM, LONG = 0, 1, 2
+
+HOUR_NS = 3_600_000_000_000
+
+# Seed mixing constants from RacingSimulator.calculateRaceTime
+SEED_MULTIPLIER = 2654435761
+SEED_MODULUS = 1000000
+
+# Uniform seed terms indexed by their 0-999 hash value
+SEED_VALUES = np.arange(1000, dtype=np.float64)
+RACE_CHAOS_TABLE = 0.85 + (SEED_VALUES / 3333.0)
+BOT_RANDOM_TABLE = 0.80 + (SEED_VALUES / 2500.0)
+POSITION_BONUS_TABLE = 0.90 + (SEED_VALUES / 5000.0)
+
+# The same terms indexed directly by the mixed seed (0..999999). Built on
+# first use; three gathers are cheaper than six integer divisions per cell.
+_SEED_TERM_TABLES = None
+
+# Target number of cells per chunk; keeps temporaries in cache
+CHUNK_CELLS = 1 << 18
+
+
+@dataclass
+class RaceBatch:
+    """Column-oriented batch of race configs"""
+
+    race_id: np.ndarray
+    distance: np.ndarray
+    terrain: np.ndarray  # terrain codes, see TERRAIN_CODES
+    start_time: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.race_id)
+
+    @classmethod
+    def from_configs(cls, races: Iterable[RaceConfig]) -> "RaceBatch":
+        races = list(races)
+        return cls(
+            race_id=np.array([r.race_id for r in races], dtype=np.int64),
+            distance=np.array([r.distance for r in races], dtype=np.int64),
+            terrain=np.array(
+                [TERRAIN_CODES.get(r.terrain, UNKNOWN_TERRAIN) for r in races],
+                dtype=np.int64,
+            ),
+            start_time=np.array([r.start_time for r in races], dtype=np.int64),
+        )
+
+    def config(self, index: int) -> RaceConfig:
+        """Materialize a single race back into a RaceConfig"""
+        code = int(self.terrain[index])
+        return RaceConfig(
+            race_id=int(self.race_id[index]),
+            distance=int(self.distance[index]),
+            terrain=TERRAINS[code] if code < len(TERRAINS) else "",
+            start_time=int(self.start_time[index]),
+        )
+
+    def configs(self) -> List[RaceConfig]:
+        return [self.config(i) for i in range(len(self))]
+
+    def take(self, index) -> "RaceBatch":
+        """Select a subset of races by index array or slice"""
+        return RaceBatch(
+            race_id=self.race_id[index],
+            distance=self.distance[index],
+            terrain=self.terrain[index],
+            start_time=self.start_time[index],
+        )
+
+
+def standard_schedule(
+    num_races: int,
+    terrains: Sequence[str] = TERRAINS,
+    distances: Sequence[int] = DISTANCES,
+    first_race_id: int = 0,
+) -> RaceBatch:
+    """
+    The race schedule used throughout the analysis scripts: terrain and
+    distance cycle with race_id and races start one hour apart.
+    """
+    race_id = np.arange(first_race_id, first_race_id + num_races, dtype=np.int64)
+    terrain_codes = np.array(
+        [TERRAIN_CODES.get(t, UNKNOWN_TERRAIN) for t in terrains], dtype=np.int64
+    )
+    return RaceBatch(
+        race_id=race_id,
+        distance=np.asarray(distances, dtype=np.int64)[race_id % len(distances)],
+        terrain=terrain_codes[race_id % len(terrains)],
+        start_time=race_id * HOUR_NS,
+    )
+
+
+def stats_matrix(bots: Union[Sequence[Bot], BotRoster]) -> np.ndarray:
+    """Build an (N x 4) int64 stats matrix in STAT_NAMES order"""
+    if isinstance(bots, BotRoster):
+        return bots.stats_matrix()
+    return np.array(
+        [
+            (b.stats.speed, b.stats.powerCore, b.stats.acceleration, b.stats.stability)
+            for b in bots
+        ],
+        dtype=np.int64,
+    ).reshape(-1, 4)
+
+
+def distance_classes(distance: np.ndarray) -> np.ndarray:
+    """Map race distances (km) to SHORT/MEDIUM/LONG codes"""
+    return np.where(distance < 10, SHORT, np.where(distance > 20, LONG, MEDIUM))
+
+
+class FieldTables:
+    """
+    Per-bot factors that only depend on stats, precomputed once per field.
+
+    terrain_mod is indexed [terrain_code, bot] and distance_mod is indexed
+    [distance_class, bot].
+    """
+
+    def __init__(self, stats: np.ndarray):
+        stats = np.asarray(stats)
+        if stats.ndim != 2 or stats.shape[1] != 4:
+            raise ValueError(f"stats must be an (N x 4) matrix, got {stats.shape}")
+
+        ints = stats.astype(np.int64)
+        speed, power_core, acceleration, stability = stats.astype(np.float64).T
+
+        self.size = len(stats)
+        self.inv_speed = 100.0 / speed
+
+        self.terrain_mod = np.ones((len(TERRAINS) + 1, self.size))
+        self.terrain_mod[TERRAIN_CODES["ScrapHeaps"]] = 1.0 + (
+            (100.0 - stability) / 150.0
+        )
+        self.terrain_mod[TERRAIN_CODES["WastelandSand"]] = 1.0 + (
+            (100.0 - power_core) / 200.0
+        )
+        self.terrain_mod[TERRAIN_CODES["MetalRoads"]] = 1.0 + (
+            (100.0 - acceleration) / 250.0
+        )
+
+        self.distance_mod = np.empty((3, self.size))
+        self.distance_mod[SHORT] = 1.0 - ((acceleration + speed - 60.0) / 350.0)
+        self.distance_mod[LONG] = 1.0 - ((power_core + stability - 60.0) / 350.0)
+        self.distance_mod[MEDIUM] = 1.0 - (
+            (speed + power_core + acceleration + stability - 160.0) / 700.0
+        )
+
+        self.stat_mix = (
+            ints[:, 0] * 7 + ints[:, 1] * 11 + ints[:, 2] * 13 + ints[:, 3] * 17
+        ) % 10000
+
+        bonus = (
+            ((speed > 80) & (acceleration > 80))
+            | ((power_core > 80) & (stability > 80))
+            | (
+                (speed > 75)
+                & (power_core > 75)
+                & (acceleration > 75)
+                & (stability > 75)
+            )
+        )
+        penalty = ((speed < 40) & (power_core < 40)) | (
+            (acceleration < 40) & (stability < 40)
+        )
+        self.stat_synergy = np.where(bonus, 0.95, np.where(penalty, 1.08, 1.0))
+
+
+def seed_term_tables():
+    """Return (race_chaos, bot_random, position_bonus) indexed by mixed seed"""
+    global _SEED_TERM_TABLES
+    if _SEED_TERM_TABLES is None:
+        mixed = np.arange(SEED_MODULUS, dtype=np.int64)
+        _SEED_TERM_TABLES = (
+            RACE_CHAOS_TABLE[(mixed // 7) % 1000],
+            BOT_RANDOM_TABLE[(mixed // 11) % 1000],
+            POSITION_BONUS_TABLE[(mixed // 13) % 1000],
+        )
+    return _SEED_TERM_TABLES
+
+
+def race_time_matrix(
+    stats: np.ndarray,
+    races: RaceBatch,
+    participant_index: Optional[np.ndarray] = None,
+    out: Optional[np.ndarray] = None,
+    engine: str = DEFAULT_ENGINE,
+) -> np.ndarray:
+    """
+    Calculate race times for every (race, bot) pair.
+
+    Args:
+        stats: (N x 4) stats matrix, or precomputed FieldTables
+        races: RaceBatch (or a sequence of RaceConfig)
+        participant_index: per-bot entry index used for seeding; defaults to
+            the bot's column, like enumerate() in simulate_race
+        out: optional preallocated (R x N) float64 array
+        engine: "hashed-v2" or "legacy-v1"
+
+    Returns:
+        (R x N) float64 matrix of race times
+    """
+    if engine not in ("hashed-v2", "legacy-v1"):
+        raise ValueError(f"race_time_matrix does not support engine '{engine}'")
+
+    tables = stats if isinstance(stats, FieldTables) else FieldTables(stats)
+    if not isinstance(races, RaceBatch):
+        races = RaceBatch.from_configs(races)
+
+    num_races, num_bots = len(races), tables.size
+    if participant_index is None:
+        participant_index = np.arange(num_bots, dtype=np.int64)
+    else:
+        participant_index = np.asarray(participant_index, dtype=np.int64)
+    if out is None:
+        out = np.empty((num_races, num_bots), dtype=np.float64)
+
+    # Per-race components
+    distance = races.distance.astype(np.float64)
+    dclass = distance_classes(races.distance)
+
+    if engine == "legacy-v1":
+        # The per-bot terms only depend on participant_index because
+        # combined_seed * 1000 vanishes modulo 1000 and 100
+        race_chaos = 0.90 + ((races.race_id * 7919) % 1000).astype(np.float64) / 5000.0
+        bot_random = 0.85 + ((participant_index * 2971) % 1000) / 3333.0
+        position_bonus = 0.97 + ((participant_index * 4993) % 100) / 3333.0
+    else:
+        # (seed * 2654435761 + race_seed + stat_mix) % 1000000 with
+        # seed = combined_seed * 1000 + participant_index splits into a
+        # per-race and a per-bot residue, so each cell only needs one add and
+        # one modulo.
+        multiplier = SEED_MULTIPLIER % SEED_MODULUS
+        combined_seed = races.race_id + np.abs(races.start_time // 1_000_000_000)
+        race_seed = (races.race_id * 31337 + 12345) % 100000
+        race_part = ((combined_seed * 1000) % SEED_MODULUS) * multiplier + race_seed
+        race_part %= SEED_MODULUS
+        bot_part = (participant_index % SEED_MODULUS) * multiplier + tables.stat_mix
+        bot_part %= SEED_MODULUS
+        race_chaos, bot_random, position_bonus = seed_term_tables()
+
+    chunk = max(1, CHUNK_CELLS // max(1, num_bots))
+    for start in range(0, num_races, chunk):
+        rows = slice(start, min(start + chunk, num_races))
+        times = out[rows]
+
+        np.multiply(distance[rows, None], tables.inv_speed[None, :], out=times)
+        times *= 30.0
+        times *= tables.terrain_mod[races.terrain[rows]]
+        times *= tables.distance_mod[dclass[rows]]
+
+        if engine == "legacy-v1":
+            times *= race_chaos[rows, None]
+            times *= bot_random[None, :]
+            times *= position_bonus[None, :]
+        else:
+            mixed = race_part[rows, None] + bot_part[None, :]
+            mixed %= SEED_MODULUS
+            times *= race_chaos[mixed]
+            times *= bot_random[mixed]
+            times *= position_bonus[mixed]
+
+        times *= tables.stat_synergy[None, :]
+        np.maximum(times, 1.0, out=times)
+
+    return out
+
+
+def finish_order(times: np.ndarray, places: Optional[int] = None) -> np.ndarray:
+    """
+    (R x places) field indices of the first finishers of each race; ties
+    keep field order, matching a stable argsort.
+
+    With places below the field size this is an argpartition plus a sort of
+    the selected columns; rows with a tie across the cut fall back to a
+    full stable sort.
+    """
+    num_bots = times.shape[1]
+    if places is None or places >= num_bots:
+        return times.argsort(axis=1, kind="stable")
+
+    top = np.argpartition(times, places - 1, axis=1)[:, :places]
+    top_times = np.take_along_axis(times, top, axis=1)
+    order = np.lexsort((top, top_times), axis=1)
+    top = np.take_along_axis(top, order, axis=1)
+
+    cut = np.take_along_axis(top_times, order[:, -1:], axis=1)
+    tied = np.flatnonzero((times <= cut).sum(axis=1) > places)
+    if len(tied):
+        top[tied] = times[tied].argsort(axis=1, kind="stable")[:, :places]
+    return top
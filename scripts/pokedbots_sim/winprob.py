@@ -0,0 +1,514 @@
+"""
+Closed-form win probabilities for the hashed-v2 engine.
+
+Within one (terrain, distance) cell a bot's race time is a deterministic
+part (base time x terrain x distance x stat synergy) times the seed noise
+race_chaos * bot_random * position_bonus, all three read from the bot's
+mixed seed. The mixed seed is a per-race residue plus a fixed per-bot
+residue (entry index and stat mix) modulo 1,000,000, and the per-race
+residue is close to uniform across races, so a race's whole outcome is a
+function of that one residue. The estimators build on that:
+
+"exact" sums over every one of the 1,000,000 per-race residues, so the
+outcome distribution has no sampling error at all. It costs N x 10^6 time
+evaluations and is meant for small fields (matchups, a player's bots).
+
+"residues" conditions on a stratified sample of per-race residues (one
+per equal slice of 0..999,999) and ranks the field exactly for each, so
+it is unbiased and carries binomial error bars (conservative: stratifying
+can only shrink the variance). The seed-noise matrix only depends on the
+residues and the bots, so rank_collection() builds it once and every
+(terrain, distance) cell is just a scale, a sort and bincounts. This is
+the default for fields too big to enumerate.
+
+"independent" treats each bot's mixed seed as independent. Log race times
+are then one shared noise distribution (the exact histogram of the term
+product over all mixed seeds) shifted by log(deterministic time), and
+
+    P(win)        = sum_t f_i(t) * P(no other bot faster than t)
+    P(top k)      = sum_t f_i(t) * P(fewer than k others faster than t)
+    E[position]   = 1 + sum_t f_i(t) * sum_{j != i} F_j(t)
+
+are evaluated on a common log-time grid. The "others faster" counts are a
+Poisson-binomial built once for the field and divided back out per bot, so
+a cell costs O(N x grid) and the whole collection is ranked in one pass.
+Within a race the seeds are really one draw plus fixed offsets, and bots
+with nearby per-bot residues get strongly correlated noise, so this is
+biased (by many standard errors on small fields and for outsiders of the
+whole collection). It is kept as an opt-in quick look, never the default;
+monte_carlo_check() measures any estimate's error against
+race_time_matrix() with binomial error bars.
+
+legacy-v1 is not covered: its per-bot terms only depend on the entry index,
+so there is no per-bot randomness across races to integrate.
+"""
+
+import math
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .models import DISTANCES, TERRAINS, Bot
+from .roster import BotRoster
+from .vectorized import (
+    HOUR_NS,
+    TERRAIN_CODES,
+    UNKNOWN_TERRAIN,
+    FieldTables,
+    RaceBatch,
+    distance_classes,
+    SEED_MODULUS,
+    SEED_MULTIPLIER,
+    race_time_matrix,
+    seed_term_tables,
+    stats_matrix,
+)
+
+# Log-time grid spacing; the noise spans about 0.91 in log time
+DEFAULT_STEP = 5e-4
+
+# Grid cells (independent) or seed x bot cells (exact) per block
+CHUNK_CELLS = 1 << 18
+
+# Largest field estimate_cell() enumerates exactly under method="auto"
+EXACT_MAX_FIELD = 16
+
+# Per-race residues sampled by the "residues" method
+RESIDUE_SAMPLES = 1000
+
+METHODS = ("auto", "exact", "residues", "independent")
+
+_NOISE: Dict[float, Tuple[np.ndarray, np.ndarray]] = {}
+
+Field = Union[Sequence[Bot], BotRoster]
+
+
+def noise_distribution(step: float = DEFAULT_STEP) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (edges, cdf) of log(race_chaos * bot_random * position_bonus) over all
+    mixed seeds, on a grid of the given step. The CDF is linear between
+    edges (mass spread evenly within each bin).
+    """
+    if step not in _NOISE:
+        race_chaos, bot_random, position_bonus = seed_term_tables()
+        log_noise = np.log(race_chaos * bot_random * position_bonus)
+        lo = math.floor(log_noise.min() / step) - 1
+        hi = math.ceil(log_noise.max() / step) + 1
+        edges = np.arange(lo, hi + 1) * step
+        counts = np.bincount(
+            np.floor(log_noise / step).astype(np.int64) - lo, minlength=len(edges) - 1
+        )
+        cdf = np.zeros(len(edges))
+        cdf[1:] = np.cumsum(counts[: len(edges) - 1]) / len(log_noise)
+        _NOISE[step] = (edges, cdf)
+    return _NOISE[step]
+
+
+def deterministic_times(
+    stats: Union[np.ndarray, FieldTables], terrain: str, distance: int
+) -> np.ndarray:
+    """Noise-free hashed-v2 race time per bot for one cell"""
+    tables = stats if isinstance(stats, FieldTables) else FieldTables(stats)
+    dclass = int(distance_classes(np.array([distance]))[0])
+    times = float(distance) * tables.inv_speed * 30.0
+    times = times * tables.terrain_mod[TERRAIN_CODES.get(terrain, UNKNOWN_TERRAIN)]
+    times = times * tables.distance_mod[dclass]
+    return times * tables.stat_synergy
+
+
+@dataclass
+class WinEstimate:
+    """Per-bot outcome probabilities for one (terrain, distance) cell"""
+
+    token_ids: np.ndarray
+    terrain: str
+    distance: int
+    top: int
+    method: str
+    p_win: np.ndarray
+    p_top: np.ndarray  # P(finishing in the first `top` places)
+    expected_position: np.ndarray
+    step: float
+    samples: int = 0  # residues sampled ("residues" method), 0 otherwise
+    win_stderr: Optional[np.ndarray] = None  # sampling error, None if exact
+    top_stderr: Optional[np.ndarray] = None
+    position_stderr: Optional[np.ndarray] = None
+
+    def ranking(self) -> np.ndarray:
+        """Field indices by descending P(win), then expected position"""
+        return np.lexsort((self.expected_position, -self.p_win))
+
+
+def _field_arrays(field: Field) -> Tuple[np.ndarray, np.ndarray]:
+    stats = stats_matrix(field)
+    if isinstance(field, BotRoster):
+        token_ids = field.token_ids.astype(np.int64)
+    else:
+        token_ids = np.array([b.token_id for b in field], dtype=np.int64)
+    return stats, token_ids
+
+
+def _cell_distributions(shift, edges, cdf, grid):
+    """(cell mass, mid-cell CDF) per bot on the common grid: (B x G) each"""
+    upper = np.interp(grid[None, :] - shift[:, None], edges, cdf)
+    mass = np.diff(upper, axis=1, prepend=0.0)
+    # Half the bot's own cell mass counts as "faster", splitting ties evenly
+    return mass, upper - mass / 2.0
+
+
+def _bot_residues(tables: FieldTables) -> np.ndarray:
+    """Per-bot part of the mixed seed, bots entered in field order"""
+    participant_index = np.arange(tables.size, dtype=np.int64)
+    bot_part = participant_index * (SEED_MULTIPLIER % SEED_MODULUS) + tables.stat_mix
+    bot_part %= SEED_MODULUS
+    return bot_part
+
+
+def _estimate_exact(stats, tables, terrain, distance, top):
+    """P(win), P(top), E[position] summed over every per-race seed residue"""
+    n = len(stats)
+    bot_part = _bot_residues(tables)
+    race_chaos, bot_random, position_bonus = seed_term_tables()
+
+    # Same operation order as race_time_matrix(), so ties break identically
+    dclass = int(distance_classes(np.array([distance]))[0])
+    base = float(distance) * tables.inv_speed
+    base *= 30.0
+    base *= tables.terrain_mod[TERRAIN_CODES.get(terrain, UNKNOWN_TERRAIN)]
+    base *= tables.distance_mod[dclass]
+
+    wins = np.zeros(n, dtype=np.int64)
+    placed = np.zeros(n, dtype=np.int64)
+    position_sum = np.zeros(n, dtype=np.int64)
+    block = max(1, CHUNK_CELLS // max(n, 1))
+    for start in range(0, SEED_MODULUS, block):
+        residue = np.arange(start, min(start + block, SEED_MODULUS), dtype=np.int64)
+        mixed = residue[:, None] + bot_part[None, :]
+        mixed %= SEED_MODULUS
+        times = base[None, :] * race_chaos[mixed]
+        times *= bot_random[mixed]
+        times *= position_bonus[mixed]
+        times *= tables.stat_synergy[None, :]
+        np.maximum(times, 1.0, out=times)
+
+        order = times.argsort(axis=1, kind="stable")
+        wins += np.bincount(order[:, 0], minlength=n)
+        placed += np.bincount(order[:, :top].ravel(), minlength=n)
+        for position in range(1, n):
+            position_sum += position * np.bincount(order[:, position], minlength=n)
+
+    return (
+        wins / SEED_MODULUS,
+        placed / SEED_MODULUS,
+        1.0 + position_sum / SEED_MODULUS,
+    )
+
+
+def residue_noise(
+    tables: FieldTables, samples: int = RESIDUE_SAMPLES, seed: int = 0
+) -> np.ndarray:
+    """
+    (samples x N) seed noise race_chaos * bot_random * position_bonus for a
+    stratified sample of per-race residues: one uniform draw from each of
+    `samples` equal slices of 0..SEED_MODULUS - 1
+    """
+    rng = np.random.default_rng(seed)
+    stride = SEED_MODULUS / samples
+    residue = ((np.arange(samples) + rng.random(samples)) * stride).astype(np.int64)
+    bot_part = _bot_residues(tables)
+    race_chaos, bot_random, position_bonus = seed_term_tables()
+
+    noise = np.empty((samples, tables.size))
+    block = max(1, CHUNK_CELLS // max(tables.size, 1))
+    for start in range(0, samples, block):
+        rows = slice(start, min(start + block, samples))
+        mixed = residue[rows, None] + bot_part[None, :]
+        mixed %= SEED_MODULUS
+        chunk = noise[rows]
+        np.multiply(race_chaos[mixed], bot_random[mixed], out=chunk)
+        chunk *= position_bonus[mixed]
+    return noise
+
+
+def _estimate_residues(tables, terrain, distance, top, noise):
+    """P(win), P(top), E[position] and their standard errors over sampled races"""
+    samples, n = noise.shape
+    base = deterministic_times(tables, terrain, distance)
+
+    wins = np.zeros(n, dtype=np.int64)
+    placed = np.zeros(n, dtype=np.int64)
+    position_sum = np.zeros(n)
+    position_sq = np.zeros(n)
+    places = np.arange(n, dtype=np.float64)
+    block = max(1, CHUNK_CELLS // max(n, 1))
+    for start in range(0, samples, block):
+        times = noise[start : start + block] * base[None, :]
+        np.maximum(times, 1.0, out=times)
+        order = times.argsort(axis=1, kind="stable")
+        wins += np.bincount(order[:, 0], minlength=n)
+        placed += np.bincount(order[:, :top].ravel(), minlength=n)
+        positions = np.empty(order.shape)
+        np.put_along_axis(positions, order, places[None, :], axis=1)
+        position_sum += positions.sum(axis=0)
+        position_sq += (positions**2).sum(axis=0)
+
+    p_win = wins / samples
+    p_top = placed / samples
+    mean_position = position_sum / samples
+    position_var = np.maximum(position_sq / samples - mean_position**2, 0.0)
+
+    def stderr(p):
+        # Half a count at 0 / samples, so never-seen outcomes keep an error bar
+        p = np.clip(p, 0.5 / samples, 1.0 - 0.5 / samples)
+        return np.sqrt(p * (1.0 - p) / samples)
+
+    return (
+        p_win,
+        p_top,
+        1.0 + mean_position,
+        stderr(p_win),
+        stderr(p_top),
+        np.sqrt(position_var / samples),
+    )
+
+
+def _estimate_independent(tables, terrain, distance, top, step):
+    """P(win), P(top), E[position] by integration over independent noise"""
+    n = tables.size
+    edges, cdf = noise_distribution(step)
+
+    shift = np.log(deterministic_times(tables, terrain, distance))
+    # Upper edges of the common grid, covering every bot's support
+    lo = math.floor((shift.min() + edges[0]) / step)
+    hi = math.ceil((shift.max() + edges[-1]) / step)
+    grid = np.arange(lo, hi + 1) * step
+
+    # Pass 1: P(exactly k bots faster than t) for k < top over the whole
+    # field, and the expected number of bots faster than t
+    faster = np.zeros((top, len(grid)))
+    faster[0] = 1.0
+    faster_sum = np.zeros(len(grid))
+    block = max(1, CHUNK_CELLS // len(grid))
+    for start in range(0, n, block):
+        _, below = _cell_distributions(shift[start : start + block], edges, cdf, grid)
+        faster_sum += below.sum(axis=0)
+        for q in below:
+            for k in range(top - 1, 0, -1):
+                faster[k] *= 1.0 - q
+                faster[k] += faster[k - 1] * q
+            faster[0] *= 1.0 - q
+
+    # Pass 2: divide each bot back out of the field and integrate
+    p_win = np.empty(n)
+    p_top = np.empty(n)
+    expected_position = np.empty(n)
+    for start in range(0, n, block):
+        rows = slice(start, min(start + block, n))
+        mass, below = _cell_distributions(shift[rows], edges, cdf, grid)
+        above = 1.0 - below
+        safe = above > 0.0
+        others = np.zeros(mass.shape)
+        within = np.zeros(mass.shape)
+        for k in range(top):
+            numerator = faster[k] - below * others if k else faster[0]
+            others = np.divide(numerator, above, out=np.zeros(mass.shape), where=safe)
+            np.clip(others, 0.0, 1.0, out=others)
+            within += others
+            if k == 0:
+                p_win[rows] = (mass * others).sum(axis=1)
+        p_top[rows] = (mass * np.minimum(within, 1.0)).sum(axis=1)
+        expected_position[rows] = 1.0 + (mass * (faster_sum - below)).sum(axis=1)
+
+    return p_win, p_top, expected_position
+
+
+def estimate_cell(
+    field: Field,
+    terrain: str,
+    distance: int,
+    top: int = 3,
+    method: str = "auto",
+    step: float = DEFAULT_STEP,
+    tables: Optional[FieldTables] = None,
+    samples: int = RESIDUE_SAMPLES,
+    noise: Optional[np.ndarray] = None,
+) -> WinEstimate:
+    """
+    P(win), P(top `top`) and expected position for every bot in the field,
+    racing each other (in field order) in a hashed-v2 race of the given cell.
+
+    method: "exact", "residues", "independent", or "auto" (exact up to
+    EXACT_MAX_FIELD bots, residues above). samples is the residue count of
+    the residues method (noise: a precomputed residue_noise() for this
+    field); step is the log-time grid spacing of the independent method.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown method '{method}'. Available: {list(METHODS)}")
+    stats, token_ids = _field_arrays(field)
+    n = len(stats)
+    top = max(1, min(top, n))
+    tables = tables if tables is not None else FieldTables(stats)
+    if method == "auto":
+        method = "exact" if n <= EXACT_MAX_FIELD else "residues"
+
+    stderr = (None, None, None)
+    if method == "exact":
+        samples = 0
+        p_win, p_top, expected_position = _estimate_exact(
+            stats, tables, terrain, distance, top
+        )
+    elif method == "residues":
+        if noise is None:
+            noise = residue_noise(tables, samples)
+        samples = len(noise)
+        p_win, p_top, expected_position, *stderr = _estimate_residues(
+            tables, terrain, distance, top, noise
+        )
+    else:
+        samples = 0
+        p_win, p_top, expected_position = _estimate_independent(
+            tables, terrain, distance, top, step
+        )
+
+    return WinEstimate(
+        token_ids=token_ids,
+        terrain=terrain,
+        distance=int(distance),
+        top=top,
+        method=method,
+        p_win=p_win,
+        p_top=p_top,
+        expected_position=expected_position,
+        step=step,
+        samples=samples,
+        win_stderr=stderr[0],
+        top_stderr=stderr[1],
+        position_stderr=stderr[2],
+    )
+
+
+def rank_collection(
+    field: Field,
+    terrains: Sequence[str] = TERRAINS,
+    distances: Sequence[int] = DISTANCES,
+    top: int = 3,
+    method: str = "auto",
+    step: float = DEFAULT_STEP,
+    samples: int = RESIDUE_SAMPLES,
+) -> Dict[Tuple[str, int], WinEstimate]:
+    """
+    estimate_cell() for every (terrain, distance) cell, sharing the tables
+    and (residues method) one residue-noise matrix across cells
+    """
+    stats, _ = _field_arrays(field)
+    tables = FieldTables(stats)
+    noise = None
+    if method == "residues" or (method == "auto" and len(stats) > EXACT_MAX_FIELD):
+        noise = residue_noise(tables, samples)
+    return {
+        (terrain, distance): estimate_cell(
+            field, terrain, distance, top, method, step, tables, samples, noise
+        )
+        for terrain in terrains
+        for distance in distances
+    }
+
+
+# ===== MONTE CARLO CROSS-CHECK =====
+
+
+@dataclass
+class EstimateCheck:
+    """
+    Monte Carlo rates for the same cell, with binomial standard errors.
+
+    max_z is the largest |estimate - simulated| / standard error of P(win)
+    and P(top) over bots with a non-zero error bar; the error bar combines
+    the Monte Carlo one with the estimate's own sampling error (residues
+    method). Values well above 3 mean the estimate is biased for this field
+    (expected for the independent method). max_position_z is the same for
+    expected position; it covers every bot, so on big fields a few values
+    past 3 are just the tail of thousands of comparisons.
+    """
+
+    num_races: int
+    p_win: np.ndarray
+    p_top: np.ndarray
+    expected_position: np.ndarray
+    win_stderr: np.ndarray
+    top_stderr: np.ndarray
+    position_stderr: np.ndarray
+    max_win_error: float
+    max_top_error: float
+    max_position_error: float
+    max_z: float
+    max_position_z: float
+
+
+def monte_carlo_check(
+    estimate: WinEstimate,
+    field: Field,
+    num_races: int = 1000,
+    first_race_id: int = 0,
+) -> EstimateCheck:
+    """Race the field num_races times in the estimate's cell and compare"""
+    stats, _ = _field_arrays(field)
+    n = len(stats)
+    race_id = np.arange(first_race_id, first_race_id + num_races, dtype=np.int64)
+    races = RaceBatch(
+        race_id=race_id,
+        distance=np.full(num_races, estimate.distance, dtype=np.int64),
+        terrain=np.full(
+            num_races,
+            TERRAIN_CODES.get(estimate.terrain, UNKNOWN_TERRAIN),
+            dtype=np.int64,
+        ),
+        start_time=race_id * HOUR_NS,
+    )
+    order = race_time_matrix(stats, races).argsort(axis=1, kind="stable")
+    positions = np.empty_like(order)
+    np.put_along_axis(positions, order, np.arange(n)[None, :], axis=1)
+
+    p_win = np.bincount(order[:, 0], minlength=n) / num_races
+    p_top = (positions < estimate.top).mean(axis=0)
+    expected_position = positions.mean(axis=0) + 1.0
+    win_stderr = np.sqrt(p_win * (1.0 - p_win) / num_races)
+    top_stderr = np.sqrt(p_top * (1.0 - p_top) / num_races)
+    position_stderr = positions.std(axis=0) / math.sqrt(num_races)
+
+    def max_z(errors, stderr, own):
+        if own is not None:
+            stderr = np.sqrt(stderr**2 + own**2)
+        z = errors[stderr > 0] / stderr[stderr > 0]
+        return float(z.max()) if len(z) else 0.0
+
+    sampled = estimate.win_stderr is not None
+    probability_z = max_z(
+        np.concatenate(
+            [np.abs(estimate.p_win - p_win), np.abs(estimate.p_top - p_top)]
+        ),
+        np.concatenate([win_stderr, top_stderr]),
+        np.concatenate([estimate.win_stderr, estimate.top_stderr]) if sampled else None,
+    )
+    position_z = max_z(
+        np.abs(estimate.expected_position - expected_position),
+        position_stderr,
+        estimate.position_stderr,
+    )
+    return EstimateCheck(
+        num_races=num_races,
+        p_win=p_win,
+        p_top=p_top,
+        expected_position=expected_position,
+        win_stderr=win_stderr,
+        top_stderr=top_stderr,
+        position_stderr=position_stderr,
+        max_win_error=float(np.abs(estimate.p_win - p_win).max()),
+        max_top_error=float(np.abs(estimate.p_top - p_top).max()),
+        max_position_error=float(
+            np.abs(estimate.expected_position - expected_position).max()
+        ),
+        max_z=probability_z,
+        max_position_z=position_z,
+    )
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Rank the whole collection per race type with win probabilities conditioned
+on the per-race seed residue. Every cell is cross-checked against a short
+Monte Carlo run; a cell whose estimate is off by more than MAX_Z standard
+errors is flagged instead of ranked.
+"""
+
+import time
+
+from pokedbots_sim import (
+    DISTANCES,
+    TERRAINS,
+    estimate_cell,
+    load_roster,
+    monte_carlo_check,
+    rank_collection,
+)
+
+# Races per cell in the ranking cross-check, and the z-score that rejects it
+CHECK_RACES = 2000
+MAX_Z = 3.0
+
+
+def print_ranking(estimate, roster, limit):
+    for place, row in enumerate(estimate.ranking()[:limit], 1):
+        bot = roster.view(row)
+        print(
+            f"  {place:2}. {bot.id:20} P(win): {estimate.p_win[row] * 100:6.2f}% | "
+            f"P(top {estimate.top}): {estimate.p_top[row] * 100:6.2f}% | "
+            f"Avg Position: {estimate.expected_position[row]:8.1f}"
+        )
+
+
+def main():
+    print("📐 WIN PROBABILITIES BY RACE SEED")
+    print("=" * 80)
+
+    roster = load_roster()
+    print(f"Loaded {len(roster)} bots from collection")
+
+    start = time.perf_counter()
+    rankings = rank_collection(roster, TERRAINS, DISTANCES)
+    elapsed = time.perf_counter() - start
+    print(f"Ranked {len(rankings)} race types in {elapsed:.1f}s\n")
+
+    for (terrain, distance), estimate in rankings.items():
+        print(f"\n🏁 {terrain} {distance}km (whole collection)")
+        print("-" * 80)
+        check = monte_carlo_check(estimate, roster, CHECK_RACES)
+        if check.max_z > MAX_Z:
+            print(
+                f"  ⚠️  Estimate disagrees with {CHECK_RACES} simulated races "
+                f"(max z-score {check.max_z:.1f} > {MAX_Z:g}); ranking withheld"
+            )
+            continue
+        print_ranking(estimate, roster, 5)
+
+    # Small fields are enumerated over every race seed
+    jesse_roster = roster.take(roster.rows_of([737, 4079, 4343, 8631]))
+    print("\n\n🤖 JESSE'S BOTS (exact over all race seeds)")
+    print("-" * 80)
+    for terrain in TERRAINS:
+        for distance in (5, 15, 25):
+            estimate = estimate_cell(jesse_roster, terrain, distance)
+            print(f"\n{terrain} {distance}km:")
+            print_ranking(estimate, jesse_roster, len(jesse_roster))
+
+    print("\n\n🎲 MONTE CARLO CROSS-CHECK")
+    print("-" * 80)
+    for field, name, num_races in (
+        (jesse_roster, "Jesse's bots", 10000),
+        (roster, "whole collection", 500),
+    ):
+        estimate = estimate_cell(field, "ScrapHeaps", 15)
+        check = monte_carlo_check(estimate, field, num_races)
+        print(f"\n{name} ({estimate.method}, {num_races} races):")
+        print(f"  Max P(win) error:    {check.max_win_error * 100:6.2f} pts")
+        print(f"  Max P(top 3) error:  {check.max_top_error * 100:6.2f} pts")
+        print(f"  Max position error:  {check.max_position_error:8.2f}")
+        print(f"  Max z-score:         {check.max_z:8.2f}")
+        print(f"  Max position z:      {check.max_position_z:8.2f}")
+
+    print("\n" + "=" * 80)
+
+
+if __name__ == "__main__":
+    main()
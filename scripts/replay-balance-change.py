@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+How many archived podiums would a segment-time balance change flip?
+
+Replays the race archive (build-race-archive.py) under the live
+calculate_segment_time constants and under CANDIDATE, writes per-race
+diffs to data/.cache/replay/diffs.jsonl and prints flip rates by terrain
+and race class.
+"""
+
+import json
+import os
+import time
+
+from pokedbots_sim.archive import RaceArchive
+from pokedbots_sim.data import CACHE_DIR
+from pokedbots_sim.replay import replay_archive
+from pokedbots_sim.segmented_vectorized import SegmentConstants
+
+# The balance change under review (unset fields keep their live values)
+CANDIDATE = SegmentConstants(momentum_loss=0.20, metal_roads_penalty=150.0)
+DIFFS_PATH = os.path.join(CACHE_DIR, "replay", "diffs.jsonl")
+
+
+def print_summary(title, summary):
+    print(f"\n\n{title}")
+    print("-" * 80)
+    print(
+        f"  {'':16} {'Races':>8} {'Winner flips':>13} {'Flip rate':>10} "
+        f"{'Podium':>8} {'Moved/race':>11} {'Mean |Δt|':>10}"
+    )
+    for label, row in summary.items():
+        print(
+            f"  {label:16} {row['races']:8,} {row['winner_flips']:13,} "
+            f"{row['winner_flip_rate'] * 100:9.1f}% "
+            f"{row['podium_flip_rate'] * 100:7.1f}% "
+            f"{row['moved_per_race']:11.2f} {row['mean_abs_time_delta']:9.2f}s"
+        )
+
+
+def main():
+    print("🔁 BALANCE CHANGE REPLAY")
+    print("=" * 80)
+
+    archive = RaceArchive()
+    if not len(archive):
+        print(f"No archived races in {os.path.relpath(archive.root)}")
+        print("Record races, then run build-race-archive.py")
+        return
+
+    start = time.perf_counter()
+    result = replay_archive(CANDIDATE, archive=archive)
+    elapsed = time.perf_counter() - start
+    print(f"Candidate: {CANDIDATE}")
+    print(
+        f"Replayed {len(result):,} races in {elapsed:.2f}s "
+        f"({result.skipped:,} skipped: unknown bot or track)"
+    )
+    faithful = int(result.races["faithful"].sum())
+    print(f"Baseline replays matching the archived order: {faithful:,}")
+
+    os.makedirs(os.path.dirname(DIFFS_PATH), exist_ok=True)
+    with open(DIFFS_PATH, "w") as f:
+        for row in range(len(result)):
+            f.write(json.dumps(result.race_diff(row)) + "\n")
+    print(f"Per-race diffs written to {os.path.relpath(DIFFS_PATH)}")
+
+    print_summary("🏔️  BY TERRAIN", result.summary("terrain"))
+    print_summary("🏷️  BY CLASS", result.summary("race_class"))
+
+    print("\n" + "=" * 80)
+
+
+if __name__ == "__main__":
+    main()
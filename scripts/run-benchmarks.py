@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark the race engines and analysis scripts, store the run as JSON and
+compare it with the previous run
+"""
+
+import os
+
+from pokedbots_sim.bench import (
+    bench_race_time,
+    bench_race_time_matrix,
+    bench_segmented_scalar,
+    bench_segmented_tensor,
+    bench_simulate_fleets,
+    bench_simulate_strategy,
+    bench_upgrade_monte_carlo,
+    compare_runs,
+    previous_run,
+    run_cases,
+    write_run,
+)
+
+FIELD_SIZES = [2, 8, 16, 10_000]
+
+# Work per case is scaled to roughly this many (race x bot) evaluations
+SCALAR_CELLS = 40_000
+ARRAY_CELLS = 4_000_000
+SEGMENT_RACE_CELLS = 4_000  # per track, for the segment loop
+TENSOR_CELLS = 400_000  # per track
+STRATEGY_DAYS = 7
+UPGRADE_SIMULATIONS = 10_000
+
+# Throughput drop that is reported as a regression
+REGRESSION_RATIO = 0.9
+
+
+def races_for(field_size, cells):
+    return max(1, cells // field_size)
+
+
+def repeats_for(field_size):
+    return 1 if field_size >= 10_000 else 3
+
+
+def build_cases():
+    cases = []
+    for engine in ("legacy-v1", "hashed-v2"):
+        for n in FIELD_SIZES:
+            cases.append(
+                (
+                    bench_race_time,
+                    (engine, n, races_for(n, SCALAR_CELLS), repeats_for(n)),
+                )
+            )
+        for n in FIELD_SIZES:
+            cases.append(
+                (
+                    bench_race_time_matrix,
+                    (engine, n, races_for(n, ARRAY_CELLS), repeats_for(n)),
+                )
+            )
+    for n in FIELD_SIZES:
+        cases.append((bench_segmented_scalar, (n, races_for(n, SEGMENT_RACE_CELLS), 1)))
+    for n in FIELD_SIZES:
+        cases.append(
+            (bench_segmented_tensor, (n, races_for(n, TENSOR_CELLS), repeats_for(n)))
+        )
+    for n in FIELD_SIZES:
+        cases.append((bench_simulate_strategy, (n, STRATEGY_DAYS, repeats_for(n))))
+    for n in FIELD_SIZES:
+        cases.append((bench_simulate_fleets, (n, STRATEGY_DAYS, repeats_for(n))))
+    cases.append((bench_upgrade_monte_carlo, (UPGRADE_SIMULATIONS, 3)))
+    return cases
+
+
+def print_result(result):
+    segments = ""
+    if result.segment_rate is not None:
+        segments = f" | {result.segment_rate:12,.0f} segments/s"
+    print(
+        f"  {result.name:34} {result.field_size:6} bots | "
+        f"{result.rate:12,.1f} {result.unit}/s{segments} | "
+        f"peak RSS {result.peak_rss_mb:7.1f} MB"
+    )
+
+
+def main():
+    print("⏱️  POKEDBOTS SIMULATION BENCHMARKS")
+    print("=" * 80)
+
+    results = run_cases(build_cases(), print_result)
+    path = write_run(results)
+    print(f"\nResults written to {os.path.relpath(path)}")
+
+    previous = previous_run(before=path)
+    if previous is None:
+        print("No previous run to compare against")
+    else:
+        print(f"\n📊 COMPARED WITH {os.path.basename(previous)}")
+        print("-" * 80)
+        for name, field_size, ratio in compare_runs(previous, path):
+            flag = "  ⚠️ regression" if ratio < REGRESSION_RATIO else ""
+            print(f"  {name:34} {field_size:6} bots | {ratio:6.2f}x{flag}")
+
+    print("\n" + "=" * 80)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Profit-maximizing maintenance policies (pokedbots_sim.maintenance).
+
+Solves the recharge / repair / race decision for each analyze-economics.py
+Scenario 1 bot by value iteration, with wins (and so class) moving as it
+races, and prints its thresholds on entering each class. Its exact
+long-run net ICP per day, in the class its wins carry it to, is compared
+with simulate_strategy's "optimal" heuristic (recharge and repair below
+50). Solved policies are cached under data/.cache, so re-runs only look
+them up.
+"""
+
+import time
+
+from pokedbots_sim.economy import CLASS_MIN_WINS, ECONOMY_CLASSES, MIXED_FLEET
+from pokedbots_sim.maintenance import RACE, RECHARGE, REPAIR, solve_policy, steady_state
+
+RACES_PER_DAY = 4
+HEURISTIC = (50, 50)
+
+
+def thresholds(policy, wins):
+    """Highest battery (at full condition) and condition (at full battery)
+    the policy still recharges / repairs at, and the lowest battery it races at"""
+    grid = policy.grid(wins)
+    top = len(grid) - 1
+    recharge = [b for b in range(len(grid)) if grid[b, -1] & RECHARGE]
+    repair = [c for c in range(grid.shape[1]) if grid[top, c] & REPAIR]
+    races = [b for b in range(len(grid)) if grid[b, -1] & RACE]
+    return (
+        max(recharge) + 1 if recharge else 0,
+        max(repair) + 1 if repair else 0,
+        min(races) if races else None,
+    )
+
+
+def main():
+    print("🛠️  OPTIMAL MAINTENANCE POLICIES")
+    print("=" * 80)
+
+    for i, (stats, wins) in enumerate(MIXED_FLEET, 1):
+        start = time.perf_counter()
+        policy = solve_policy(stats)
+        elapsed = time.perf_counter() - start
+        print(
+            f"\n\n🤖 BOT {i}: stats {stats}, {wins} wins ({elapsed:.2f}s, {policy.key})"
+        )
+        print("-" * 80)
+        print(
+            f"  {'Class':12} {'From wins':>9} | "
+            f"{'Recharge<':>9} {'Repair<':>7} {'Races from':>10}"
+        )
+        for race_class, from_wins in zip(ECONOMY_CLASSES, [0] + CLASS_MIN_WINS):
+            recharge, repair, races_from = thresholds(policy, from_wins)
+            races_label = "never" if races_from is None else races_from
+            print(
+                f"  {race_class:12} {from_wins:9} | "
+                f"{recharge:9} {repair:7} {races_label:>10}"
+            )
+
+        optimal = policy.steady_state(wins, RACES_PER_DAY)
+        heuristic = steady_state(stats, wins, RACES_PER_DAY, *HEURISTIC)
+        print(
+            f"\n  Long run from {wins} wins: optimal {optimal.net_per_day:.4f} "
+            f"ICP/day in {optimal.race_class}, heuristic "
+            f"{heuristic.net_per_day:.4f} in {heuristic.race_class}, gain "
+            f"{optimal.net_per_day - heuristic.net_per_day:.4f}"
+        )
+
+    print("\n" + "=" * 80)
+
+
+if __name__ == "__main__":
+    main()
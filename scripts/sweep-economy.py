@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Economy balance sweeps: fan parameter grids / Latin-hypercube samples over
+the racing, scavenging and racing-vs-scavenging models out to a process
+pool (pokedbots_sim.sweep).
+
+Results go to data/.cache/sweeps/<sweep>.jsonl as they finish. Re-running
+skips points already there, so an interrupted run resumes and extending a
+grid only computes the new points; delete a file to start that sweep over.
+"""
+
+import os
+import time
+
+from pokedbots_sim.data import CACHE_DIR
+from pokedbots_sim.sweep import grid, latin_hypercube, run_sweep
+
+RESULTS_DIR = os.path.join(CACHE_DIR, "sweeps")
+WORKERS = None  # all cores
+
+# name -> (evaluator, points, metric to rank by)
+SWEEPS = {
+    # analyze-economics.py / analyze-maintenance-costs.py constants
+    "racing-costs": (
+        "racing",
+        grid(
+            {
+                "recharge_cost": [0.05, 0.075, 0.1, 0.15, 0.2],
+                "repair_cost": [0.025, 0.05, 0.1],
+                "entry_fees.Scavenger": [0.025, 0.05, 0.1],
+                "daily_sprint_bonus.Scavenger": [0.0, 0.25, 0.5],
+                "fleet.races_per_day": [2, 4, 6],
+            }
+        ),
+        "net_profit_p50",
+    ),
+    "racing-prizes": (
+        "racing",
+        latin_hypercube(
+            {
+                "prize_distribution.0": (0.35, 0.6),
+                "prize_distribution.1": (0.15, 0.3),
+                "platform_tax": (0.0, 0.1),
+                "entry_fees.Elite": (0.1, 0.4),
+            },
+            samples=200,
+        ),
+        "net_profit_p50",
+    ),
+    # analyze-scavenging-economics.py ZONES and MISSIONS
+    "scavenging-zones": (
+        "scavenging",
+        latin_hypercube(
+            {
+                "zones.AbandonedSettlements.parts_mult": (1.0, 1.6),
+                "zones.DeadMachineFields.parts_mult": (1.0, 2.2),
+                "missions.WastelandExpedition.parts_max": (80, 200),
+                "parts_to_icp": (0.005, 0.015),
+            },
+            samples=500,
+        ),
+        "best_net",
+    ),
+    # balance-scavenging-vs-racing.py: scavenging income per racing income
+    "scavenging-vs-racing": (
+        "balance",
+        grid(
+            {
+                "fleet.races_per_day": [2, 3, 4],
+                "scavenging.zones.DeadMachineFields.parts_mult": [1.2, 1.4, 1.7, 2.0],
+                "scavenging.missions.WastelandExpedition.parts_max": [90, 140, 200],
+            }
+        ),
+        "ratio.WastelandExpedition.DeadMachineFields",
+    ),
+}
+
+SHOW_ROWS = 5
+
+
+def main():
+    print("🧮 ECONOMY PARAMETER SWEEPS")
+    print("=" * 80)
+
+    for name, (evaluator, points, metric) in SWEEPS.items():
+        print(f"\n\n📋 {name} ({evaluator}, {len(points)} points)")
+        print("-" * 80)
+        path = os.path.join(RESULTS_DIR, f"{name}.jsonl")
+        computed = 0
+
+        def progress(done, total):
+            nonlocal computed
+            computed = done
+
+        start = time.perf_counter()
+        rows = run_sweep(evaluator, points, path, workers=WORKERS, progress=progress)
+        elapsed = time.perf_counter() - start
+        print(
+            f"  {computed} computed, {len(points) - computed} reused "
+            f"in {elapsed:.2f}s -> {os.path.relpath(path)}"
+        )
+
+        ranked = sorted(rows, key=lambda row: row["metrics"][metric], reverse=True)
+        for label, picked in (
+            ("Highest", ranked[:SHOW_ROWS]),
+            ("Lowest", ranked[-SHOW_ROWS:]),
+        ):
+            print(f"\n  {label} {metric}:")
+            for row in picked:
+                params = ", ".join(f"{k}={v:g}" for k, v in row["params"].items())
+                print(f"    {row['metrics'][metric]:10.3f}  {params}")
+
+    print("\n" + "=" * 80)
+
+
+if __name__ == "__main__":
+    main()
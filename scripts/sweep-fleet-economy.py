@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Sweep maintenance thresholds x fleet size x races per day with the batched
+fleet economy simulator (pokedbots_sim.economy) and print the weekly
+profit / ROI distribution of each scenario.
+
+Fleets race the analyze-economics.py Scenario 1 bots (a fleet of k bots
+races the first k, cycled); REPLICATES fleets per scenario give the spread.
+"""
+
+import time
+
+import numpy as np
+
+from pokedbots_sim.economy import (
+    MIXED_FLEET,
+    fleet_grid,
+    percentiles,
+    simulate_fleets,
+)
+
+DAYS = 7
+REPLICATES = 500
+SEED = 42
+
+FLEET_SIZES = [1, 2, 3, 5, 8]
+RACES_PER_DAY = [1, 2, 3, 4, 6]
+RECHARGE_BELOW = [30, 40, 50, 60, 70]
+REPAIR_BELOW = [30, 40, 50, 60, 70]
+
+SHOW_BEST = 15
+
+
+def main():
+    print("📈 FLEET ECONOMY SWEEP")
+    print("=" * 80)
+
+    fleets, scenarios = fleet_grid(
+        [stats for stats, _ in MIXED_FLEET],
+        [wins for _, wins in MIXED_FLEET],
+        FLEET_SIZES,
+        RACES_PER_DAY,
+        RECHARGE_BELOW,
+        REPAIR_BELOW,
+        replicates=REPLICATES,
+    )
+    start = time.perf_counter()
+    results = simulate_fleets(fleets, DAYS, seed=SEED)
+    elapsed = time.perf_counter() - start
+    print(
+        f"{len(scenarios):,} scenarios x {REPLICATES} fleets "
+        f"({len(fleets):,} bots, {int(results.fleets['races'].sum()):,} races) "
+        f"in {elapsed:.2f}s"
+    )
+
+    profit = percentiles(results.net_profit.reshape(-1, REPLICATES))
+    roi = percentiles(results.roi_percentage.reshape(-1, REPLICATES))
+    losing = (results.net_profit < 0).reshape(-1, REPLICATES).mean(axis=1)
+
+    def print_rows(rows):
+        print(
+            f"  {'Bots':>4} {'Races/day':>9} {'Recharge<':>9} {'Repair<':>7} | "
+            f"{'Net/week p5':>11} {'p50':>8} {'p95':>8} | {'ROI p50':>8} "
+            f"{'Losing':>7}"
+        )
+        for row in rows:
+            s = scenarios[row]
+            print(
+                f"  {s['fleet_size']:4} {s['races_per_day']:9} "
+                f"{s['recharge_below']:9} {s['repair_below']:7} | "
+                f"{profit[row, 0]:11.4f} {profit[row, 1]:8.4f} "
+                f"{profit[row, 2]:8.4f} | {roi[row, 1]:7.1f}% "
+                f"{losing[row] * 100:6.1f}%"
+            )
+
+    print(f"\n\n🏆 BEST {SHOW_BEST} SCENARIOS BY MEDIAN NET PROFIT")
+    print("-" * 80)
+    print_rows(np.argsort(-profit[:, 1], kind="stable")[:SHOW_BEST])
+
+    print("\n\n🔧 BEST THRESHOLDS PER FLEET SIZE AND RACES PER DAY")
+    print("-" * 80)
+    best = {}
+    for row, s in enumerate(scenarios):
+        key = (s["fleet_size"], s["races_per_day"])
+        if key not in best or profit[row, 1] > profit[best[key], 1]:
+            best[key] = row
+    print_rows(best.values())
+
+    print("\n" + "=" * 80)
+
+
+if __name__ == "__main__":
+    main()
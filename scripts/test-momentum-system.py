@@ -3,67 +3,7 @@
 Test the momentum system to understand acceleration's impact.
 """
 
-import math
-
-
-def calculate_segment_time(segment, stats, seed, previous_difficulty):
-    """Calculate time for a single segment."""
-    speed = stats["speed"]
-    power_core = stats["powerCore"]
-    stability = stats["stability"]
-    acceleration = stats["acceleration"]
-
-    # Base time for segment
-    segment_length = segment["length"]
-    base_speed = math.sqrt(speed) * 7.5
-
-    # Terrain modifier
-    terrain = segment["terrain"]
-    if terrain == "ScrapHeaps":
-        terrain_mod = 1.0 + ((100.0 - stability) / 150.0)
-    elif terrain == "WastelandSand":
-        terrain_mod = 1.0 + ((100.0 - power_core) / 200.0)
-    elif terrain == "MetalRoads":
-        terrain_mod = 1.0 + ((100.0 - acceleration) / 160.0)
-    else:
-        terrain_mod = 1.0
-
-    # Angle modifier
-    angle = segment["angle"]
-    if angle > 0:
-        angle_mod = 1.0 + (angle * (100.0 - power_core) / 3000.0)
-    else:
-        angle_mod = 1.0
-
-    # Momentum system: acceleration affects recovery after difficult sections
-    if previous_difficulty > 1.0:
-        momentum_loss = (previous_difficulty - 1.0) * 0.15  # Up to 15% slower
-    else:
-        momentum_loss = 0.0
-
-    acceleration_recovery = acceleration / 140.0  # 0.0 to 0.71 at 100 accel
-    momentum_mod = 1.0 + (momentum_loss * (1.0 - acceleration_recovery))
-
-    # Segment difficulty
-    difficulty = segment["difficulty"]
-    if difficulty > 1.0:
-        stability_factor = 1.0 + ((100.0 - stability) / 300.0)
-        difficulty_mod = difficulty * stability_factor
-    else:
-        difficulty_mod = difficulty
-
-    # Randomness (use fixed seed for comparison)
-    segment_seed = seed % 1000
-    random_mod = 0.90 + (segment_seed / 5000.0)
-
-    # Calculate segment time
-    effective_speed = base_speed / (
-        terrain_mod * angle_mod * difficulty_mod * momentum_mod
-    )
-    segment_time = (segment_length / effective_speed) * random_mod
-
-    return max(0.1, segment_time / 10.0), momentum_mod, momentum_loss
-
+from pokedbots_sim import compile_track, momentum_terms, segment_time_tensor
 
 # Test track with consecutive difficult segments
 TECHNICAL_TRACK = [
@@ -122,7 +62,13 @@ test_cases = [
     ),
 ]
 
+track = compile_track(TECHNICAL_TRACK)
+
 for name, stats in test_cases:
+    # Segment i is seeded with 12345 + i (no per-segment performance roll)
+    segment_times = segment_time_tensor(track, stats, [12345], 0, performance=False)
+    momentum_loss, momentum_mod = momentum_terms(track, stats)
+
     print(f"\n{name}:")
     print("-" * 80)
     print(
@@ -134,13 +80,11 @@ for name, stats in test_cases:
     previous_difficulty = 1.0
 
     for i, segment in enumerate(TECHNICAL_TRACK):
-        time, momentum_mod, momentum_loss = calculate_segment_time(
-            segment, stats, 12345 + i, previous_difficulty
-        )
+        time = segment_times[0, 0, i]
 
         print(
             f"{i+1:<4} {segment['length']:<8} {segment['terrain']:<15} {segment['difficulty']:<6.2f} "
-            f"{previous_difficulty:<10.2f} {momentum_loss:<13.4f} {momentum_mod:<12.4f} {time:<8.3f}s"
+            f"{previous_difficulty:<10.2f} {momentum_loss[i]:<13.4f} {momentum_mod[0, i]:<12.4f} {time:<8.3f}s"
         )
 
         total_time += time
@@ -157,21 +101,16 @@ print("=" * 80)
 low_accel_stats = {"speed": 50, "powerCore": 50, "acceleration": 20, "stability": 50}
 high_accel_stats = {"speed": 50, "powerCore": 50, "acceleration": 80, "stability": 50}
 
+segment_times = segment_time_tensor(
+    track, [low_accel_stats, high_accel_stats], [12345], 0, performance=False
+)
+
 low_time = 0.0
 high_time = 0.0
-previous_difficulty = 1.0
-
-for i, segment in enumerate(TECHNICAL_TRACK):
-    low_seg_time, _, _ = calculate_segment_time(
-        segment, low_accel_stats, 12345 + i, previous_difficulty
-    )
-    high_seg_time, _, _ = calculate_segment_time(
-        segment, high_accel_stats, 12345 + i, previous_difficulty
-    )
 
+for low_seg_time, high_seg_time in zip(segment_times[0, 0], segment_times[0, 1]):
     low_time += low_seg_time
     high_time += high_seg_time
-    previous_difficulty = segment["difficulty"]
 
 time_saved = low_time - high_time
 improvement = (time_saved / low_time) * 100.0
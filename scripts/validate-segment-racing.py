@@ -4,192 +4,46 @@ Validate segment-based racing system by comparing against original race results.
 Runs multiple simulations with different seeds and averages the results.
 """
 
-import subprocess
-import json
+import os
 import sys
 from collections import defaultdict
 from statistics import mean, stdev
 
+from pokedbots_sim.canister import ARCHIVE_DIR, open_canister
 
-def run_dfx_command(method, args):
-    """Run a dfx canister call command and return the result."""
-    cmd = ["dfx", "canister", "call", "pokedbots_racing", method, args, "--ic"]
-
-    try:
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            check=True,
-            cwd="/home/jesse/pokedbots-racing",
-        )
-        return result.stdout
-    except subprocess.CalledProcessError as e:
-        print(f"Error running command: {e}")
-        print(f"stderr: {e.stderr}")
-        return None
+# "local" replays recorded archives in-process; "dfx" queries the deployed
+# canister and appends the races it fetches to RECORD_PATH
+BACKEND = "local"
+RECORD_PATH = os.path.join(ARCHIVE_DIR, "completed-races.jsonl")
+NUM_RACES = 3
 
 
-def parse_candid_result(output):
-    """Parse Candid output to extract race results."""
-    # This is a simplified parser - you may need to adjust based on actual output format
-    results = []
-
-    # Extract position, nftId, and finalTime from each result record
-    lines = output.split("\n")
-    current_result = {}
-
-    for line in lines:
-        line = line.strip()
-
-        if "tokenIndex =" in line or "nftId =" in line:
-            # Extract the ID
-            parts = line.split("=")
-            if len(parts) >= 2:
-                id_str = parts[1].strip().rstrip(";").strip('"')
-                current_result["id"] = id_str
-
-        elif "finalTime =" in line:
-            # Extract the time
-            parts = line.split("=")
-            if len(parts) >= 2:
-                time_str = parts[1].strip().rstrip(";")
-                try:
-                    current_result["time"] = float(time_str.split(":")[0].strip())
-                except:
-                    current_result["time"] = 999999.0
-
-        elif "position =" in line:
-            # Extract position
-            parts = line.split("=")
-            if len(parts) >= 2:
-                pos_str = parts[1].strip().rstrip(";")
-                try:
-                    current_result["position"] = int(pos_str.split(":")[0].strip())
-                except:
-                    pass
-
-            # When we hit position, the record is complete
-            if "id" in current_result and "time" in current_result:
-                results.append(current_result.copy())
-                current_result = {}
-
-    return results
-
-
-def simulate_race(track_id, participants, seed):
+def simulate_race(canister, track_id, participants, seed):
     """Simulate a race with given parameters."""
-    participants_str = "vec { " + "; ".join(str(p) for p in participants) + " }"
-    args = f"({track_id}, {participants_str}, {seed})"
-
-    output = run_dfx_command("debug_simulate_race", args)
-    if not output:
+    reply = canister.debug_simulate_race(track_id, [int(p) for p in participants], seed)
+    if not reply:
         return None
 
-    return parse_candid_result(output)
+    return [
+        {
+            "id": str(r["tokenIndex"]),
+            "time": r["finalTime"],
+            "position": r["position"],
+        }
+        for r in reply["results"]
+    ]
 
 
-def get_completed_races(limit=3):
+def get_completed_races(canister, limit=3):
     """Fetch completed races from the canister."""
-    args = f"({limit})"
-    output = run_dfx_command("get_completed_races", args)
-
-    if not output:
-        return []
-
-    # Parse the race information
     races = []
-    lines = output.split("\n")
-
-    current_race = {}
-    current_results = []
-    in_results = False
-
-    for line in lines:
-        line = line.strip()
-
-        if "raceId =" in line:
-            if current_race and "raceId" in current_race:
-                current_race["original_results"] = current_results.copy()
-                races.append(current_race.copy())
-            current_race = {}
-            current_results = []
-            in_results = False
-
-            parts = line.split("=")
-            if len(parts) >= 2:
-                try:
-                    current_race["raceId"] = int(
-                        parts[1].strip().rstrip(";").split(":")[0].strip()
-                    )
-                except:
-                    pass
-
-        elif "trackId =" in line:
-            parts = line.split("=")
-            if len(parts) >= 2:
-                try:
-                    current_race["trackId"] = int(
-                        parts[1].strip().rstrip(";").split(":")[0].strip()
-                    )
-                except:
-                    pass
-
-        elif "trackSeed =" in line:
-            parts = line.split("=")
-            if len(parts) >= 2:
-                try:
-                    current_race["trackSeed"] = int(
-                        parts[1]
-                        .strip()
-                        .rstrip(";")
-                        .split(":")[0]
-                        .strip()
-                        .replace("_", "")
-                    )
-                except:
-                    pass
-
-        elif "name =" in line and "raceId" in current_race:
-            parts = line.split("=")
-            if len(parts) >= 2:
-                current_race["name"] = parts[1].strip().rstrip(";").strip('"')
-
-        elif "results = opt vec {" in line:
-            in_results = True
-
-        elif in_results and "nftId =" in line:
-            result = {}
-            parts = line.split("=")
-            if len(parts) >= 2:
-                result["id"] = parts[1].strip().rstrip(";").strip('"')
-                current_results.append(result)
-
-        elif in_results and "finalTime =" in line and current_results:
-            parts = line.split("=")
-            if len(parts) >= 2:
-                try:
-                    current_results[-1]["time"] = float(
-                        parts[1].strip().rstrip(";").split(":")[0].strip()
-                    )
-                except:
-                    current_results[-1]["time"] = 999999.0
-
-        elif in_results and "position =" in line and current_results:
-            parts = line.split("=")
-            if len(parts) >= 2:
-                try:
-                    current_results[-1]["position"] = int(
-                        parts[1].strip().rstrip(";").split(":")[0].strip()
-                    )
-                except:
-                    pass
-
-    # Add the last race
-    if current_race and "raceId" in current_race:
-        current_race["original_results"] = current_results.copy()
-        races.append(current_race)
-
+    for race in canister.get_completed_races(limit):
+        race = dict(race)
+        race["original_results"] = [
+            {"id": r["nftId"], "time": r["finalTime"], "position": r["position"]}
+            for r in race["results"]
+        ]
+        races.append(race)
     return races
 
 
@@ -199,12 +53,20 @@ def main():
     print("=" * 80)
     print()
 
-    # Fetch the last 3 completed races
-    print("Fetching last 3 completed races...")
-    races = get_completed_races(3)
+    if BACKEND == "dfx":
+        canister = open_canister("dfx", record=RECORD_PATH)
+    else:
+        canister = open_canister(BACKEND)
+
+    print(f"Fetching {NUM_RACES} completed races ({BACKEND} backend)...")
+    races = get_completed_races(canister, NUM_RACES)
 
     if not races:
         print("Error: Could not fetch races")
+        if BACKEND == "local":
+            print(
+                f'No recorded races under {os.path.relpath(ARCHIVE_DIR)}; run once with BACKEND = "dfx"'
+            )
         sys.exit(1)
 
     print(f"Found {len(races)} races to validate")
@@ -266,7 +128,7 @@ def main():
             seed = seeds_to_test[i]
             print(f"  Seed {seed}...", end="", flush=True)
 
-            results = simulate_race(track_id, participants, seed)
+            results = simulate_race(canister, track_id, participants, seed)
             if results:
                 all_simulations.append(results)
                 # Debug: print first bot's time to verify variance
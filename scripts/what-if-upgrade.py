@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+What-if upgrades for Jesse's bots, re-ranked against 100k cached races
+"""
+
+import os
+import time
+
+from pokedbots_sim import STAT_NAMES, field_cache, load_roster, standard_schedule
+from pokedbots_sim.data import CACHE_DIR
+
+NUM_RACES = 100_000
+UPGRADE_POINTS = 3
+
+
+def main():
+    print("🔧 WHAT-IF UPGRADE ANALYSIS")
+    print("=" * 80)
+
+    roster = load_roster()
+    jesse_roster = roster.take(roster.rows_of([737, 4079, 4343, 8631]))
+    races = standard_schedule(NUM_RACES)
+
+    start = time.perf_counter()
+    cache = field_cache(
+        jesse_roster, races, path=os.path.join(CACHE_DIR, "what-if-jesse.bin")
+    )
+    elapsed = time.perf_counter() - start
+    print(f"{len(cache)} bots x {NUM_RACES} races cached in {elapsed:.2f}s")
+
+    for token_id in cache.token_ids.tolist():
+        bot = jesse_roster.bot(token_id)
+        base = cache.baseline(token_id)
+        print(f"\n{bot.id}")
+        print(
+            f"  Current: S:{bot.stats.speed:2} P:{bot.stats.powerCore:2} "
+            f"A:{bot.stats.acceleration:2} St:{bot.stats.stability:2} | "
+            f"Wins: {base.wins:6} | Avg Position: {base.mean_position:.3f}"
+        )
+        for name in STAT_NAMES:
+            start = time.perf_counter()
+            result = cache.what_if_delta(token_id, **{name: UPGRADE_POINTS})
+            elapsed = (time.perf_counter() - start) * 1000
+            print(
+                f"  +{UPGRADE_POINTS} {name:13} Wins: {result.wins:6} "
+                f"({result.wins - base.wins:+6}) | "
+                f"Avg Position: {result.mean_position:.3f} "
+                f"({result.mean_position - base.mean_position:+.3f}) | "
+                f"{elapsed:5.1f} ms"
+            )
+
+    print("\n" + "=" * 80)
+
+
+if __name__ == "__main__":
+    main()